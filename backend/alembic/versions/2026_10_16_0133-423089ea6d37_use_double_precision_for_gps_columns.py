@@ -0,0 +1,45 @@
+"""use double precision for gps columns
+
+Revision ID: 423089ea6d37
+Revises: b665c3b83713
+Create Date: 2026-10-16 01:33:03.553624+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '423089ea6d37'
+down_revision = 'b665c3b83713'
+branch_labels = None
+depends_on = None
+
+
+GPS_COLUMNS = [
+    ('farms', 'gps_lat', 10),
+    ('farms', 'gps_lng', 11),
+    ('claims', 'capture_gps_lat', 10),
+    ('claims', 'capture_gps_lng', 11),
+]
+
+
+def upgrade() -> None:
+    for table, column, _ in GPS_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.DOUBLE_PRECISION(),
+            postgresql_using=f"{column}::float8"
+        )
+
+
+def downgrade() -> None:
+    for table, column, precision in GPS_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Numeric(precision=precision, scale=8),
+            postgresql_using=f"{column}::numeric({precision}, 8)"
+        )
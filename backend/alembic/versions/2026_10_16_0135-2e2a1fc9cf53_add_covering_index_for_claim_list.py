@@ -0,0 +1,40 @@
+"""add covering index for claim list
+
+Revision ID: 2e2a1fc9cf53
+Revises: 423089ea6d37
+Create Date: 2026-10-16 01:35:04.464030+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e2a1fc9cf53'
+down_revision = '423089ea6d37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_list
+            ON claims (agent_id, status, created_at DESC)
+            INCLUDE (farm_id, ml_class, ml_confidence, payout_status, payout_amount)
+            """
+        )
+    
+        # Superseded by the composite index above; ix_claims_created_at stays for
+        # the unfiltered timeline
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_claims_status")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_claims_agent_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_agent_id ON claims (agent_id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_status ON claims (status)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_claims_list")
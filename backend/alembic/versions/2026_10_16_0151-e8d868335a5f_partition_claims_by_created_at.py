@@ -0,0 +1,139 @@
+"""partition claims by created_at
+
+Revision ID: e8d868335a5f
+Revises: 2e2a1fc9cf53
+Create Date: 2026-10-16 01:51:40.861721+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8d868335a5f'
+down_revision = '2e2a1fc9cf53'
+branch_labels = None
+depends_on = None
+
+
+# Monthly partitions are created this many months ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+CRON_JOB_NAME = 'create-claims-partitions'
+
+
+def _create_claims_indexes() -> None:
+    """Recreate the claims constraints and indexes after a table swap"""
+    op.execute("ALTER TABLE claims ADD CONSTRAINT claims_agent_id_fkey FOREIGN KEY (agent_id) REFERENCES agents (id) ON DELETE SET NULL")
+    op.execute("ALTER TABLE claims ADD CONSTRAINT claims_farm_id_fkey FOREIGN KEY (farm_id) REFERENCES farms (id) ON DELETE SET NULL")
+    op.execute("CREATE INDEX ix_claims_farm_id ON claims (farm_id)")
+    op.execute("CREATE INDEX ix_claims_created_at ON claims (created_at DESC)")
+    op.execute(
+        """
+        CREATE INDEX ix_claims_list
+        ON claims (agent_id, status, created_at DESC)
+        INCLUDE (farm_id, ml_class, ml_confidence, payout_status, payout_amount)
+        """
+    )
+
+
+def upgrade() -> None:
+    # Swap in a partitioned copy; the whole swap runs in one transaction
+    op.execute("ALTER TABLE claims RENAME TO claims_unpartitioned")
+    op.execute(
+        """
+        CREATE TABLE claims (LIKE claims_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+        """
+    )
+    
+    # Creates the monthly partition containing month_start, e.g. claims_2026_10
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_claims_partition(month_start date)
+        RETURNS void AS $$
+        DECLARE
+            start_date date := date_trunc('month', month_start)::date;
+            end_date date := (date_trunc('month', month_start) + interval '1 month')::date;
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF claims FOR VALUES FROM (%L) TO (%L)',
+                'claims_' || to_char(start_date, 'YYYY_MM'),
+                start_date,
+                end_date
+            );
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    
+    # One partition per month from the oldest claim until a few months ahead
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month_start date;
+        BEGIN
+            FOR month_start IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(min(created_at), now())),
+                    date_trunc('month', now()) + interval '{PARTITION_MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+                FROM claims_unpartitioned
+            LOOP
+                PERFORM create_claims_partition(month_start);
+            END LOOP;
+        END
+        $$
+        """
+    )
+    # Safety net if the scheduled job ever falls behind
+    op.execute("CREATE TABLE claims_default PARTITION OF claims DEFAULT")
+    
+    op.execute("INSERT INTO claims SELECT * FROM claims_unpartitioned")
+    op.execute("DROP TABLE claims_unpartitioned")
+    
+    # Unique constraints on a partitioned table must include the partition key
+    op.execute("ALTER TABLE claims ADD CONSTRAINT claims_pkey PRIMARY KEY (id, created_at)")
+    _create_claims_indexes()
+    
+    # Keep partitions ahead of time where pg_cron is installed
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule(
+                    '{CRON_JOB_NAME}',
+                    '0 0 1 * *',
+                    'SELECT create_claims_partition((now() + interval ''{PARTITION_MONTHS_AHEAD} months'')::date)'
+                );
+            END IF;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.unschedule(jobid) FROM cron.job WHERE jobname = '{CRON_JOB_NAME}';
+            END IF;
+        END
+        $$
+        """
+    )
+    
+    op.execute("ALTER TABLE claims RENAME TO claims_partitioned")
+    op.execute("CREATE TABLE claims (LIKE claims_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO claims SELECT * FROM claims_partitioned")
+    op.execute("DROP TABLE claims_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS create_claims_partition(date)")
+    
+    op.execute("ALTER TABLE claims ADD CONSTRAINT claims_pkey PRIMARY KEY (id)")
+    _create_claims_indexes()
@@ -0,0 +1,67 @@
+"""add partial indexes for hot claim statuses
+
+Revision ID: 1b9454fff713
+Revises: e8d868335a5f
+Create Date: 2026-10-16 02:03:16.926566+03:00
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b9454fff713'
+down_revision = 'e8d868335a5f'
+branch_labels = None
+depends_on = None
+
+
+PARTIAL_INDEXES = [
+    ('ix_claims_pending', "status IN ('pending', 'flagged_for_review')"),
+    ('ix_claims_payout_pending', "payout_status = 'pending'"),
+]
+
+
+def _claims_partitions() -> list:
+    """Names of the current claims partitions"""
+    result = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'claims'::regclass
+            ORDER BY c.relname
+            """
+        )
+    )
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # Partitions can't be listed without a connection; build in one pass
+        for name, predicate in PARTIAL_INDEXES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON claims (created_at DESC) WHERE {predicate}")
+        return
+    
+    # CONCURRENTLY isn't supported on a partitioned table, so create the parent
+    # index on ONLY claims and build each partition's index concurrently
+    partitions = _claims_partitions()
+    for name, predicate in PARTIAL_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY claims (created_at DESC) WHERE {predicate}")
+    
+    with op.get_context().autocommit_block():
+        for name, predicate in PARTIAL_INDEXES:
+            for partition in partitions:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{name[3:]} "
+                    f"ON {partition} (created_at DESC) WHERE {predicate}"
+                )
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{name[3:]}")
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it
+    for name, _ in PARTIAL_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
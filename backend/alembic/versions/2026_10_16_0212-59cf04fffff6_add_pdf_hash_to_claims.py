@@ -0,0 +1,25 @@
+"""add pdf_hash to claims
+
+Revision ID: 59cf04fffff6
+Revises: 1b9454fff713
+Create Date: 2026-10-16 02:12:30.578401+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '59cf04fffff6'
+down_revision = '1b9454fff713'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable with no default, so this is a catalog-only change
+    op.add_column('claims', sa.Column('pdf_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('claims', 'pdf_hash')
@@ -0,0 +1,72 @@
+"""use jsonb for claims top_three_classes
+
+Revision ID: bd2e6e867917
+Revises: 59cf04fffff6
+Create Date: 2026-10-16 02:30:51.858267+03:00
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bd2e6e867917'
+down_revision = '59cf04fffff6'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = 'ix_claims_top3_gin'
+INDEX_DEF = "USING GIN (top_three_classes jsonb_path_ops)"
+
+
+def _claims_partitions() -> list:
+    """Names of the current claims partitions"""
+    result = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'claims'::regclass
+            ORDER BY c.relname
+            """
+        )
+    )
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    # jsonb is stored decomposed, so reads skip re-parsing and @> containment
+    # ("claims whose top three include class X") can use a GIN index
+    op.execute(
+        "ALTER TABLE claims ALTER COLUMN top_three_classes TYPE jsonb "
+        "USING top_three_classes::jsonb"
+    )
+    
+    if context.is_offline_mode():
+        # Partitions can't be listed without a connection; build in one pass
+        op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON claims {INDEX_DEF}")
+        return
+    
+    # CONCURRENTLY isn't supported on a partitioned table, so create the parent
+    # index on ONLY claims and build each partition's index concurrently
+    partitions = _claims_partitions()
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY claims {INDEX_DEF}")
+    
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{INDEX_NAME[3:]} "
+                f"ON {partition} {INDEX_DEF}"
+            )
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition}_{INDEX_NAME[3:]}")
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    op.execute(
+        "ALTER TABLE claims ALTER COLUMN top_three_classes TYPE json "
+        "USING top_three_classes::json"
+    )
@@ -0,0 +1,55 @@
+"""default primary keys to uuid v7
+
+Revision ID: 4cfd1a512a90
+Revises: bd2e6e867917
+Create Date: 2026-10-16 02:36:42.197296+03:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4cfd1a512a90'
+down_revision = 'bd2e6e867917'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ['agents', 'farms', 'claims', 'payment_transactions']
+
+
+def upgrade() -> None:
+    # Time-ordered UUIDs (48-bit Unix ms timestamp, then random bits) keep
+    # primary key inserts on the rightmost btree page. Existing v4 keys stay.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+        DECLARE
+            uuid_bytes bytea := uuid_send(gen_random_uuid());
+        BEGIN
+            uuid_bytes := overlay(
+                uuid_bytes
+                PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                FROM 1 FOR 6
+            );
+            -- Version 7; the RFC 4122 variant bits are kept from gen_random_uuid()
+            uuid_bytes := set_byte(
+                uuid_bytes, 6, (b'0111' || get_byte(uuid_bytes, 6)::bit(4))::bit(8)::int
+            );
+            RETURN encode(uuid_bytes, 'hex')::uuid;
+        END
+        $$ LANGUAGE plpgsql VOLATILE
+        """
+    )
+    
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT uuid_generate_v7()")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+    
+    # claims originally defaulted to a random UUID
+    op.execute("ALTER TABLE claims ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
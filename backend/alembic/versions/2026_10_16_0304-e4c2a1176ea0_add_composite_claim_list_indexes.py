@@ -0,0 +1,75 @@
+"""add composite claim list indexes
+
+Revision ID: e4c2a1176ea0
+Revises: 4cfd1a512a90
+Create Date: 2026-10-16 03:04:03.289947+03:00
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c2a1176ea0'
+down_revision = '4cfd1a512a90'
+branch_labels = None
+depends_on = None
+
+
+# Filter column followed by the list ordering, so each filtered list is a
+# single index range scan with no sort
+COMPOSITE_INDEXES = [
+    ('ix_claims_agent_created', 'agent_id'),
+    ('ix_claims_status_created', 'status'),
+    ('ix_claims_farm_created', 'farm_id'),
+]
+
+
+def _claims_partitions() -> list:
+    """Names of the current claims partitions"""
+    result = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'claims'::regclass
+            ORDER BY c.relname
+            """
+        )
+    )
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # Partitions can't be listed without a connection; build in one pass
+        for name, column in COMPOSITE_INDEXES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON claims ({column}, created_at DESC)")
+    else:
+        # CONCURRENTLY isn't supported on a partitioned table, so create the parent
+        # index on ONLY claims and build each partition's index concurrently
+        partitions = _claims_partitions()
+        for name, column in COMPOSITE_INDEXES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY claims ({column}, created_at DESC)")
+        
+        with op.get_context().autocommit_block():
+            for name, column in COMPOSITE_INDEXES:
+                for partition in partitions:
+                    op.execute(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{name[3:]} "
+                        f"ON {partition} ({column}, created_at DESC)"
+                    )
+                    op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{name[3:]}")
+    
+    # farm_id lookups use the leading column of ix_claims_farm_created.
+    # ix_claims_created_at stays for the unfiltered timeline.
+    op.execute("DROP INDEX IF EXISTS ix_claims_farm_id")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_claims_farm_id ON claims (farm_id)")
+    
+    # Dropping the parent index drops the attached partition indexes with it
+    for name, _ in COMPOSITE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,38 @@
+"""add covering index for farmer search
+
+Revision ID: 7c3f9a2d5e81
+Revises: e4c2a1176ea0
+Create Date: 2026-10-16 04:12:37.518204+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3f9a2d5e81'
+down_revision = 'e4c2a1176ea0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_farms_farmer_id_covering
+            ON farms (farmer_id)
+            INCLUDE (id, farmer_name, phone_number, crop_type, gps_lat, gps_lng,
+                     gps_accuracy, registered_at, registered_by)
+            """
+        )
+        
+        # Superseded by the covering index above
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_farms_farmer_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_farms_farmer_id ON farms (farmer_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_farms_farmer_id_covering")
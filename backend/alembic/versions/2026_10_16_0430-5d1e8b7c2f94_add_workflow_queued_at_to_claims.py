@@ -0,0 +1,28 @@
+"""add workflow_queued_at to claims
+
+Revision ID: 5d1e8b7c2f94
+Revises: 7c3f9a2d5e81
+Create Date: 2026-10-16 04:30:12.804117+03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e8b7c2f94'
+down_revision = '7c3f9a2d5e81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('claims', sa.Column('workflow_queued_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # Claims past pending have been processed already; pending ones may still
+    # be waiting for their direct-upload confirmation
+    op.execute("UPDATE claims SET workflow_queued_at = created_at WHERE status <> 'pending'")
+
+
+def downgrade() -> None:
+    op.drop_column('claims', 'workflow_queued_at')
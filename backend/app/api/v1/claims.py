@@ -1,25 +1,51 @@
 """Claim management API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional
-from math import ceil
+import logging
 
+from app.celery_app import celery_app
 from app.database import get_db
 from app.core.dependencies import get_current_agent
 from app.models.agent import Agent
 from app.schemas.claim import (
     ClaimCreate,
     ClaimCreateResponse,
+    ClaimInitiate,
+    ClaimInitiateResponse,
     ClaimResponse,
     ClaimListResponse,
     ClaimStatus
 )
 from app.services.claim_service import claim_service
+from app.services.coalescing_service import coalescing_service
+from app.services.http_cache_service import http_cache_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_VALID_STATUSES = frozenset(s.value for s in ClaimStatus)
+_VALID_STATUSES_TEXT = ', '.join(s.value for s in ClaimStatus)
+
+
+def _enqueue_claim_workflow(claim_id: UUID) -> None:
+    """Enqueue async processing workflow by name (routed to the "claims" queue)"""
+    try:
+        # Fail fast when the broker is down rather than blocking the request
+        # through kombu's default publish retries
+        celery_app.send_task(
+            "process_claim_workflow",
+            args=[str(claim_id)],
+            queue="claims",
+            retry=False
+        )
+    except Exception as e:
+        # The claim is already stored as pending; don't fail the submission
+        logger.error(f"Error enqueuing claim workflow for {claim_id}: {str(e)}")
+
 
 @router.post(
     "",
@@ -28,9 +54,8 @@ router = APIRouter()
     summary="Submit a new claim",
     description="Create a new insurance claim with Ground Truth data and image"
 )
-async def create_claim(
+def create_claim(
     claim_data: ClaimCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
@@ -54,12 +79,7 @@ async def create_claim(
         # Create claim and upload image
         response = claim_service.create_claim(claim_data, db)
         
-        # Enqueue async processing workflow
-        from app.tasks.claim_tasks import process_claim_workflow
-        background_tasks.add_task(
-            process_claim_workflow.delay,
-            str(response.claim_id)
-        )
+        _enqueue_claim_workflow(response.claim_id)
         
         return response
     except ValueError as e:
@@ -79,14 +99,89 @@ async def create_claim(
         )
 
 
+@router.post(
+    "/initiate",
+    response_model=ClaimInitiateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start a claim with a direct image upload",
+    description="Create a claim and get a pre-signed form for uploading its image straight to storage"
+)
+def initiate_claim(
+    claim_data: ClaimInitiate,
+    db: Session = Depends(get_db),
+    current_agent: Agent = Depends(get_current_agent)
+):
+    """
+    Start a claim without sending the image through the API:
+    
+    1. Call this endpoint with the claim data (no image)
+    2. POST the image as multipart/form-data to **upload_url** with **fields**
+       (JPEG, up to 10 MB, within **expires_in** seconds)
+    3. Call POST /claims/{claim_id}/image-uploaded to start processing
+    """
+    try:
+        return claim_service.initiate_claim(claim_data, db)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post(
+    "/{claim_id}/image-uploaded",
+    response_model=ClaimCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Confirm a direct image upload",
+    description="Start processing a claim once its image has been uploaded to storage"
+)
+def confirm_image_upload(
+    claim_id: UUID,
+    db: Session = Depends(get_db),
+    current_agent: Agent = Depends(get_current_agent)
+):
+    """
+    Start processing a claim created with POST /claims/initiate.
+    
+    - **claim_id**: UUID of the claim whose image was uploaded
+    """
+    try:
+        claim = claim_service.confirm_image_upload(claim_id, db)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    if not claim:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Claim with id {claim_id} not found"
+        )
+    
+    _enqueue_claim_workflow(claim.id)
+    
+    return ClaimCreateResponse(
+        claim_id=claim.id,
+        status=ClaimStatus(claim.status),
+        message="Claim image received. Processing will begin shortly."
+    )
+
+
 @router.get(
     "/{claim_id}",
     response_model=ClaimResponse,
     summary="Get claim by ID",
     description="Retrieve detailed information about a specific claim"
 )
-async def get_claim(
+def get_claim(
     claim_id: UUID,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
@@ -100,7 +195,17 @@ async def get_claim(
     - Space Truth data (satellite NDMI, verdict) if available
     - Verification result (weighted score, status, explanation) if available
     - Payment information if applicable
+    
+    Supports conditional requests: send the returned ETag as If-None-Match to
+    get 304 Not Modified while the claim is unchanged.
     """
+    cache_key = http_cache_service.claim_key(claim_id)
+    
+    # Revalidation against the remembered ETag skips the claim query entirely
+    not_modified = http_cache_service.not_modified(cache_key, if_none_match)
+    if not_modified:
+        return not_modified
+    
     claim = claim_service.get_claim_by_id(claim_id, db)
     
     if not claim:
@@ -109,7 +214,18 @@ async def get_claim(
             detail=f"Claim with id {claim_id} not found"
         )
     
-    return ClaimResponse.from_orm_model(claim)
+    etag = http_cache_service.make_etag(claim.id, claim.updated_at)
+    cache_control = http_cache_service.remember(cache_key, etag)
+    
+    if http_cache_service.etag_matches(if_none_match, etag):
+        return http_cache_service.not_modified_response(etag, cache_control)
+    
+    # Serialized here in one pass rather than dumped, re-validated and encoded by FastAPI
+    return Response(
+        content=ClaimResponse.from_orm_model(claim).model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
 
 
 @router.get(
@@ -118,11 +234,13 @@ async def get_claim(
     summary="List claims with filtering",
     description="Retrieve a paginated list of claims with optional filtering"
 )
-async def list_claims(
+def list_claims(
+    request: Request,
     agentId: Optional[UUID] = Query(None, description="Filter by agent ID"),
-    status: Optional[str] = Query(None, description="Filter by claim status"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by claim status"),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
@@ -134,41 +252,53 @@ async def list_claims(
     - **status**: Filter by claim status (pending, auto_approved, flagged_for_review, rejected, paid)
     - **page**: Page number, starting from 1
     - **page_size**: Number of items per page (max 100)
+    - **cursor**: Continue after a previous page (optional). Takes precedence over
+      page and is cheaper for deep pages; the total is then an estimate.
     
-    Returns paginated list of claims with metadata.
+    Returns paginated list of claims with metadata and a next_cursor for the
+    following page. Identical requests arriving together share one query, so
+    results may be up to two seconds old.
     """
     try:
         # Validate status if provided
-        if status:
+        if status_filter and status_filter not in _VALID_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {status_filter}. Must be one of: {_VALID_STATUSES_TEXT}"
+            )
+        
+        def load_page() -> bytes:
             try:
-                ClaimStatus(status)
-            except ValueError:
+                rows, total, next_cursor = claim_service.get_claims(
+                    db=db,
+                    agent_id=agentId,
+                    status=status_filter,
+                    page=page,
+                    page_size=page_size,
+                    cursor=cursor
+                )
+            except ValueError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid status: {status}. Must be one of: {', '.join([s.value for s in ClaimStatus])}"
+                    detail=str(e)
                 )
+            
+            # Convert to response models
+            claim_responses = [ClaimResponse.from_row(row) for row in rows]
+            
+            return ClaimListResponse(
+                claims=claim_responses,
+                total=total,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor
+            ).model_dump_json().encode()
         
-        # Get claims
-        claims, total = claim_service.get_claims(
-            db=db,
-            agent_id=agentId,
-            status=status,
-            page=page,
-            page_size=page_size
-        )
-        
-        # Convert to response models
-        claim_responses = [ClaimResponse.from_orm_model(claim) for claim in claims]
-        
-        # Calculate total pages
-        total_pages = ceil(total / page_size) if total > 0 else 0
-        
-        return ClaimListResponse(
-            claims=claim_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        # Dashboards poll the same pages from many tabs; run one query for all of them
+        key = coalescing_service.make_key(request.url.path, request.query_params.multi_items())
+        return Response(
+            content=coalescing_service.coalesce(key, load_page),
+            media_type="application/json"
         )
     except HTTPException:
         raise
@@ -185,7 +315,7 @@ async def list_claims(
     summary="Update claim status",
     description="Manually update the status of a claim (for review workflow)"
 )
-async def update_claim_status(
+def update_claim_status(
     claim_id: UUID,
     new_status: ClaimStatus,
     db: Session = Depends(get_db),
@@ -208,4 +338,4 @@ async def update_claim_status(
             detail=f"Claim with id {claim_id} not found"
         )
     
-    return ClaimResponse.from_orm_model(claim)
+    return ClaimResponse.from_row(claim)
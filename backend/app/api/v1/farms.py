@@ -1,9 +1,10 @@
 """Farm management API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
 from app.core.dependencies import get_current_agent
@@ -11,13 +12,17 @@ from app.models.agent import Agent
 from app.schemas.farm import (
     FarmCreate,
     FarmCreateResponse,
-    FarmResponse,
-    GPSCoordinates
+    FarmResponse
 )
 from app.services.farm_service import farm_service
+from app.services.http_cache_service import http_cache_service
 
 router = APIRouter()
 
+# Responses are serialized here in one Rust pass; returning models would make
+# FastAPI dump them to dicts, re-validate and then encode them
+_FARM_LIST_ADAPTER = TypeAdapter(List[FarmResponse])
+
 
 @router.post(
     "",
@@ -26,7 +31,7 @@ router = APIRouter()
     summary="Register a new farm",
     description="Create a new farm registration with GPS coordinates and farmer information"
 )
-async def create_farm(
+def create_farm(
     farm_data: FarmCreate,
     db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
@@ -56,14 +61,41 @@ async def create_farm(
         )
 
 
+@router.get(
+    "/search",
+    response_model=List[FarmResponse],
+    summary="Search farms by farmer ID",
+    description="Search for all farms registered under a specific farmer ID"
+)
+def search_farms(
+    farmerId: str = Query(..., description="Farmer's identification number to search for"),
+    db: Session = Depends(get_db),
+    current_agent: Agent = Depends(get_current_agent)
+):
+    """
+    Search for farms by farmer identification number.
+    
+    - **farmerId**: Farmer's national ID or identification number (query parameter)
+    
+    Returns a list of all farms registered under this farmer ID.
+    """
+    farms = farm_service.search_farms_by_farmer_id(farmerId, db)
+    
+    return Response(
+        content=_FARM_LIST_ADAPTER.dump_json([FarmResponse.from_row(farm) for farm in farms]),
+        media_type="application/json"
+    )
+
+
 @router.get(
     "/{farm_id}",
     response_model=FarmResponse,
     summary="Get farm by ID",
     description="Retrieve a specific farm by its UUID"
 )
-async def get_farm(
+def get_farm(
     farm_id: UUID,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
@@ -71,7 +103,17 @@ async def get_farm(
     Get detailed information about a specific farm by ID.
     
     - **farm_id**: UUID of the farm to retrieve
+    
+    Supports conditional requests: send the returned ETag as If-None-Match to
+    get 304 Not Modified.
     """
+    cache_key = http_cache_service.farm_key(farm_id)
+    
+    # Revalidation against the remembered ETag skips the farm query entirely
+    not_modified = http_cache_service.not_modified(cache_key, if_none_match)
+    if not_modified:
+        return not_modified
+    
     farm = farm_service.get_farm_by_id(farm_id, db)
     
     if not farm:
@@ -80,56 +122,14 @@ async def get_farm(
             detail=f"Farm with id {farm_id} not found"
         )
     
-    return FarmResponse(
-        id=farm.id,
-        farmer_name=farm.farmer_name,
-        farmer_id=farm.farmer_id,
-        phone_number=farm.phone_number,
-        crop_type=farm.crop_type,
-        gps_coordinates=GPSCoordinates(
-            lat=farm.gps_lat,
-            lng=farm.gps_lng,
-            accuracy=farm.gps_accuracy
-        ),
-        registered_at=farm.registered_at,
-        registered_by=farm.registered_by
-    )
-
-
-@router.get(
-    "/search",
-    response_model=List[FarmResponse],
-    summary="Search farms by farmer ID",
-    description="Search for all farms registered under a specific farmer ID"
-)
-async def search_farms(
-    farmerId: str = Query(..., description="Farmer's identification number to search for"),
-    db: Session = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
-):
-    """
-    Search for farms by farmer identification number.
-    
-    - **farmerId**: Farmer's national ID or identification number (query parameter)
+    etag = http_cache_service.make_etag(farm.id, farm.registered_at)
+    cache_control = http_cache_service.remember(cache_key, etag)
     
-    Returns a list of all farms registered under this farmer ID.
-    """
-    farms = farm_service.search_farms_by_farmer_id(farmerId, db)
+    if http_cache_service.etag_matches(if_none_match, etag):
+        return http_cache_service.not_modified_response(etag, cache_control)
     
-    return [
-        FarmResponse(
-            id=farm.id,
-            farmer_name=farm.farmer_name,
-            farmer_id=farm.farmer_id,
-            phone_number=farm.phone_number,
-            crop_type=farm.crop_type,
-            gps_coordinates=GPSCoordinates(
-                lat=farm.gps_lat,
-                lng=farm.gps_lng,
-                accuracy=farm.gps_accuracy
-            ),
-            registered_at=farm.registered_at,
-            registered_by=farm.registered_by
-        )
-        for farm in farms
-    ]
+    return Response(
+        content=FarmResponse.from_row(farm).model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
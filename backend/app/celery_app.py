@@ -19,4 +19,15 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=300,  # 5 minutes
     task_soft_time_limit=240,  # 4 minutes
+    task_routes={
+        "process_claim_workflow": {"queue": "claims"},
+    },
+    broker_transport_options={"socket_keepalive": True},
+    beat_schedule={
+        # Keep today's satellite data cached for all farms as new scenes land
+        "warm-satellite-cache": {
+            "task": "warm_satellite_cache",
+            "schedule": 6 * 60 * 60,
+        },
+    },
 )
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "mavunosure"
     POSTGRES_USER: str = "mavunosure_user"
     POSTGRES_PASSWORD: str = "mavunosure_pass"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # 30 minutes
+    DB_POOL_PRE_PING: bool = False
     
     @property
     def DATABASE_URL(self) -> str:
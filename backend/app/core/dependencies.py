@@ -11,7 +11,7 @@ from app.models.agent import Agent
 security = HTTPBearer()
 
 
-async def get_current_agent(
+def get_current_agent(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Agent:
@@ -1,63 +1,149 @@
 """Security utilities for JWT and authentication"""
 
-from datetime import datetime, timedelta
+import base64
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
 from typing import Any
-from jose import jwt, JWTError
+from uuid import UUID
+import jwt
+import orjson
+from jwt import InvalidTokenError as JWTError
 from app.config import settings
 
+# Secret encoded once rather than on every decode
+_SECRET_BYTES = settings.JWT_SECRET_KEY.encode("utf-8")
+_ALGORITHMS = [settings.JWT_ALGORITHM]
+_DECODE_OPTIONS = {"require": ["exp", "sub", "type"]}
+_TOKEN_TYPES = frozenset({"access", "refresh"})
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
+# Token lifetimes in seconds, computed once from settings
+ACCESS_TOKEN_EXPIRE_SECONDS = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TOKEN_EXPIRE_SECONDS = settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+# Recently decoded tokens: token -> (payload or None if invalid, evict-at epoch,
+# decoded subject). Clients present the same bearer token on every request, so
+# most decodes are a lookup here. Valid entries live until the token's exp;
+# invalid ones briefly, so replayed bad tokens don't each cost a signature check.
+TOKEN_CACHE_MAX_SIZE = 4096
+INVALID_TOKEN_TTL_SECONDS = 60
+_token_cache: "OrderedDict[str, tuple[dict[str, Any] | None, float, UUID | None]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used for JWT segments"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _encode_sub(subject: UUID | str) -> str:
+    """Encode a UUID subject as 22 base64url chars (a string subject is kept as is)"""
+    if isinstance(subject, UUID):
+        return _b64url(subject.bytes).decode()
+    return str(subject)
+
+
+def _decode_sub(sub: str) -> UUID | None:
+    """Decode a subject written by _encode_sub"""
+    try:
+        if len(sub) == 22:
+            return UUID(bytes=base64.urlsafe_b64decode(sub + "=="))
+        # Tokens issued before subjects were compacted carry the UUID string
+        return UUID(sub)
+    except (TypeError, ValueError):
+        return None
+
+
+def create_access_token(subject: UUID | str, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token"""
+    # exp as integer epoch seconds (RFC 7519 NumericDate), no datetime round-trip
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS
     
     to_encode = {
         "exp": expire,
-        "sub": str(subject),
+        "sub": _encode_sub(subject),
         "type": "access"
     }
     
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_refresh_token(subject: str) -> str:
+def create_refresh_token(subject: UUID | str) -> str:
     """Create JWT refresh token"""
-    expire = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = int(time.time()) + REFRESH_TOKEN_EXPIRE_SECONDS
     
     to_encode = {
         "exp": expire,
-        "sub": str(subject),
+        "sub": _encode_sub(subject),
         "type": "refresh"
     }
     
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def decode_token(token: str) -> dict[str, Any] | None:
-    """Decode and verify JWT token"""
+def _claims_acceptable(token: str) -> bool:
+    """Check exp and type without verifying the signature"""
+    # Expired, mistyped or malformed tokens are rejected here, before the HMAC
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+        segment = token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        return claims["exp"] > time.time() and claims["type"] in _TOKEN_TYPES
+    except (IndexError, KeyError, TypeError, ValueError):
+        return False
 
 
-def verify_token(token: str, token_type: str = "access") -> str | None:
-    """Verify token and return subject (agent_id)"""
-    payload = decode_token(token)
+def _decode_cached(token: str) -> tuple[dict[str, Any] | None, float, UUID | None]:
+    """Look up or verify a token, returning its cache entry"""
+    now = time.time()
     
-    if payload is None:
-        return None
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if now < cached[1]:
+                _token_cache.move_to_end(token)
+                return cached
+            del _token_cache[token]
     
-    if payload.get("type") != token_type:
-        return None
+    entry = (None, now + INVALID_TOKEN_TTL_SECONDS, None)
+    if _claims_acceptable(token):
+        try:
+            payload = jwt.decode(
+                token,
+                _SECRET_BYTES,
+                algorithms=_ALGORITHMS,
+                options=_DECODE_OPTIONS
+            )
+            subject = payload["sub"]
+            entry = (
+                payload,
+                payload["exp"],
+                _decode_sub(subject) if isinstance(subject, str) else None
+            )
+        except JWTError:
+            pass
+    
+    with _token_cache_lock:
+        _token_cache[token] = entry
+        if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return entry
+
+
+def decode_token(token: str) -> dict[str, Any] | None:
+    """Decode and verify JWT token (results are cached until the token expires)"""
+    return _decode_cached(token)[0]
+
+
+def verify_token(token: str, token_type: str = "access") -> UUID | None:
+    """Verify token and return subject (agent_id)"""
+    payload, _, subject = _decode_cached(token)
     
-    subject: str = payload.get("sub")
-    if subject is None:
+    if payload is None or payload["type"] != token_type:
         return None
     
     return subject
@@ -2,6 +2,8 @@
 
 from sqlalchemy.types import TypeDecorator, CHAR
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 import uuid
 
 
@@ -38,3 +40,31 @@ class UUID(TypeDecorator):
                 return value
             else:
                 return uuid.UUID(value)
+
+
+class uuid_generate_v7(FunctionElement):
+    """Database-side time-ordered UUID, for use as a primary key server_default.
+    
+    Renders the uuid_generate_v7() function defined in the migrations. The ORM
+    reads generated keys back with INSERT ... RETURNING, so no UUID is built in
+    Python per row.
+    """
+    type = UUID()
+    inherit_cache = True
+    name = 'uuid_generate_v7'
+
+
+@compiles(uuid_generate_v7)
+def _compile_uuid_generate_v7(element, compiler, **kw):
+    return 'uuid_generate_v7()'
+
+
+@compiles(uuid_generate_v7, 'sqlite')
+def _compile_uuid_generate_v7_sqlite(element, compiler, **kw):
+    # SQLite (tests) has no UUID functions: random hex in the same layout,
+    # version 7 but without the timestamp prefix
+    return (
+        "(lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-7' || "
+        "substr(hex(randomblob(2)), 2) || '-' || substr('89ab', 1 + abs(random()) % 4, 1) || "
+        "substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6))))"
+    )
@@ -1,16 +1,45 @@
 """FastAPI application entry point"""
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-import sentry_sdk
+from app.api.v1 import auth, farms, claims, reports
+
+# Probe endpoints are hit constantly and aren't worth a transaction each
+_UNTRACED_PATHS = frozenset({"/", "/health"})
+_TRACES_SAMPLE_RATE = 1.0 if settings.ENVIRONMENT == "development" else 0.1
+
+
+def _traces_sampler(sampling_context: dict) -> float:
+    """Sentry sample rate for a transaction, skipping probe endpoints"""
+    path = sampling_context.get("asgi_scope", {}).get("path")
+    if path in _UNTRACED_PATHS:
+        return 0.0
+    return _TRACES_SAMPLE_RATE
+
 
-# Initialize Sentry if DSN is provided
-if settings.SENTRY_DSN:
+# Initialize Sentry if DSN is provided (never in tests). Integrations are listed
+# explicitly so Sentry doesn't import and patch every library it can find.
+if settings.SENTRY_DSN and settings.ENVIRONMENT != "test":
+    import sentry_sdk
+    from sentry_sdk.integrations.dedupe import DedupeIntegration
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+    
     sentry_sdk.init(
         dsn=settings.SENTRY_DSN,
         environment=settings.ENVIRONMENT,
-        traces_sample_rate=1.0 if settings.ENVIRONMENT == "development" else 0.1,
+        traces_sampler=_traces_sampler,
+        default_integrations=False,
+        auto_enabling_integrations=False,
+        integrations=[
+            StarletteIntegration(),
+            FastApiIntegration(),
+            LoggingIntegration(),
+            DedupeIntegration(),
+        ],
     )
 
 # Create FastAPI app
@@ -19,7 +48,8 @@ app = FastAPI(
     version=settings.VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -42,16 +72,21 @@ async def root():
     }
 
 
+# Encoded once; the same response is sent on every probe
+_HEALTH_RESPONSE = ORJSONResponse({"status": "healthy"})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 
-# Import and include API routers
-from app.api.v1 import auth, farms, claims, reports
-
+# Include API routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
 app.include_router(farms.router, prefix=f"{settings.API_V1_PREFIX}/farms", tags=["farms"])
 app.include_router(claims.router, prefix=f"{settings.API_V1_PREFIX}/claims", tags=["claims"])
 app.include_router(reports.router, prefix=f"{settings.API_V1_PREFIX}/reports", tags=["reports"])
+
+# Build the OpenAPI schema now, not on the first /docs visit
+app.openapi()
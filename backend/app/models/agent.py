@@ -1,10 +1,13 @@
 """Agent database model"""
 
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.sql import func
 import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
 from app.database import Base
-from app.core.types import UUID
+from app.core.types import UUID, uuid_generate_v7
 
 
 class Agent(Base):
@@ -12,11 +15,11 @@ class Agent(Base):
     
     __tablename__ = "agents"
     
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    phone_number = Column(String(15), unique=True, nullable=False, index=True)
-    name = Column(String(255), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    last_login = Column(DateTime(timezone=True), nullable=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, server_default=uuid_generate_v7())
+    phone_number: Mapped[str] = mapped_column(String(15), unique=True, index=True)
+    name: Mapped[Optional[str]] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     
     def __repr__(self):
         return f"<Agent(id={self.id}, phone_number={self.phone_number})>"
@@ -1,11 +1,19 @@
 """Claim database model"""
 
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Text, Numeric, JSON
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import String, DateTime, Float, ForeignKey, Text, Numeric, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 from app.database import Base
-from app.core.types import UUID
+from app.core.types import UUID, uuid_generate_v7
+
+if TYPE_CHECKING:
+    from app.models.agent import Agent
+    from app.models.farm import Farm
 
 
 class Claim(Base):
@@ -13,45 +21,89 @@ class Claim(Base):
     
     __tablename__ = "claims"
     
+    # Large columns (image_url, top_three_classes, verdict_explanation) are
+    # deferred in the 'detail' group; load them with undefer_group('detail')
+    
     # Primary fields
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    agent_id = Column(UUID, ForeignKey('agents.id', ondelete='SET NULL'), nullable=True, index=True)
-    farm_id = Column(UUID, ForeignKey('farms.id', ondelete='SET NULL'), nullable=True, index=True)
-    status = Column(String(50), nullable=False, index=True, default='pending')
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, server_default=uuid_generate_v7())
+    agent_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID, ForeignKey('agents.id', ondelete='SET NULL'))
+    farm_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID, ForeignKey('farms.id', ondelete='SET NULL'))
+    status: Mapped[str] = mapped_column(String(50), default='pending')
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    workflow_queued_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))  # set once processing is enqueued
     
     # Ground Truth fields
-    image_url = Column(Text, nullable=False)
-    ml_class = Column(String(50), nullable=False)
-    ml_confidence = Column(Float, nullable=False)
-    top_three_classes = Column(JSON, nullable=True)
-    device_tilt = Column(Float, nullable=True)
-    device_azimuth = Column(Float, nullable=True)
-    capture_gps_lat = Column(Numeric(precision=10, scale=8), nullable=True)
-    capture_gps_lng = Column(Numeric(precision=11, scale=8), nullable=True)
+    image_url: Mapped[str] = mapped_column(Text, deferred=True, deferred_group='detail')
+    ml_class: Mapped[str] = mapped_column(String(50))
+    ml_confidence: Mapped[float] = mapped_column(Float)
+    top_three_classes: Mapped[Optional[list]] = mapped_column(
+        JSON().with_variant(JSONB(), 'postgresql'), deferred=True, deferred_group='detail'
+    )
+    device_tilt: Mapped[Optional[float]] = mapped_column(Float)
+    device_azimuth: Mapped[Optional[float]] = mapped_column(Float)
+    capture_gps_lat: Mapped[Optional[float]] = mapped_column(Float)
+    capture_gps_lng: Mapped[Optional[float]] = mapped_column(Float)
     
     # Space Truth fields
-    ndmi_value = Column(Float, nullable=True)
-    ndmi_14day_avg = Column(Float, nullable=True)
-    satellite_verdict = Column(String(50), nullable=True)
-    observation_date = Column(DateTime(timezone=True), nullable=True)
-    cloud_cover_pct = Column(Float, nullable=True)
+    ndmi_value: Mapped[Optional[float]] = mapped_column(Float)
+    ndmi_14day_avg: Mapped[Optional[float]] = mapped_column(Float)
+    satellite_verdict: Mapped[Optional[str]] = mapped_column(String(50))
+    observation_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    cloud_cover_pct: Mapped[Optional[float]] = mapped_column(Float)
     
     # Final Verdict fields
-    weighted_score = Column(Float, nullable=True)
-    verdict_explanation = Column(Text, nullable=True)
-    ground_truth_confidence = Column(Float, nullable=True)
-    space_truth_confidence = Column(Float, nullable=True)
+    weighted_score: Mapped[Optional[float]] = mapped_column(Float)
+    verdict_explanation: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group='detail')
+    ground_truth_confidence: Mapped[Optional[float]] = mapped_column(Float)
+    space_truth_confidence: Mapped[Optional[float]] = mapped_column(Float)
     
     # Payment fields
-    payout_amount = Column(Numeric(precision=10, scale=2), nullable=True)
-    payout_status = Column(String(50), nullable=True)
-    payout_reference = Column(String(255), nullable=True)
+    payout_amount: Mapped[Optional[Decimal]] = mapped_column(Numeric(precision=10, scale=2))
+    payout_status: Mapped[Optional[str]] = mapped_column(String(50))
+    payout_reference: Mapped[Optional[str]] = mapped_column(String(255))
+    
+    # Report fields
+    pdf_hash: Mapped[Optional[str]] = mapped_column(String(32))  # content hash of the last rendered PDF report
     
     # Relationships
-    agent = relationship("Agent", backref="claims")
-    farm = relationship("Farm", backref="claims")
+    agent: Mapped[Optional["Agent"]] = relationship("Agent", backref="claims")
+    farm: Mapped[Optional["Farm"]] = relationship("Farm", backref="claims")
+    
+    # In Postgres the table is range-partitioned monthly on created_at, with a
+    # (id, created_at) primary key; see the partition_claims migration
+    __table_args__ = (
+        # Covering index for the claim list endpoint (filter by agent/status, newest first)
+        Index(
+            'ix_claims_list',
+            'agent_id',
+            'status',
+            created_at.desc(),
+            postgresql_include=['farm_id', 'ml_class', 'ml_confidence', 'payout_status', 'payout_amount']
+        ),
+        # Single-filter lists (and farm_id lookups), newest first
+        Index('ix_claims_agent_created', 'agent_id', created_at.desc()),
+        Index('ix_claims_status_created', 'status', created_at.desc()),
+        Index('ix_claims_farm_created', 'farm_id', created_at.desc()),
+        # Small partial indexes for the review and payout queues
+        Index(
+            'ix_claims_pending',
+            created_at.desc(),
+            postgresql_where=status.in_(['pending', 'flagged_for_review'])
+        ),
+        Index(
+            'ix_claims_payout_pending',
+            created_at.desc(),
+            postgresql_where=payout_status == 'pending'
+        ),
+        # Containment lookups on the ML predictions (top_three_classes @> ...)
+        Index(
+            'ix_claims_top3_gin',
+            top_three_classes,
+            postgresql_using='gin',
+            postgresql_ops={'top_three_classes': 'jsonb_path_ops'}
+        ),
+    )
     
     def __repr__(self):
         return f"<Claim(id={self.id}, status={self.status}, ml_class={self.ml_class})>"
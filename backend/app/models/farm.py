@@ -1,11 +1,16 @@
 """Farm database model"""
 
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Numeric
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 import uuid
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import String, DateTime, Float, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 from app.database import Base
-from app.core.types import UUID
+from app.core.types import UUID, uuid_generate_v7
+
+if TYPE_CHECKING:
+    from app.models.agent import Agent
 
 
 class Farm(Base):
@@ -13,19 +18,34 @@ class Farm(Base):
     
     __tablename__ = "farms"
     
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    farmer_name = Column(String(255), nullable=False)
-    farmer_id = Column(String(50), nullable=False, index=True)
-    phone_number = Column(String(15), nullable=False)
-    crop_type = Column(String(50), nullable=False)
-    gps_lat = Column(Numeric(precision=10, scale=8), nullable=False)
-    gps_lng = Column(Numeric(precision=11, scale=8), nullable=False)
-    gps_accuracy = Column(Float, nullable=True)
-    registered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    registered_by = Column(UUID, ForeignKey('agents.id', ondelete='SET NULL'), nullable=True, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, server_default=uuid_generate_v7())
+    farmer_name: Mapped[str] = mapped_column(String(255))
+    farmer_id: Mapped[str] = mapped_column(String(50))
+    phone_number: Mapped[str] = mapped_column(String(15))
+    crop_type: Mapped[str] = mapped_column(String(50))
+    gps_lat: Mapped[float] = mapped_column(Float)
+    gps_lng: Mapped[float] = mapped_column(Float)
+    gps_accuracy: Mapped[Optional[float]] = mapped_column(Float)
+    registered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    registered_by: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID, ForeignKey('agents.id', ondelete='SET NULL'), index=True
+    )
     
     # Relationship to agent
-    agent = relationship("Agent", backref="farms")
+    agent: Mapped[Optional["Agent"]] = relationship("Agent", backref="farms")
+    
+    __table_args__ = (
+        # Covering index for the farmer ID search, so it is answered by an
+        # index-only scan without visiting the table
+        Index(
+            'ix_farms_farmer_id_covering',
+            'farmer_id',
+            postgresql_include=[
+                'id', 'farmer_name', 'phone_number', 'crop_type', 'gps_lat', 'gps_lng',
+                'gps_accuracy', 'registered_at', 'registered_by'
+            ]
+        ),
+    )
     
     def __repr__(self):
         return f"<Farm(id={self.id}, farmer_name={self.farmer_name}, crop_type={self.crop_type})>"
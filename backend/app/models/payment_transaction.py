@@ -1,10 +1,14 @@
 """Payment transaction database model"""
 
-from sqlalchemy import Column, String, DateTime, Numeric, Text
-from sqlalchemy.sql import func
 import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import String, DateTime, Numeric, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
 from app.database import Base
-from app.core.types import UUID
+from app.core.types import UUID, uuid_generate_v7
 
 
 class PaymentTransactionModel(Base):
@@ -12,14 +16,14 @@ class PaymentTransactionModel(Base):
     
     __tablename__ = "payment_transactions"
     
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    transaction_id = Column(String(50), unique=True, nullable=False, index=True)
-    claim_id = Column(UUID, nullable=False, index=True)
-    phone_number = Column(String(15), nullable=False)
-    amount = Column(Numeric(precision=10, scale=2), nullable=False)
-    status = Column(String(50), nullable=False)  # completed, failed, pending
-    message = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, server_default=uuid_generate_v7())
+    transaction_id: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    claim_id: Mapped[uuid.UUID] = mapped_column(UUID, index=True)
+    phone_number: Mapped[str] = mapped_column(String(15))
+    amount: Mapped[Decimal] = mapped_column(Numeric(precision=10, scale=2))
+    status: Mapped[str] = mapped_column(String(50))  # completed, failed, pending
+    message: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     def __repr__(self):
         return f"<PaymentTransaction(id={self.id}, transaction_id={self.transaction_id}, status={self.status})>"
@@ -0,0 +1,23 @@
+"""Phone number normalization shared by the schemas"""
+
+import re
+
+# Compiled once; validators run on every auth request
+_PHONE_STRIP = re.compile(r'[^\d+]')
+_PHONE_E164 = re.compile(r'^\+?[1-9]\d{9,14}$')
+
+
+def normalize_phone(v: str) -> str:
+    """Strip formatting from a phone number and return it in E.164 form"""
+    # Remove spaces and special characters
+    cleaned = _PHONE_STRIP.sub('', v)
+    
+    # Check if it's a valid format (optional + and 10-15 digits)
+    if not _PHONE_E164.match(cleaned):
+        raise ValueError("Invalid phone number format. Must be in E.164 format (e.g., +254712345678)")
+    
+    # Ensure it starts with +
+    if not cleaned.startswith('+'):
+        cleaned = '+' + cleaned
+    
+    return cleaned
@@ -3,7 +3,7 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from uuid import UUID
-import re
+from app.schemas._phone import normalize_phone
 
 
 class AgentBase(BaseModel):
@@ -14,18 +14,7 @@ class AgentBase(BaseModel):
     @classmethod
     def validate_phone_number(cls, v: str) -> str:
         """Validate phone number format"""
-        # Remove spaces and special characters
-        cleaned = re.sub(r'[^\d+]', '', v)
-        
-        # Check if it's a valid format (starts with + and has 10-15 digits)
-        if not re.match(r'^\+?[1-9]\d{9,14}$', cleaned):
-            raise ValueError("Invalid phone number format. Must be in E.164 format (e.g., +254712345678)")
-        
-        # Ensure it starts with +
-        if not cleaned.startswith('+'):
-            cleaned = '+' + cleaned
-            
-        return cleaned
+        return normalize_phone(v)
 
 
 class AgentCreate(AgentBase):
@@ -1,7 +1,7 @@
 """Authentication Pydantic schemas"""
 
-from pydantic import BaseModel, Field, field_validator
-import re
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from app.schemas._phone import normalize_phone
 
 
 class SendOTPRequest(BaseModel):
@@ -12,12 +12,7 @@ class SendOTPRequest(BaseModel):
     @classmethod
     def validate_phone_number(cls, v: str) -> str:
         """Validate phone number format"""
-        cleaned = re.sub(r'[^\d+]', '', v)
-        if not re.match(r'^\+?[1-9]\d{9,14}$', cleaned):
-            raise ValueError("Invalid phone number format")
-        if not cleaned.startswith('+'):
-            cleaned = '+' + cleaned
-        return cleaned
+        return normalize_phone(v)
 
 
 class SendOTPResponse(BaseModel):
@@ -35,12 +30,7 @@ class VerifyOTPRequest(BaseModel):
     @classmethod
     def validate_phone_number(cls, v: str) -> str:
         """Validate phone number format"""
-        cleaned = re.sub(r'[^\d+]', '', v)
-        if not re.match(r'^\+?[1-9]\d{9,14}$', cleaned):
-            raise ValueError("Invalid phone number format")
-        if not cleaned.startswith('+'):
-            cleaned = '+' + cleaned
-        return cleaned
+        return normalize_phone(v)
 
 
 class TokenResponse(BaseModel):
@@ -58,6 +48,8 @@ class RefreshTokenRequest(BaseModel):
 
 class TokenPayload(BaseModel):
     """Schema for JWT token payload"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     sub: str  # subject (agent_id)
     exp: int  # expiration time
     type: str  # token type (access or refresh)
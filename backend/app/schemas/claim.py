@@ -1,11 +1,15 @@
 """Claim Pydantic schemas"""
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import Base64Bytes, BaseModel, ConfigDict, Field, PlainSerializer, computed_field, field_validator
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
 from enum import Enum
-from typing import List, Tuple
+from typing import Annotated, Dict, List, Tuple
+
+
+# Payout amounts are Decimal internally but sent to clients as JSON numbers
+PayoutAmount = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
 
 
 class CropCondition(str, Enum):
@@ -27,6 +31,21 @@ class ClaimStatus(str, Enum):
     PAID = "paid"
 
 
+# Stored value -> member, for converting trusted values read from the database
+_CROP_CONDITIONS = CropCondition._value2member_map_
+_CLAIM_STATUSES = ClaimStatus._value2member_map_
+
+
+def top_three_from_db(value) -> List[Tuple[CropCondition, float]]:
+    """
+    Convert stored top_three_classes ([[label, score], ...]) to enum tuples
+    
+    The stored labels were validated on write, so this is a plain member
+    lookup rather than Pydantic validation.
+    """
+    return [(_CROP_CONDITIONS[label], score) for label, score in (value or [])]
+
+
 class SatelliteVerdict(str, Enum):
     """Satellite moisture assessment verdict"""
     SEVERE_STRESS = "severe_stress"
@@ -34,19 +53,27 @@ class SatelliteVerdict(str, Enum):
     NORMAL = "normal"
 
 
+_SATELLITE_VERDICTS = SatelliteVerdict._value2member_map_
+
+
 class GroundTruthData(BaseModel):
     """Ground Truth data collected at the farm"""
+    # Parsed from client requests, which may carry extra keys
+    model_config = ConfigDict(frozen=True)
+    
     ml_class: CropCondition = Field(..., description="ML classification result")
     ml_confidence: float = Field(..., ge=0, le=1, description="ML confidence score")
     top_three_classes: List[Tuple[CropCondition, float]] = Field(..., description="Top 3 predicted classes with confidence scores")
     device_tilt: float | None = Field(None, description="Device tilt angle in degrees")
     device_azimuth: float | None = Field(None, description="Device azimuth bearing")
-    capture_gps_lat: Decimal | None = Field(None, ge=-90, le=90, description="GPS latitude at capture")
-    capture_gps_lng: Decimal | None = Field(None, ge=-180, le=180, description="GPS longitude at capture")
+    capture_gps_lat: float | None = Field(None, ge=-90, le=90, description="GPS latitude at capture")
+    capture_gps_lng: float | None = Field(None, ge=-180, le=180, description="GPS longitude at capture")
 
 
 class SpaceTruthData(BaseModel):
     """Space Truth data from satellite imagery"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     ndmi_value: float = Field(..., description="Current NDMI value")
     ndmi_14day_avg: float = Field(..., description="14-day average NDMI")
     satellite_verdict: SatelliteVerdict = Field(..., description="Satellite assessment verdict")
@@ -56,6 +83,8 @@ class SpaceTruthData(BaseModel):
 
 class WeightedVerificationResult(BaseModel):
     """Weighted verification algorithm result"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     weighted_score: float = Field(..., ge=0, le=1, description="Final weighted score")
     status: ClaimStatus = Field(..., description="Claim status decision")
     verdict_explanation: str = Field(..., description="Human-readable explanation")
@@ -63,18 +92,34 @@ class WeightedVerificationResult(BaseModel):
     space_truth_confidence: float = Field(..., ge=0, le=1, description="Space Truth confidence")
 
 
-class ClaimCreate(BaseModel):
-    """Schema for creating a claim"""
+class ClaimInitiate(BaseModel):
+    """Schema for starting a claim whose image is uploaded directly to storage"""
     agent_id: UUID = Field(..., description="Agent who submitted the claim")
     farm_id: UUID = Field(..., description="Farm associated with the claim")
     ground_truth: GroundTruthData = Field(..., description="Ground Truth data")
-    image_data: str = Field(..., description="Base64 encoded image data")
+
+
+class ClaimCreate(ClaimInitiate):
+    """Schema for creating a claim"""
+    image_data: Base64Bytes = Field(..., description="Base64 encoded image data")
+    
+    @field_validator("image_data", mode="before")
+    @classmethod
+    def strip_data_url(cls, v):
+        """Reject short payloads before decoding and drop any data URL prefix"""
+        if isinstance(v, (str, bytes)):
+            if len(v) < 100:
+                raise ValueError("Image data is required and must be valid")
+            _, sep, data = v.partition("," if isinstance(v, str) else b",")
+            if sep:
+                return data
+        return v
     
     @field_validator("image_data")
     @classmethod
-    def validate_image_data(cls, v: str) -> str:
-        """Validate image data is not empty"""
-        if not v or len(v) < 100:
+    def validate_image_data(cls, v: bytes) -> bytes:
+        """Validate the decoded image is not empty"""
+        if len(v) < 75:
             raise ValueError("Image data is required and must be valid")
         return v
 
@@ -105,8 +150,8 @@ class ClaimInDB(BaseModel):
     top_three_classes: dict | None
     device_tilt: float | None
     device_azimuth: float | None
-    capture_gps_lat: Decimal | None
-    capture_gps_lng: Decimal | None
+    capture_gps_lat: float | None
+    capture_gps_lng: float | None
     
     # Space Truth
     ndmi_value: float | None
@@ -150,7 +195,7 @@ class ClaimResponse(BaseModel):
     verification_result: WeightedVerificationResult | None = None
     
     # Payment
-    payout_amount: Decimal | None = None
+    payout_amount: PayoutAmount | None = None
     payout_status: str | None = None
     payout_reference: str | None = None
     
@@ -160,53 +205,61 @@ class ClaimResponse(BaseModel):
     @classmethod
     def from_orm_model(cls, claim) -> "ClaimResponse":
         """Create ClaimResponse from ORM model"""
-        # Build Ground Truth
-        ground_truth = GroundTruthData(
-            ml_class=CropCondition(claim.ml_class),
-            ml_confidence=claim.ml_confidence,
-            top_three_classes=claim.top_three_classes or [],
-            device_tilt=claim.device_tilt,
-            device_azimuth=claim.device_azimuth,
-            capture_gps_lat=claim.capture_gps_lat,
-            capture_gps_lng=claim.capture_gps_lng
+        # Claim models expose the same attributes as list rows
+        return cls.from_row(claim)
+    
+    @classmethod
+    def from_row(cls, row) -> "ClaimResponse":
+        """
+        Build ClaimResponse from a claim row or model without re-validation
+        
+        Values come straight from the database, so ``model_construct`` is used
+        throughout to skip per-field validation of the nested models.
+        """
+        ground_truth = GroundTruthData.model_construct(
+            ml_class=_CROP_CONDITIONS[row.ml_class],
+            ml_confidence=row.ml_confidence,
+            top_three_classes=top_three_from_db(row.top_three_classes),
+            device_tilt=row.device_tilt,
+            device_azimuth=row.device_azimuth,
+            capture_gps_lat=row.capture_gps_lat,
+            capture_gps_lng=row.capture_gps_lng
         )
         
-        # Build Space Truth if available
         space_truth = None
-        if claim.ndmi_value is not None:
-            space_truth = SpaceTruthData(
-                ndmi_value=claim.ndmi_value,
-                ndmi_14day_avg=claim.ndmi_14day_avg,
-                satellite_verdict=SatelliteVerdict(claim.satellite_verdict),
-                observation_date=claim.observation_date,
-                cloud_cover_pct=claim.cloud_cover_pct
+        if row.ndmi_value is not None:
+            space_truth = SpaceTruthData.model_construct(
+                ndmi_value=row.ndmi_value,
+                ndmi_14day_avg=row.ndmi_14day_avg,
+                satellite_verdict=_SATELLITE_VERDICTS[row.satellite_verdict],
+                observation_date=row.observation_date,
+                cloud_cover_pct=row.cloud_cover_pct
             )
         
-        # Build Verification Result if available
         verification_result = None
-        if claim.weighted_score is not None:
-            verification_result = WeightedVerificationResult(
-                weighted_score=claim.weighted_score,
-                status=ClaimStatus(claim.status),
-                verdict_explanation=claim.verdict_explanation or "",
-                ground_truth_confidence=claim.ground_truth_confidence or 0.0,
-                space_truth_confidence=claim.space_truth_confidence or 0.0
+        if row.weighted_score is not None:
+            verification_result = WeightedVerificationResult.model_construct(
+                weighted_score=row.weighted_score,
+                status=_CLAIM_STATUSES[row.status],
+                verdict_explanation=row.verdict_explanation or "",
+                ground_truth_confidence=row.ground_truth_confidence or 0.0,
+                space_truth_confidence=row.space_truth_confidence or 0.0
             )
         
-        return cls(
-            id=claim.id,
-            agent_id=claim.agent_id,
-            farm_id=claim.farm_id,
-            status=ClaimStatus(claim.status),
-            created_at=claim.created_at,
-            updated_at=claim.updated_at,
-            image_url=claim.image_url,
+        return cls.model_construct(
+            id=row.id,
+            agent_id=row.agent_id,
+            farm_id=row.farm_id,
+            status=_CLAIM_STATUSES[row.status],
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            image_url=row.image_url,
             ground_truth=ground_truth,
             space_truth=space_truth,
             verification_result=verification_result,
-            payout_amount=claim.payout_amount,
-            payout_status=claim.payout_status,
-            payout_reference=claim.payout_reference
+            payout_amount=row.payout_amount,
+            payout_status=row.payout_status,
+            payout_reference=row.payout_reference
         )
 
 
@@ -217,10 +270,24 @@ class ClaimCreateResponse(BaseModel):
     message: str = Field(..., description="Response message")
 
 
+class ClaimInitiateResponse(BaseModel):
+    """Schema for claim initiation response"""
+    claim_id: UUID = Field(..., description="Unique claim identifier")
+    upload_url: str = Field(..., description="URL to POST the claim image to")
+    fields: Dict[str, str] = Field(..., description="Form fields to send with the image")
+    expires_in: int = Field(..., description="Seconds until the upload URL expires")
+
+
 class ClaimListResponse(BaseModel):
     """Schema for paginated claim list response"""
     claims: List[ClaimResponse]
     total: int
     page: int
     page_size: int
-    total_pages: int
+    next_cursor: str | None = None
+    
+    @computed_field
+    @property
+    def total_pages(self) -> int:
+        """Number of pages of page_size claims needed for total"""
+        return -(-self.total // self.page_size) if self.page_size else 0
@@ -1,9 +1,8 @@
 """Farm Pydantic schemas"""
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from uuid import UUID
-from decimal import Decimal
 from enum import Enum
 
 
@@ -39,8 +38,11 @@ class FarmBase(BaseModel):
 
 class GPSCoordinates(BaseModel):
     """GPS coordinates with accuracy"""
-    lat: Decimal = Field(..., ge=-90, le=90, description="Latitude in decimal degrees")
-    lng: Decimal = Field(..., ge=-180, le=180, description="Longitude in decimal degrees")
+    # Parsed from client requests, which may carry extra keys
+    model_config = ConfigDict(frozen=True)
+    
+    lat: float = Field(..., ge=-90, le=90, description="Latitude in decimal degrees")
+    lng: float = Field(..., ge=-180, le=180, description="Longitude in decimal degrees")
     accuracy: float | None = Field(None, gt=0, description="GPS accuracy in meters")
     
     @field_validator("accuracy")
@@ -69,8 +71,8 @@ class FarmUpdate(BaseModel):
 class FarmInDB(FarmBase):
     """Schema for farm in database"""
     id: UUID
-    gps_lat: Decimal
-    gps_lng: Decimal
+    gps_lat: float
+    gps_lng: float
     gps_accuracy: float | None
     registered_at: datetime
     registered_by: UUID | None
@@ -111,9 +113,29 @@ class FarmResponse(BaseModel):
             registered_by=farm.registered_by
         )
 
+    
+    @classmethod
+    def from_row(cls, row) -> "FarmResponse":
+        """Build FarmResponse from a column-only farm row without re-validation"""
+        return cls.model_construct(
+            id=row.id,
+            farmer_name=row.farmer_name,
+            farmer_id=row.farmer_id,
+            phone_number=row.phone_number,
+            crop_type=CropType(row.crop_type),
+            gps_coordinates=GPSCoordinates.model_construct(
+                lat=row.gps_lat,
+                lng=row.gps_lng,
+                accuracy=row.gps_accuracy
+            ),
+            registered_at=row.registered_at,
+            registered_by=row.registered_by
+        )
 
 class GPSValidationWarning(BaseModel):
     """GPS validation warning"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     warning: str
     accuracy: float
     threshold: float
@@ -1,6 +1,6 @@
 """Verification schemas for weighted algorithm"""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from datetime import datetime
 from typing import List, Tuple, Optional
@@ -40,6 +40,8 @@ class GroundTruth(BaseModel):
 
 class WeightedVerificationResult(BaseModel):
     """Result of weighted verification algorithm"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     score: float = Field(..., ge=0.0, le=1.0)
     status: ClaimStatus
     explanation: str
@@ -1,28 +1,56 @@
 """Authentication service"""
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID
+import asyncio
+import threading
+import time
+import orjson
+import redis
 from app.models.agent import Agent
 from app.services.otp_service import otp_service
 from app.services.sms_service import sms_service
-from app.core.security import create_access_token, create_refresh_token, verify_token
+from app.core.security import (
+    ACCESS_TOKEN_EXPIRE_SECONDS,
+    create_access_token,
+    create_refresh_token,
+    verify_token
+)
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Every process keeps recently used agents in memory (L1) in front of the shared
+# Redis cache (L2). Changes are published on this channel so each process drops
+# its copy; the short L1 TTL bounds staleness if the listener is disconnected.
+AGENT_INVALIDATION_CHANNEL = "auth:agent:invalidate"
+LOCAL_AGENT_CACHE_TTL_SECONDS = 30
+LOCAL_AGENT_CACHE_MAX_SIZE = 10000
+INVALIDATION_RETRY_SECONDS = 5
+
 
 class AuthService:
     """Service for authentication operations"""
     
+    def __init__(self):
+        """Initialize auth service with Redis connection for the agent cache"""
+        self.redis_client = redis.from_url(settings.REDIS_URL)
+        self.agent_cache_ttl_seconds = 300
+        self._local_agents: dict[UUID, tuple[dict[str, Any], float]] = {}
+        self._local_agents_lock = threading.Lock()
+        self._listener_started = False
+    
     async def send_otp(self, phone_number: str, db: Session) -> dict:
         """Generate and send OTP to phone number"""
         # Generate OTP
         otp = otp_service.generate_otp()
         
-        # Store OTP in Redis
-        otp_service.store_otp(phone_number, otp)
+        # Store OTP in Redis (blocking client, so off the event loop)
+        await asyncio.to_thread(otp_service.store_otp, phone_number, otp)
         
         # Send OTP via SMS
         sms_sent = await sms_service.send_otp(phone_number, otp)
@@ -41,35 +69,23 @@ class AuthService:
     
     async def verify_otp(self, phone_number: str, otp: str, db: Session) -> dict:
         """Verify OTP and return tokens"""
-        # Verify OTP
-        is_valid = otp_service.verify_otp(phone_number, otp)
+        # Verify OTP (Redis and database calls block, so they run in a thread)
+        is_valid = await asyncio.to_thread(otp_service.verify_otp, phone_number, otp)
         
         if not is_valid:
             raise ValueError("Invalid or expired OTP")
         
-        # Get or create agent
-        agent = db.query(Agent).filter(Agent.phone_number == phone_number).first()
-        
-        if not agent:
-            # Create new agent
-            agent = Agent(phone_number=phone_number)
-            db.add(agent)
-            db.commit()
-            db.refresh(agent)
-        
-        # Update last login
-        agent.last_login = datetime.utcnow()
-        db.commit()
+        agent_id = await asyncio.to_thread(self._record_login, phone_number, db)
         
         # Generate tokens
-        access_token = create_access_token(subject=str(agent.id))
-        refresh_token = create_refresh_token(subject=str(agent.id))
+        access_token = create_access_token(subject=agent_id)
+        refresh_token = create_refresh_token(subject=agent_id)
         
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
             "token_type": "bearer",
-            "expires_in": settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            "expires_in": ACCESS_TOKEN_EXPIRE_SECONDS
         }
     
     async def refresh_access_token(self, refresh_token: str, db: Session) -> dict:
@@ -81,20 +97,48 @@ class AuthService:
             raise ValueError("Invalid or expired refresh token")
         
         # Verify agent exists
-        agent = db.query(Agent).filter(Agent.id == UUID(agent_id)).first()
+        agent = await asyncio.to_thread(self._find_agent, agent_id, db)
         
         if not agent:
             raise ValueError("Agent not found")
         
         # Generate new access token
-        access_token = create_access_token(subject=str(agent.id))
+        access_token = create_access_token(subject=agent.id)
         
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "expires_in": settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            "expires_in": ACCESS_TOKEN_EXPIRE_SECONDS
         }
     
+    def _record_login(self, phone_number: str, db: Session) -> UUID:
+        """Get or create the agent for a phone number, record the login and return its ID"""
+        now = datetime.now(timezone.utc)
+        
+        # Update last login without loading the agent first
+        agent_id = db.execute(
+            update(Agent)
+            .where(Agent.phone_number == phone_number)
+            .values(last_login=now)
+            .returning(Agent.id)
+        ).scalar_one_or_none()
+        
+        if agent_id is None:
+            # Create new agent
+            agent = Agent(phone_number=phone_number, last_login=now)
+            db.add(agent)
+            db.flush()
+            agent_id = agent.id
+        
+        db.commit()
+        self._invalidate_cached_agent(agent_id)
+        
+        return agent_id
+    
+    def _find_agent(self, agent_id: UUID, db: Session) -> Agent | None:
+        """Look up an agent by ID"""
+        return db.query(Agent).filter(Agent.id == agent_id).first()
+    
     def get_current_agent(self, token: str, db: Session) -> Agent:
         """Get current authenticated agent from token"""
         # Verify access token
@@ -103,13 +147,143 @@ class AuthService:
         if not agent_id:
             raise ValueError("Invalid or expired token")
         
+        # Serve from cache to skip the agents lookup on every request
+        agent = self._get_cached_agent(agent_id)
+        if agent:
+            return agent
+        
         # Get agent
-        agent = db.query(Agent).filter(Agent.id == UUID(agent_id)).first()
+        agent = db.query(Agent).filter(Agent.id == agent_id).first()
         
         if not agent:
             raise ValueError("Agent not found")
         
+        self._cache_agent(agent)
         return agent
+    
+    def _agent_cache_key(self, agent_id: UUID) -> str:
+        """Redis key for a cached agent"""
+        return f"auth:agent:{agent_id}"
+    
+    def _get_cached_agent(self, agent_id: UUID) -> Agent | None:
+        """
+        Load an agent from the in-process cache, then from Redis
+        
+        Returns a detached Agent, or None on a miss or if Redis is unavailable.
+        """
+        now = time.monotonic()
+        with self._local_agents_lock:
+            local = self._local_agents.get(agent_id)
+        if local is not None and now < local[1]:
+            return Agent(**local[0])
+        
+        try:
+            cached = self.redis_client.get(self._agent_cache_key(agent_id))
+        except redis.RedisError as e:
+            logger.warning(f"Agent cache unavailable: {str(e)}")
+            return None
+        
+        if cached is None:
+            return None
+        
+        fields = self._agent_fields_from_json(agent_id, cached)
+        self._cache_agent_locally(agent_id, fields)
+        return Agent(**fields)
+    
+    def _cache_agent(self, agent: Agent) -> None:
+        """Store an agent in the in-process and Redis caches"""
+        fields = {
+            "id": agent.id,
+            "phone_number": agent.phone_number,
+            "name": agent.name,
+            "created_at": agent.created_at,
+            "last_login": agent.last_login
+        }
+        self._cache_agent_locally(agent.id, fields)
+        try:
+            self.redis_client.setex(
+                self._agent_cache_key(agent.id),
+                self.agent_cache_ttl_seconds,
+                orjson.dumps(fields)
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Agent cache unavailable: {str(e)}")
+    
+    def _invalidate_cached_agent(self, agent_id: UUID) -> None:
+        """Drop an agent from the caches of every process after it changes"""
+        self._drop_local_agent(agent_id)
+        try:
+            self.redis_client.delete(self._agent_cache_key(agent_id))
+            self.redis_client.publish(AGENT_INVALIDATION_CHANNEL, str(agent_id))
+        except redis.RedisError as e:
+            logger.warning(f"Agent cache unavailable: {str(e)}")
+    
+    def _agent_fields_from_json(self, agent_id: UUID, cached: bytes) -> dict[str, Any]:
+        """Parse an agent cached in Redis into Agent constructor arguments"""
+        data = orjson.loads(cached)
+        return {
+            # Already a UUID from the verified token; no need to parse data["id"]
+            "id": agent_id,
+            "phone_number": data["phone_number"],
+            "name": data["name"],
+            "created_at": datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+            "last_login": datetime.fromisoformat(data["last_login"]) if data["last_login"] else None
+        }
+    
+    def _cache_agent_locally(self, agent_id: UUID, fields: dict[str, Any]) -> None:
+        """Keep parsed agent fields in this process, so local hits build the Agent directly"""
+        self._start_invalidation_listener()
+        expires_at = time.monotonic() + LOCAL_AGENT_CACHE_TTL_SECONDS
+        with self._local_agents_lock:
+            self._local_agents.pop(agent_id, None)
+            self._local_agents[agent_id] = (fields, expires_at)
+            if len(self._local_agents) > LOCAL_AGENT_CACHE_MAX_SIZE:
+                # Dicts keep insertion order, so this is the least recently stored
+                del self._local_agents[next(iter(self._local_agents))]
+    
+    def _drop_local_agent(self, agent_id: UUID) -> None:
+        """Forget an agent cached in this process"""
+        with self._local_agents_lock:
+            self._local_agents.pop(agent_id, None)
+    
+    def _start_invalidation_listener(self) -> None:
+        """Start listening for invalidations from other processes (once)"""
+        if self._listener_started:
+            return
+        with self._local_agents_lock:
+            if self._listener_started:
+                return
+            self._listener_started = True
+        threading.Thread(
+            target=self._listen_for_invalidations,
+            name="agent-cache-invalidation",
+            daemon=True
+        ).start()
+    
+    def _listen_for_invalidations(self) -> None:
+        """Drop local agents as invalidations arrive, reconnecting on errors"""
+        # A dedicated connection: pub/sub blocks it for the life of the process
+        client = redis.from_url(settings.REDIS_URL)
+        connected = True
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(AGENT_INVALIDATION_CHANNEL)
+                connected = True
+                for message in pubsub.listen():
+                    try:
+                        self._drop_local_agent(UUID(message["data"].decode()))
+                    except ValueError:
+                        continue
+            except redis.RedisError as e:
+                if connected:
+                    logger.warning(f"Agent cache invalidation listener disconnected: {str(e)}")
+                connected = False
+            
+            # Invalidations may have been missed while disconnected
+            with self._local_agents_lock:
+                self._local_agents.clear()
+            time.sleep(INVALIDATION_RETRY_SECONDS)
 
 
 # Singleton instance
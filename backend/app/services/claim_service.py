@@ -1,21 +1,42 @@
 """Claim service for business logic"""
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload, undefer_group
+from sqlalchemy import and_, delete, or_, func, select, text, tuple_, update
+from sqlalchemy.engine import Row
 from uuid import UUID
+from datetime import datetime
 from typing import List, Optional, Tuple
+import base64
 from app.models.claim import Claim
 from app.models.farm import Farm
 from app.models.agent import Agent
 from app.schemas.claim import (
     ClaimCreate,
+    ClaimInitiate,
+    ClaimInitiateResponse,
     ClaimUpdate,
     ClaimResponse,
     ClaimCreateResponse,
     ClaimStatus,
     ClaimListResponse
 )
-from app.services.storage_service import storage_service
+from app.services.storage_service import storage_service, IMAGE_UPLOAD_EXPIRES_SECONDS
+from app.services.http_cache_service import http_cache_service
+
+
+def encode_claim_cursor(created_at: datetime, claim_id: UUID) -> str:
+    """Encode a claim list position as an opaque URL-safe cursor"""
+    raw = f"{created_at.isoformat()}|{claim_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_claim_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_claim_cursor"""
+    try:
+        created_at, claim_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(claim_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
 
 
 class ClaimService:
@@ -32,6 +53,52 @@ class ClaimService:
         Returns:
             ClaimCreateResponse with claim_id
         """
+        claim = self._new_claim(claim_data, db)
+        
+        # Commit before uploading so no transaction (or pooled connection) is
+        # held open for the duration of the upload
+        db.add(claim)
+        db.flush()
+        claim_id = claim.id
+        db.commit()
+        
+        # Upload image
+        try:
+            image_url = storage_service.upload_claim_image(
+                claim_data.image_data,
+                claim_id
+            )
+        except Exception as e:
+            db.execute(delete(Claim).where(Claim.id == claim_id))
+            db.commit()
+            raise RuntimeError(f"Failed to upload image: {str(e)}")
+        
+        # The caller enqueues processing straight away
+        db.execute(
+            update(Claim)
+            .where(Claim.id == claim_id)
+            .values(image_url=image_url, workflow_queued_at=func.now())
+        )
+        db.commit()
+        http_cache_service.invalidate_claim(claim_id)
+        
+        return ClaimCreateResponse(
+            claim_id=claim_id,
+            status=ClaimStatus.PENDING,
+            message="Claim submitted successfully. Processing will begin shortly."
+        )
+    
+    def _new_claim(self, claim_data: ClaimInitiate, db: Session) -> Claim:
+        """
+        Build a pending claim after checking its agent and farm exist
+        
+        Args:
+            claim_data: Claim data (image not included)
+            db: Database session
+            
+        Returns:
+            Unsaved Claim model
+        """
         # Verify agent exists
         agent = db.query(Agent).filter(Agent.id == claim_data.agent_id).first()
         if not agent:
@@ -59,42 +126,114 @@ class ClaimService:
             image_url=""  # Will be updated after upload
         )
         
+        return claim
+    
+    def initiate_claim(self, claim_data: ClaimInitiate, db: Session) -> ClaimInitiateResponse:
+        """
+        Create a claim whose image the client uploads directly to storage
+        
+        Args:
+            claim_data: Claim data (image not included)
+            db: Database session
+            
+        Returns:
+            ClaimInitiateResponse with claim_id and pre-signed upload form
+        """
+        claim = self._new_claim(claim_data, db)
+        
         # Add to database to get ID
         db.add(claim)
         db.flush()
         
-        # Upload image
         try:
-            image_url = storage_service.upload_claim_image(
-                claim_data.image_data,
-                claim.id
-            )
-            claim.image_url = image_url
-        except Exception as e:
+            upload_url, fields, image_url = storage_service.create_claim_image_upload(claim.id)
+        except RuntimeError:
             db.rollback()
-            raise RuntimeError(f"Failed to upload image: {str(e)}")
+            raise
         
+        claim.image_url = image_url
         db.commit()
-        db.refresh(claim)
         
-        return ClaimCreateResponse(
+        return ClaimInitiateResponse(
             claim_id=claim.id,
-            status=ClaimStatus.PENDING,
-            message="Claim submitted successfully. Processing will begin shortly."
+            upload_url=upload_url,
+            fields=fields,
+            expires_in=IMAGE_UPLOAD_EXPIRES_SECONDS
         )
     
-    def get_claim_by_id(self, claim_id: UUID, db: Session) -> Optional[Claim]:
+    def confirm_image_upload(self, claim_id: UUID, db: Session) -> Optional[Row]:
+        """
+        Check the image of an initiated claim has been uploaded and mark it queued
+        
+        Only a pending claim that hasn't been queued yet is accepted, and it is
+        marked in one conditional UPDATE, so a repeated or concurrent
+        confirmation can't start processing (and payment) a second time.
+        
+        Args:
+            claim_id: Claim UUID
+            db: Database session
+            
+        Returns:
+            Claim row (id, status) or None if not found
+            
+        Raises:
+            ValueError: If the image is missing or the claim is already queued
+        """
+        claim = self.get_claim_by_id(claim_id, db)
+        if not claim:
+            return None
+        
+        if claim.status != ClaimStatus.PENDING.value or claim.workflow_queued_at is not None:
+            raise ValueError(f"Claim {claim_id} is already being processed")
+        
+        if not claim.image_url or not storage_service.image_exists(claim.image_url):
+            raise ValueError(f"Image for claim {claim_id} has not been uploaded")
+        
+        row = db.execute(
+            update(Claim)
+            .where(
+                Claim.id == claim_id,
+                Claim.status == ClaimStatus.PENDING.value,
+                Claim.workflow_queued_at.is_(None)
+            )
+            .values(workflow_queued_at=func.now())
+            .returning(Claim.id, Claim.status)
+        ).first()
+        db.commit()
+        
+        if row is None:
+            raise ValueError(f"Claim {claim_id} is already being processed")
+        
+        http_cache_service.invalidate_claim(claim_id)
+        
+        return row
+    
+    def get_claim_by_id(
+        self,
+        claim_id: UUID,
+        db: Session,
+        detail: bool = True,
+        with_farm: bool = False
+    ) -> Optional[Claim]:
         """
         Get claim by ID
         
         Args:
             claim_id: Claim UUID
             db: Database session
+            detail: Also load the large deferred columns in the same query
+                (image_url, top_three_classes, verdict_explanation)
+            with_farm: Join the claim's farm into the same query
             
         Returns:
             Claim model or None if not found
         """
-        return db.query(Claim).filter(Claim.id == claim_id).first()
+        query = db.query(Claim).filter(Claim.id == claim_id)
+        if detail:
+            query = query.options(undefer_group('detail'))
+        if with_farm:
+            query = query.options(joinedload(Claim.farm))
+        return query.first()
     
     def get_claims(
         self,
@@ -102,23 +241,31 @@ class ClaimService:
         agent_id: Optional[UUID] = None,
         status: Optional[str] = None,
         page: int = 1,
-        page_size: int = 20
-    ) -> Tuple[List[Claim], int]:
+        page_size: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Row], int, Optional[str]]:
         """
         Get claims with optional filtering and pagination
         
+        Without a cursor, pages by OFFSET and computes the exact total in the
+        same round-trip with a ``count(*) OVER ()`` window. With a cursor, seeks
+        past the previous page on ``(created_at, id)`` so deep pages cost the
+        same as the first, and the total is the planner's row estimate.
+        
         Args:
             db: Database session
             agent_id: Filter by agent ID
             status: Filter by status
-            page: Page number (1-indexed)
+            page: Page number (1-indexed), used when no cursor is given
             page_size: Number of items per page
+            cursor: Opaque cursor from a previous page's next_cursor
             
         Returns:
-            Tuple of (claims list, total count)
+            Tuple of (claim rows, total count, next page cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = db.query(Claim)
-        
         # Apply filters
         filters = []
         if agent_id:
@@ -126,19 +273,73 @@ class ClaimService:
         if status:
             filters.append(Claim.status == status)
         
-        if filters:
-            query = query.filter(and_(*filters))
+        order_by = (Claim.created_at.desc(), Claim.id.desc())
         
-        # Get total count
-        total = query.count()
+        if cursor:
+            cursor_created_at, cursor_id = decode_claim_cursor(cursor)
+            seek = tuple_(Claim.created_at, Claim.id) < tuple_(
+                cursor_created_at, cursor_id, types=[Claim.created_at.type, Claim.id.type]
+            )
+            stmt = (
+                select(*Claim.__table__.columns)
+                .where(and_(*filters, seek))
+                .order_by(*order_by)
+                .limit(page_size + 1)
+            )
+            rows = db.execute(stmt).all()
+            total = self._estimate_claim_count(filters, db)
+        else:
+            stmt = select(*Claim.__table__.columns, func.count().over().label("total"))
+            if filters:
+                stmt = stmt.where(and_(*filters))
+            
+            # Apply pagination
+            offset = (page - 1) * page_size
+            stmt = stmt.order_by(*order_by).offset(offset).limit(page_size + 1)
+            rows = db.execute(stmt).all()
+            
+            if rows:
+                total = rows[0].total
+            elif offset:
+                # Page past the end: the window has no rows to report the total on
+                total = self._count_claims(filters, db)
+            else:
+                total = 0
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        claims = query.order_by(Claim.created_at.desc()).offset(offset).limit(page_size).all()
+        # One row past the page tells whether another page follows
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_claim_cursor(rows[-1].created_at, rows[-1].id)
         
-        return claims, total
+        return rows, total, next_cursor
+    
+    def _count_claims(self, filters: list, db: Session) -> int:
+        """Exact count of claims matching filters"""
+        count_stmt = select(func.count()).select_from(Claim)
+        if filters:
+            count_stmt = count_stmt.where(and_(*filters))
+        return db.execute(count_stmt).scalar_one()
+    
+    def _estimate_claim_count(self, filters: list, db: Session) -> int:
+        """
+        Approximate count of claims matching filters
+        
+        Reads the planner's row estimate from EXPLAIN instead of scanning the
+        table. Falls back to an exact count on databases other than PostgreSQL.
+        """
+        dialect = db.get_bind().dialect
+        if dialect.name != "postgresql":
+            return self._count_claims(filters, db)
+        
+        stmt = select(Claim.id)
+        if filters:
+            stmt = stmt.where(and_(*filters))
+        compiled = stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+        return int(plan[0]["Plan"]["Plan Rows"])
     
-    def update_claim(self, claim_id: UUID, update_data: ClaimUpdate, db: Session) -> Optional[Claim]:
+    def update_claim(self, claim_id: UUID, update_data: ClaimUpdate, db: Session) -> Optional[Row]:
         """
         Update claim data
         
@@ -148,46 +349,46 @@ class ClaimService:
             db: Database session
             
         Returns:
-            Updated Claim model or None if not found
+            Updated claim row or None if not found
         """
-        claim = self.get_claim_by_id(claim_id, db)
-        if not claim:
-            return None
+        values = {}
         
         # Update status
         if update_data.status:
-            claim.status = update_data.status.value
+            values["status"] = update_data.status.value
         
         # Update Space Truth data
         if update_data.space_truth:
-            claim.ndmi_value = update_data.space_truth.ndmi_value
-            claim.ndmi_14day_avg = update_data.space_truth.ndmi_14day_avg
-            claim.satellite_verdict = update_data.space_truth.satellite_verdict.value
-            claim.observation_date = update_data.space_truth.observation_date
-            claim.cloud_cover_pct = update_data.space_truth.cloud_cover_pct
+            values["ndmi_value"] = update_data.space_truth.ndmi_value
+            values["ndmi_14day_avg"] = update_data.space_truth.ndmi_14day_avg
+            values["satellite_verdict"] = update_data.space_truth.satellite_verdict.value
+            values["observation_date"] = update_data.space_truth.observation_date
+            values["cloud_cover_pct"] = update_data.space_truth.cloud_cover_pct
         
         # Update Verification Result
         if update_data.verification_result:
-            claim.weighted_score = update_data.verification_result.weighted_score
-            claim.status = update_data.verification_result.status.value
-            claim.verdict_explanation = update_data.verification_result.verdict_explanation
-            claim.ground_truth_confidence = update_data.verification_result.ground_truth_confidence
-            claim.space_truth_confidence = update_data.verification_result.space_truth_confidence
+            values["weighted_score"] = update_data.verification_result.weighted_score
+            values["status"] = update_data.verification_result.status.value
+            values["verdict_explanation"] = update_data.verification_result.verdict_explanation
+            values["ground_truth_confidence"] = update_data.verification_result.ground_truth_confidence
+            values["space_truth_confidence"] = update_data.verification_result.space_truth_confidence
         
         # Update Payment data
         if update_data.payout_amount is not None:
-            claim.payout_amount = update_data.payout_amount
+            values["payout_amount"] = update_data.payout_amount
         if update_data.payout_status:
-            claim.payout_status = update_data.payout_status
+            values["payout_status"] = update_data.payout_status
         if update_data.payout_reference:
-            claim.payout_reference = update_data.payout_reference
+            values["payout_reference"] = update_data.payout_reference
         
-        db.commit()
-        db.refresh(claim)
+        if not values:
+            return db.execute(
+                select(*Claim.__table__.columns).where(Claim.id == claim_id)
+            ).first()
         
-        return claim
+        return self._update_claim_columns(claim_id, values, db)
     
-    def update_claim_status(self, claim_id: UUID, status: ClaimStatus, db: Session) -> Optional[Claim]:
+    def update_claim_status(self, claim_id: UUID, status: ClaimStatus, db: Session) -> Optional[Row]:
         """
         Update claim status
         
@@ -197,17 +398,24 @@ class ClaimService:
             db: Database session
             
         Returns:
-            Updated Claim model or None if not found
+            Updated claim row or None if not found
         """
-        claim = self.get_claim_by_id(claim_id, db)
-        if not claim:
-            return None
-        
-        claim.status = status.value
+        return self._update_claim_columns(claim_id, {"status": status.value}, db)
+    
+    def _update_claim_columns(self, claim_id: UUID, values: dict, db: Session) -> Optional[Row]:
+        """Update claim columns and read the row back in one UPDATE ... RETURNING"""
+        row = db.execute(
+            update(Claim)
+            .where(Claim.id == claim_id)
+            .values(**values)
+            .returning(*Claim.__table__.columns)
+        ).first()
         db.commit()
-        db.refresh(claim)
         
-        return claim
+        if row is not None:
+            http_cache_service.invalidate_claim(claim_id)
+        
+        return row
 
 
 # Singleton instance
@@ -0,0 +1,117 @@
+"""Request coalescing (single-flight) for hot read endpoints"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable
+
+import orjson
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How long a loaded result is shared with identical requests
+RESULT_TTL_MS = 2000
+
+# How long other workers wait on the worker holding the lock
+LOCK_TTL_MS = 1000
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class CoalescingService:
+    """Service collapsing identical concurrent reads into one database query"""
+    
+    def __init__(self):
+        """Initialize coalescing service with Redis connection"""
+        self.redis_client = redis.from_url(settings.REDIS_URL)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+    
+    def make_key(self, path: str, params: Iterable[Any]) -> str:
+        """
+        Build a coalescing key for a request
+        
+        Args:
+            path: Request path
+            params: Query parameters as (name, value) pairs
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        return hashlib.blake2s(orjson.dumps([path, sorted(params)])).hexdigest()
+    
+    def coalesce(self, key: str, loader: Callable[[], bytes]) -> bytes:
+        """
+        Load a serialized result once for all identical concurrent requests
+        
+        Within a process, callers arriving while the first one is loading wait
+        for its result. Across workers, a Redis lock lets one worker load while
+        the others pick up the shared result.
+        
+        Args:
+            key: Coalescing key from make_key
+            loader: Callable producing the serialized result
+        
+        Returns:
+            Serialized result
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = self._load_shared(key, loader)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+    
+    def _load_shared(self, key: str, loader: Callable[[], bytes]) -> bytes:
+        """Load a result, sharing it with other workers through Redis"""
+        result_key = f"coalesce:{key}:result"
+        lock_key = f"coalesce:{key}:lock"
+        
+        try:
+            cached = self.redis_client.get(result_key)
+            if cached is not None:
+                return cached
+            
+            if not self.redis_client.set(lock_key, 1, nx=True, px=LOCK_TTL_MS):
+                # Another worker is loading; wait for its result, then fall back
+                deadline = time.monotonic() + LOCK_TTL_MS / 1000
+                while time.monotonic() < deadline:
+                    time.sleep(POLL_INTERVAL_SECONDS)
+                    cached = self.redis_client.get(result_key)
+                    if cached is not None:
+                        return cached
+        except redis.RedisError as e:
+            logger.warning(f"Request coalescing unavailable: {str(e)}")
+            return loader()
+        
+        result = loader()
+        
+        try:
+            self.redis_client.set(result_key, result, px=RESULT_TTL_MS)
+            self.redis_client.delete(lock_key)
+        except redis.RedisError as e:
+            logger.warning(f"Request coalescing unavailable: {str(e)}")
+        
+        return result
+
+
+# Singleton instance
+coalescing_service = CoalescingService()
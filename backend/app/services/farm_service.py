@@ -1,7 +1,8 @@
 """Farm service for business logic"""
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import insert, or_, select
+from sqlalchemy.engine import Row
 from uuid import UUID
 from typing import List, Optional
 from app.models.farm import Farm
@@ -9,8 +10,22 @@ from app.schemas.farm import (
     FarmCreate,
     FarmResponse,
     FarmCreateResponse,
-    GPSValidationWarning,
-    GPSCoordinates
+    GPSValidationWarning
+)
+
+
+# Columns needed to build a FarmResponse
+FARM_RESPONSE_COLUMNS = (
+    Farm.id,
+    Farm.farmer_name,
+    Farm.farmer_id,
+    Farm.phone_number,
+    Farm.crop_type,
+    Farm.gps_lat,
+    Farm.gps_lng,
+    Farm.gps_accuracy,
+    Farm.registered_at,
+    Farm.registered_by,
 )
 
 
@@ -57,42 +72,47 @@ class FarmService:
         # Validate GPS accuracy
         gps_warning = self.validate_gps_accuracy(farm_data.gps_coordinates.accuracy)
         
-        # Create farm model
-        farm = Farm(
+        # One INSERT ... RETURNING instead of an ORM add plus a refresh SELECT
+        row = db.execute(
+            insert(Farm).values(**self._farm_values(farm_data)).returning(Farm.id, Farm.registered_at)
+        ).one()
+        db.commit()
+        
+        return self._create_response(farm_data, row, gps_warning)
+    
+    def _farm_values(self, farm_data: FarmCreate) -> dict:
+        """Column values for inserting a farm"""
+        return {
+            "farmer_name": farm_data.farmer_name,
+            "farmer_id": farm_data.farmer_id,
+            "phone_number": farm_data.phone_number,
+            "crop_type": farm_data.crop_type.value,
+            "gps_lat": farm_data.gps_coordinates.lat,
+            "gps_lng": farm_data.gps_coordinates.lng,
+            "gps_accuracy": farm_data.gps_coordinates.accuracy,
+            "registered_by": farm_data.registered_by
+        }
+    
+    def _create_response(
+        self,
+        farm_data: FarmCreate,
+        row: Row,
+        gps_warning: Optional[GPSValidationWarning]
+    ) -> FarmCreateResponse:
+        """Build the creation response from the request and the inserted (id, registered_at)"""
+        return FarmCreateResponse(
+            id=row.id,
             farmer_name=farm_data.farmer_name,
             farmer_id=farm_data.farmer_id,
             phone_number=farm_data.phone_number,
-            crop_type=farm_data.crop_type.value,
-            gps_lat=farm_data.gps_coordinates.lat,
-            gps_lng=farm_data.gps_coordinates.lng,
-            gps_accuracy=farm_data.gps_coordinates.accuracy,
-            registered_by=farm_data.registered_by
-        )
-        
-        db.add(farm)
-        db.commit()
-        db.refresh(farm)
-        
-        # Create response
-        response = FarmCreateResponse(
-            id=farm.id,
-            farmer_name=farm.farmer_name,
-            farmer_id=farm.farmer_id,
-            phone_number=farm.phone_number,
-            crop_type=farm.crop_type,
-            gps_coordinates=GPSCoordinates(
-                lat=farm.gps_lat,
-                lng=farm.gps_lng,
-                accuracy=farm.gps_accuracy
-            ),
-            registered_at=farm.registered_at,
-            registered_by=farm.registered_by,
+            crop_type=farm_data.crop_type,
+            gps_coordinates=farm_data.gps_coordinates,
+            registered_at=row.registered_at,
+            registered_by=farm_data.registered_by,
             gps_warning=gps_warning
         )
-        
-        return response
     
-    def get_farm_by_id(self, farm_id: UUID, db: Session) -> Optional[Farm]:
+    def get_farm_by_id(self, farm_id: UUID, db: Session) -> Optional[Row]:
         """
         Get farm by ID
         
@@ -101,11 +121,12 @@ class FarmService:
             db: Database session
             
         Returns:
-            Farm model or None if not found
+            Row of FARM_RESPONSE_COLUMNS or None if not found
         """
-        return db.query(Farm).filter(Farm.id == farm_id).first()
+        stmt = select(*FARM_RESPONSE_COLUMNS).where(Farm.id == farm_id)
+        return db.execute(stmt).first()
     
-    def search_farms_by_farmer_id(self, farmer_id: str, db: Session) -> List[Farm]:
+    def search_farms_by_farmer_id(self, farmer_id: str, db: Session) -> List[Row]:
         """
         Search farms by farmer ID
         
@@ -114,9 +135,10 @@ class FarmService:
             db: Database session
             
         Returns:
-            List of Farm models
+            List of rows of FARM_RESPONSE_COLUMNS
         """
-        return db.query(Farm).filter(Farm.farmer_id == farmer_id).all()
+        stmt = select(*FARM_RESPONSE_COLUMNS).where(Farm.farmer_id == farmer_id)
+        return db.execute(stmt).all()
 
 
 # Singleton instance
@@ -0,0 +1,133 @@
+"""HTTP response caching with ETags remembered in Redis"""
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+import orjson
+import redis
+from fastapi import Response, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Let clients reuse briefly, then revalidate. Writers invalidate the
+# remembered ETag, so revalidation sees every change.
+CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+CACHE_TTL_SECONDS = 60
+
+
+class HTTPCacheService:
+    """Service for conditional GET handling (ETag / If-None-Match)"""
+    
+    def __init__(self):
+        """Initialize HTTP cache service with Redis connection"""
+        self.redis_client = redis.from_url(settings.REDIS_URL)
+    
+    def claim_key(self, claim_id: Any) -> str:
+        """Cache key for a claim's ETag"""
+        return f"claim:{claim_id}:etag"
+    
+    def farm_key(self, farm_id: Any) -> str:
+        """Cache key for a farm's ETag"""
+        return f"farm:{farm_id}:etag"
+    
+    def make_etag(self, resource_id: Any, version: datetime) -> str:
+        """
+        Build a weak ETag from a resource ID and its last-modified time
+        
+        Args:
+            resource_id: Resource identifier
+            version: Timestamp that changes whenever the resource changes
+        
+        Returns:
+            Weak ETag header value
+        """
+        return f'W/"{resource_id}:{version.timestamp()}"'
+    
+    def etag_matches(self, if_none_match: Optional[str], etag: str) -> bool:
+        """Check an If-None-Match header against an ETag (weak comparison)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        
+        def strip_weak(value: str) -> str:
+            value = value.strip()
+            return value[2:] if value.startswith("W/") else value
+        
+        return strip_weak(etag) in {strip_weak(v) for v in if_none_match.split(",")}
+    
+    def not_modified(self, key: str, if_none_match: Optional[str]) -> Optional[Response]:
+        """
+        Answer a conditional GET from the remembered ETag without loading the resource
+        
+        Args:
+            key: Cache key of the resource
+            if_none_match: If-None-Match request header
+        
+        Returns:
+            304 response if the client's copy is current, otherwise None
+        """
+        if not if_none_match:
+            return None
+        
+        try:
+            cached = self.redis_client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"HTTP cache unavailable: {str(e)}")
+            return None
+        
+        if cached is None:
+            return None
+        
+        entry = orjson.loads(cached)
+        if not self.etag_matches(if_none_match, entry["etag"]):
+            return None
+        
+        return self.not_modified_response(entry["etag"], entry["cache_control"])
+    
+    def not_modified_response(self, etag: str, cache_control: str) -> Response:
+        """Build an empty 304 response carrying the caching headers"""
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": cache_control}
+        )
+    
+    def remember(self, key: str, etag: str) -> str:
+        """
+        Remember a resource's current ETag
+        
+        Args:
+            key: Cache key of the resource
+            etag: Current ETag
+        
+        Returns:
+            Cache-Control header value to send with the resource
+        """
+        try:
+            self.redis_client.setex(
+                key,
+                CACHE_TTL_SECONDS,
+                orjson.dumps({"etag": etag, "cache_control": CACHE_CONTROL})
+            )
+        except redis.RedisError as e:
+            logger.warning(f"HTTP cache unavailable: {str(e)}")
+        
+        return CACHE_CONTROL
+    
+    def invalidate_claim(self, claim_id: Any) -> None:
+        """Forget a claim's ETag; call after every write to the claim"""
+        self.invalidate(self.claim_key(claim_id))
+    
+    def invalidate(self, key: str) -> None:
+        """Forget a resource's ETag after it changes"""
+        try:
+            self.redis_client.delete(key)
+        except redis.RedisError as e:
+            logger.warning(f"HTTP cache unavailable: {str(e)}")
+
+
+# Singleton instance
+http_cache_service = HTTPCacheService()
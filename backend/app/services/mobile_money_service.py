@@ -1,8 +1,10 @@
 """Mobile Money service for payment processing"""
 
 import logging
+import re
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 from sqlalchemy.orm import Session
@@ -11,6 +13,9 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Kenyan mobile numbers in E.164: +254 followed by 9 digits
+_PHONE_RE = re.compile(r"\+254\d{9}")
+
 
 class PaymentTransaction:
     """Payment transaction result"""
@@ -21,14 +26,69 @@ class PaymentTransaction:
         transaction_id: str,
         message: str,
         amount: Decimal,
-        phone_number: str
+        phone_number: str,
+        retryable: bool = True
     ):
         self.success = success
         self.transaction_id = transaction_id
         self.message = message
         self.amount = amount
         self.phone_number = phone_number
-        self.timestamp = datetime.utcnow()
+        # False when retrying cannot help (e.g. the request itself was invalid)
+        self.retryable = retryable
+        self.timestamp = datetime.now(timezone.utc)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after repeated failures
+    
+    Opens after failure_threshold consecutive failures (across all callers)
+    and rejects requests for reset_timeout seconds. After that one probe
+    request is let through: success closes the circuit, failure opens it
+    for another reset_timeout.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently being rejected"""
+        return (
+            self._opened_at is not None
+            and time.monotonic() - self._opened_at < self.reset_timeout
+        )
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent
+        
+        Returns:
+            False while the circuit is open. The first call after the reset
+            timeout returns True (the probe) and restarts the timeout, so
+            other callers keep waiting for the probe's result.
+        """
+        if self._opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        self._opened_at = time.monotonic()
+        return True
+    
+    def record_success(self) -> None:
+        """Close the circuit"""
+        self._failures = 0
+        self._opened_at = None
+    
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold"""
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
 
 
 class MobileMoneyService:
@@ -47,6 +107,9 @@ class MobileMoneyService:
         self.api_url = settings.MOBILE_MONEY_API_URL
         self.api_key = settings.MOBILE_MONEY_API_KEY
         self.is_production = settings.ENVIRONMENT == "production"
+        # While the provider is down, payouts go straight to manual review
+        # instead of each claim spending its retries and backoff on it
+        self.circuit_breaker = CircuitBreaker()
     
     async def send_payment(
         self,
@@ -62,35 +125,49 @@ class MobileMoneyService:
             phone_number: Farmer's phone number (format: +254XXXXXXXXX)
             amount: Payment amount in KES
             reference: Payment reference (claim_id)
-            db: Database session for logging
+            db: Database session the transaction log is added to (the caller commits it)
             
         Returns:
             PaymentTransaction with result details
         """
+        # %-style arguments so messages are only formatted if the record is emitted
         logger.info(
-            f"Initiating mobile money payment: phone={phone_number}, "
-            f"amount={amount}, reference={reference}"
+            "Initiating mobile money payment: phone=%s, amount=%s, reference=%s",
+            phone_number, amount, reference
         )
         
         # Validate inputs
-        if not phone_number or not phone_number.startswith("+254"):
-            logger.error(f"Invalid phone number format: {phone_number}")
+        if not phone_number or not _PHONE_RE.fullmatch(phone_number):
+            logger.error("Invalid phone number format: %s", phone_number)
             return PaymentTransaction(
                 success=False,
                 transaction_id="",
-                message="Invalid phone number format. Must start with +254",
+                message="Invalid phone number format. Must be +254 followed by 9 digits",
                 amount=amount,
-                phone_number=phone_number
+                phone_number=phone_number,
+                retryable=False
             )
         
         if amount <= 0:
-            logger.error(f"Invalid payment amount: {amount}")
+            logger.error("Invalid payment amount: %s", amount)
             return PaymentTransaction(
                 success=False,
                 transaction_id="",
                 message="Invalid payment amount. Must be greater than 0",
                 amount=amount,
-                phone_number=phone_number
+                phone_number=phone_number,
+                retryable=False
+            )
+        
+        if not self.circuit_breaker.allow_request():
+            logger.error("Mobile money provider unavailable; not sending payment: reference=%s", reference)
+            return PaymentTransaction(
+                success=False,
+                transaction_id="",
+                message="Mobile money provider unavailable",
+                amount=amount,
+                phone_number=phone_number,
+                retryable=False
             )
         
         # Generate transaction ID
@@ -112,10 +189,15 @@ class MobileMoneyService:
             success = True
             message = f"Payment of KES {amount:,.2f} sent successfully (simulated)"
             logger.info(
-                f"Simulated payment successful: transaction_id={transaction_id}, "
-                f"phone={phone_number}, amount={amount}"
+                "Simulated payment successful: transaction_id=%s, phone=%s, amount=%s",
+                transaction_id, phone_number, amount
             )
         
+        if success:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+        
         # Log transaction to database
         await self._log_transaction(
             db=db,
@@ -146,7 +228,11 @@ class MobileMoneyService:
         message: str
     ) -> None:
         """
-        Log payment transaction to database
+        Add a payment transaction log to the session
+        
+        Not committed here: the caller commits it together with the claim's
+        payout status, so a payout costs one commit and the log always agrees
+        with the claim.
         
         Args:
             db: Database session
@@ -159,25 +245,20 @@ class MobileMoneyService:
         """
         from app.models.payment_transaction import PaymentTransactionModel
         
-        try:
-            transaction = PaymentTransactionModel(
-                transaction_id=transaction_id,
-                claim_id=reference,
-                phone_number=phone_number,
-                amount=amount,
-                status="completed" if success else "failed",
-                message=message,
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(transaction)
-            db.commit()
-            
-            logger.info(f"Payment transaction logged: {transaction_id}")
-            
-        except Exception as e:
-            logger.error(f"Failed to log payment transaction: {str(e)}")
-            db.rollback()
+        transaction = PaymentTransactionModel(
+            transaction_id=transaction_id,
+            claim_id=reference,
+            phone_number=phone_number,
+            amount=amount,
+            status="completed" if success else "failed",
+            message=message,
+            # Stamped per attempt here: the logs are only flushed at the
+            # payout's final commit, after any backoff sleeps
+            created_at=datetime.now(timezone.utc)
+        )
+        
+        db.add(transaction)
+        logger.info("Payment transaction logged: %s", transaction_id)
     
     async def check_payment_status(self, transaction_id: str) -> dict:
         """
@@ -189,7 +270,7 @@ class MobileMoneyService:
         Returns:
             Dictionary with transaction status details
         """
-        logger.info(f"Checking payment status: transaction_id={transaction_id}")
+        logger.info("Checking payment status: transaction_id=%s", transaction_id)
         
         # For MVP, return simulated status
         # In production, this would query the mobile money API
@@ -1,12 +1,29 @@
 """OTP generation and validation service"""
 
-import random
-import string
+import secrets
 from datetime import datetime, timedelta
 from typing import Dict
 import redis
 from app.config import settings
 
+# Count the attempt and delete the stored OTP only if it matches, in one round
+# trip. A wrong code leaves it in place so the agent can retype it; once the
+# attempt limit is hit, every code is rejected until the attempt window expires.
+_VERIFY_AND_DELETE_LUA = """
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+if attempts > tonumber(ARGV[3]) then
+    return 0
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+return 0
+"""
+
 
 class OTPService:
     """Service for managing OTP generation and validation"""
@@ -14,12 +31,16 @@ class OTPService:
     def __init__(self):
         """Initialize OTP service with Redis connection"""
         self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._verify_and_delete = self.redis_client.register_script(_VERIFY_AND_DELETE_LUA)
         self.otp_expiry_minutes = 5
         self.otp_length = 6
+        self.max_verify_attempts = 5
+        self._otp_upper_bound = 10 ** self.otp_length
     
     def generate_otp(self) -> str:
         """Generate a random 6-digit OTP"""
-        return ''.join(random.choices(string.digits, k=self.otp_length))
+        # One CSPRNG draw, uniform over all codes (random is predictable)
+        return f"{secrets.randbelow(self._otp_upper_bound):0{self.otp_length}d}"
     
     def store_otp(self, phone_number: str, otp: str) -> None:
         """Store OTP in Redis with expiration"""
@@ -28,19 +49,19 @@ class OTPService:
         self.redis_client.setex(key, timedelta(minutes=self.otp_expiry_minutes), otp)
     
     def verify_otp(self, phone_number: str, otp: str) -> bool:
-        """Verify OTP against stored value"""
-        key = f"otp:{phone_number}"
-        stored_otp = self.redis_client.get(key)
-        
-        if stored_otp is None:
+        """Verify OTP against stored value, allowing max_verify_attempts tries per phone"""
+        # Codes that can never match are rejected without a Redis round trip
+        if len(otp) != self.otp_length or not otp.isdigit():
             return False
         
-        if stored_otp == otp:
-            # Delete OTP after successful verification
-            self.redis_client.delete(key)
-            return True
-        
-        return False
+        key = f"otp:{phone_number}"
+        attempts_key = f"otp:attempts:{phone_number}"
+        # Deleted on success so the OTP can't be reused
+        return self._verify_and_delete(
+            keys=[key, attempts_key],
+            args=[otp, self.otp_expiry_minutes * 60, self.max_verify_attempts],
+            client=self.redis_client
+        ) == 1
     
     def delete_otp(self, phone_number: str) -> None:
         """Delete OTP from Redis"""
@@ -2,19 +2,32 @@
 
 import logging
 import asyncio
+import random
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
+from app.database import SessionLocal
 from app.models.claim import Claim
 from app.models.farm import Farm
 from app.schemas.claim import ClaimStatus, ClaimUpdate
+from app.services.http_cache_service import http_cache_service
 from app.services.mobile_money_service import mobile_money_service
 from app.services.sms_service import sms_service
 
 logger = logging.getLogger(__name__)
 
+# Lookups built once with a bound claim_id, so a payout doesn't rebuild and
+# re-key its query on every call
+_CLAIM_BY_ID = select(Claim).where(Claim.id == bindparam('claim_id'))
+_CLAIM_WITH_FARM = (
+    select(Claim, Farm)
+    .outerjoin(Farm, Farm.id == Claim.farm_id)
+    .where(Claim.id == bindparam('claim_id'))
+)
+
 
 class PaymentService:
     """
@@ -28,7 +41,11 @@ class PaymentService:
     
     # Retry configuration
     MAX_RETRIES = 3
-    BASE_BACKOFF_SECONDS = 2
+    BASE_BACKOFF_SECONDS = 1
+    MAX_BACKOFF_SECONDS = 8
+    
+    # Payouts processed at once by process_payouts_batch
+    BATCH_CONCURRENCY = 10
     
     # Default payout amount for MVP (in KES)
     DEFAULT_PAYOUT_AMOUNT = Decimal("5000.00")
@@ -36,7 +53,8 @@ class PaymentService:
     async def process_payout(
         self,
         claim_id: UUID,
-        db: Session
+        db: Session,
+        notifications: Optional[List[Tuple[str, str]]] = None
     ) -> bool:
         """
         Process payout for an approved claim
@@ -50,17 +68,21 @@ class PaymentService:
         Args:
             claim_id: UUID of the claim to process payment for
             db: Database session
+            notifications: If given, the farmer's (phone number, message)
+                notification is appended here for the caller to send, rather
+                than sent straight away
             
         Returns:
             bool: True if payment was successful, False otherwise
         """
         logger.info(f"Starting payout processing for claim {claim_id}")
         
-        # Get claim from database
-        claim = db.query(Claim).filter(Claim.id == claim_id).first()
-        if not claim:
+        # Get claim and its farm (for the farmer's phone number) in one query
+        row = db.execute(_CLAIM_WITH_FARM, {'claim_id': claim_id}).first()
+        if not row:
             logger.error(f"Claim {claim_id} not found")
             raise ValueError(f"Claim {claim_id} not found")
+        claim, farm = row
         
         # Verify claim is in approved status
         if claim.status != ClaimStatus.AUTO_APPROVED.value:
@@ -70,28 +92,37 @@ class PaymentService:
             )
             return False
         
-        # Get farm to retrieve farmer phone number
-        farm = db.query(Farm).filter(Farm.id == claim.farm_id).first()
+        # A redelivered or repeated workflow must not pay the claim again
+        if claim.payout_status == "completed":
+            logger.warning(f"Claim {claim_id} has already been paid. Skipping payment.")
+            return False
+        
         if not farm:
             logger.error(f"Farm {claim.farm_id} not found for claim {claim_id}")
             raise ValueError(f"Farm not found for claim {claim_id}")
         
         farmer_phone = farm.phone_number
+        set_payout_amount = not claim.payout_amount
         payout_amount = claim.payout_amount or self.DEFAULT_PAYOUT_AMOUNT
         
-        # Update claim with payout amount if not set
-        if not claim.payout_amount:
+        # End the read transaction (nothing is written yet) so no pooled
+        # connection is held through the payment calls and backoff sleeps.
+        # Everything below stays in the session until the final commit.
+        db.commit()
+        
+        # Update claim with payout amount if not set. Committed with the final
+        # outcome (and the transaction logs), so a payout is one transaction.
+        if set_payout_amount:
             claim.payout_amount = payout_amount
             claim.payout_status = "pending"
-            db.commit()
         
         # Attempt payment with retry logic
         for attempt in range(self.MAX_RETRIES):
+            logger.info(
+                f"Payment attempt {attempt + 1}/{self.MAX_RETRIES} for claim {claim_id}"
+            )
+            
             try:
-                logger.info(
-                    f"Payment attempt {attempt + 1}/{self.MAX_RETRIES} for claim {claim_id}"
-                )
-                
                 # Trigger mobile money payment
                 payment_result = await mobile_money_service.send_payment(
                     phone_number=farmer_phone,
@@ -99,13 +130,24 @@ class PaymentService:
                     reference=str(claim_id),
                     db=db
                 )
-                
+            except ValueError as e:
+                # Invalid input fails the same way on every attempt
+                logger.error(
+                    f"Error during payment attempt {attempt + 1} for claim {claim_id}: {str(e)}"
+                )
+                break
+            except Exception as e:
+                logger.error(
+                    f"Error during payment attempt {attempt + 1} for claim {claim_id}: {str(e)}"
+                )
+            else:
                 if payment_result.success:
                     # Payment successful - update claim status
                     claim.status = ClaimStatus.PAID.value
                     claim.payout_status = "completed"
                     claim.payout_reference = payment_result.transaction_id
                     db.commit()
+                    http_cache_service.invalidate_claim(claim_id)
                     
                     logger.info(
                         f"Payment successful for claim {claim_id}: "
@@ -113,6 +155,13 @@ class PaymentService:
                     )
                     
                     # Send SMS notification to farmer (requirement 9.2, 9.3)
+                    if notifications is not None:
+                        notifications.append((
+                            farmer_phone,
+                            sms_service.payment_notification_message(float(payout_amount))
+                        ))
+                        return True
+                    
                     try:
                         await sms_service.send_payment_notification(
                             phone_number=farmer_phone,
@@ -126,29 +175,18 @@ class PaymentService:
                     
                     return True
                 
-                else:
-                    # Payment failed - log and retry
-                    logger.warning(
-                        f"Payment attempt {attempt + 1} failed for claim {claim_id}: "
-                        f"{payment_result.message}"
-                    )
-                    
-                    # If not last attempt, wait with exponential backoff
-                    if attempt < self.MAX_RETRIES - 1:
-                        backoff_seconds = self.BASE_BACKOFF_SECONDS ** (attempt + 1)
-                        logger.info(f"Waiting {backoff_seconds}s before retry...")
-                        await asyncio.sleep(backoff_seconds)
-                    
-            except Exception as e:
-                logger.error(
-                    f"Error during payment attempt {attempt + 1} for claim {claim_id}: {str(e)}"
+                logger.warning(
+                    f"Payment attempt {attempt + 1} failed for claim {claim_id}: "
+                    f"{payment_result.message}"
                 )
-                
-                # If not last attempt, wait with exponential backoff
-                if attempt < self.MAX_RETRIES - 1:
-                    backoff_seconds = self.BASE_BACKOFF_SECONDS ** (attempt + 1)
-                    logger.info(f"Waiting {backoff_seconds}s before retry...")
-                    await asyncio.sleep(backoff_seconds)
+                if not payment_result.retryable:
+                    break
+            
+            # If not last attempt, wait with exponential backoff
+            if attempt < self.MAX_RETRIES - 1:
+                backoff_seconds = self._backoff_seconds(attempt)
+                logger.info(f"Waiting {backoff_seconds:.2f}s before retry...")
+                await asyncio.sleep(backoff_seconds)
         
         # All retries failed - flag for manual processing (requirement 9.5)
         logger.error(
@@ -158,9 +196,67 @@ class PaymentService:
         
         claim.payout_status = "failed_manual_review_required"
         db.commit()
+        http_cache_service.invalidate_claim(claim_id)
         
         return False
     
+    async def process_payouts_batch(
+        self,
+        claim_ids: Sequence[UUID],
+        session_factory: Callable[[], Session] = SessionLocal
+    ) -> List[Union[bool, Exception]]:
+        """
+        Process payouts for many claims concurrently
+        
+        Each payout spends most of its time waiting on the mobile money API,
+        so up to BATCH_CONCURRENCY run at once. Every payout gets its own
+        session; a Session must not be shared between concurrent tasks.
+        Farmers are notified once the batch is done, through one bulk send
+        per distinct message (payouts of the same amount share a message).
+        
+        Args:
+            claim_ids: UUIDs of the claims to process payment for
+            session_factory: Creates the database session for each payout
+            
+        Returns:
+            One result per claim, in order: the process_payout result, or the
+            exception it raised (one failed claim does not stop the batch)
+        """
+        semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+        notifications: List[Tuple[str, str]] = []
+        
+        async def process_one(claim_id: UUID) -> bool:
+            async with semaphore:
+                db = session_factory()
+                try:
+                    return await self.process_payout(claim_id, db, notifications)
+                finally:
+                    db.close()
+        
+        results = await asyncio.gather(
+            *(process_one(claim_id) for claim_id in claim_ids),
+            return_exceptions=True
+        )
+        
+        # SMS failures are logged but don't fail the payouts
+        if notifications:
+            sent = await sms_service.send_bulk(notifications)
+            failed = [phone_number for phone_number, ok in sent.items() if not ok]
+            if failed:
+                logger.error(f"Failed to send payment notification SMS to {len(failed)} farmers")
+        
+        return results
+    
+    def _backoff_seconds(self, attempt: int) -> float:
+        """
+        Wait before retrying after a failed attempt (0-based)
+        
+        Doubles from BASE_BACKOFF_SECONDS up to MAX_BACKOFF_SECONDS, plus up to
+        50% random jitter so claims that failed together don't retry together.
+        """
+        backoff = min(self.BASE_BACKOFF_SECONDS * 2 ** attempt, self.MAX_BACKOFF_SECONDS)
+        return backoff + random.uniform(0, 0.5 * backoff)
+    
     async def retry_failed_payment(
         self,
         claim_id: UUID,
@@ -179,7 +275,7 @@ class PaymentService:
         logger.info(f"Manually retrying payment for claim {claim_id}")
         
         # Get claim
-        claim = db.query(Claim).filter(Claim.id == claim_id).first()
+        claim = db.execute(_CLAIM_BY_ID, {'claim_id': claim_id}).scalar_one_or_none()
         if not claim:
             raise ValueError(f"Claim {claim_id} not found")
         
@@ -194,6 +290,7 @@ class PaymentService:
         # Reset status and attempt payment
         claim.payout_status = "pending"
         db.commit()
+        http_cache_service.invalidate_claim(claim_id)
         
         return await self.process_payout(claim_id, db)
 
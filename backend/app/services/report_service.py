@@ -1,10 +1,20 @@
 """Report generation service for PDF exports"""
 
+import asyncio
+import copy
 import io
 import uuid
+import hashlib
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+import httpx
+import orjson
 from datetime import datetime, timedelta
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import BinaryIO, Callable, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Load, Session
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -17,14 +27,179 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 
+from app.database import SessionLocal
 from app.models.claim import Claim
 from app.models.farm import Farm
+from app.services.http_cache_service import http_cache_service
+from app.services.storage_service import get_s3_client
 from app.config import settings
 
 
+# Rendered PDFs stay in memory up to this size, then spill to a temp file
+PDF_SPOOL_MAX_SIZE = 2 * 1024 * 1024  # 2 MB
+
+# Multipart upload threshold and part size for PDFs sent to S3
+PDF_MULTIPART_CHUNK_SIZE = 5 * 1024 * 1024  # 5 MB
+
+# Report styles are built once and shared by every render; ReportLab only
+# reads them when laying out a document
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=12,
+    spaceBefore=20
+)
+
+_EXPLANATION_STYLE = ParagraphStyle(
+    'Explanation',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    leading=14,
+    leftIndent=20,
+    rightIndent=20,
+    spaceAfter=10
+)
+
+_FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_STYLES['Normal'],
+    fontSize=8,
+    textColor=colors.grey,
+    alignment=TA_CENTER
+)
+
+# Claim ID / date header table (no grid)
+_INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#333333')),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+# Label / value tables for the farmer, ground truth, space truth,
+# verification and payment sections
+_DETAIL_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+_TOP_CLASSES_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+
+def _build_ndmi_chart_template() -> VerticalBarChart:
+    """Bar chart with the fixed NDMI comparison layout and no data"""
+    chart = VerticalBarChart()
+    chart.x = 50
+    chart.y = 50
+    chart.height = 125
+    chart.width = 300
+    chart.categoryAxis.categoryNames = ['Current NDMI', '14-Day Average']
+    chart.bars[0].fillColor = colors.HexColor('#1a5490')
+    return chart
+
+
+# Constructing a VerticalBarChart is the slow part of the chart, so it is
+# built once and each report draws a copy with its own data and value range
+_NDMI_CHART_TEMPLATE = _build_ndmi_chart_template()
+
+
+# Claim (with its detail columns) and farm for one report, built once with a
+# bound claim_id rather than per report
+_CLAIM_REPORT_ROW = (
+    select(Claim, Farm)
+    .outerjoin(Farm, Farm.id == Claim.farm_id)
+    .options(Load(Claim).undefer_group('detail'))
+    .where(Claim.id == bindparam('claim_id'))
+)
+
+
+# Claim images are downloaded from render threads through one shared client,
+# so reports reuse keep-alive connections instead of opening one per image
+_image_http_client = httpx.Client(
+    timeout=10,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=10)
+)
+
+# Claim images are drawn at most 4" x 3"; at 150 DPI that is 600 x 450 pixels,
+# so larger photos are shrunk once when downloaded
+REPORT_IMAGE_MAX_PIXELS = (600, 450)
+
+# Downloaded (and shrunk) claim images kept for re-rendered reports
+REPORT_IMAGE_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=REPORT_IMAGE_CACHE_SIZE)
+def _fetch_claim_image(image_url: str) -> Tuple[bytes, float]:
+    """
+    Download a claim image, shrink it to REPORT_IMAGE_MAX_PIXELS and measure
+    its aspect ratio (width / height)
+    
+    ReportLab then embeds a small JPEG instead of decoding the full-size
+    photo on every render. Every upload gets a new URL, so a cached image
+    never goes stale. Failed downloads raise and are not cached.
+    """
+    from PIL import Image as PILImage
+    
+    response = _image_http_client.get(image_url)
+    response.raise_for_status()
+    
+    with PILImage.open(io.BytesIO(response.content)) as pil_img:
+        aspect = pil_img.width / pil_img.height
+        
+        # Let the JPEG decoder scale down while decoding, then finish the resize
+        pil_img.draft('RGB', REPORT_IMAGE_MAX_PIXELS)
+        pil_img.thumbnail(REPORT_IMAGE_MAX_PIXELS)
+        
+        output = io.BytesIO()
+        pil_img.convert('RGB').save(output, format='JPEG', quality=85)
+    
+    return output.getvalue(), aspect
+
+
 class ReportService:
     """Service for generating PDF reports"""
     
+    # Reports generated at once by generate_claim_pdfs_batch. Rendering and
+    # uploads run in the default thread pool, which bounds them further.
+    BATCH_CONCURRENCY = 10
+    
     def __init__(self):
         self.storage_provider = settings.STORAGE_PROVIDER
         self.bucket = settings.AWS_S3_BUCKET
@@ -34,13 +209,7 @@ class ReportService:
     def s3_client(self):
         """Lazy load S3 client"""
         if self._s3_client is None and self.storage_provider == "s3":
-            import boto3
-            self._s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
+            self._s3_client = get_s3_client()
         return self._s3_client
     
     async def generate_claim_pdf(self, claim_id: uuid.UUID, db: Session) -> str:
@@ -54,29 +223,124 @@ class ReportService:
         Returns:
             URL of the generated PDF (signed URL for S3, local path otherwise)
         """
-        # Fetch claim data
-        claim = db.query(Claim).filter(Claim.id == claim_id).first()
-        if not claim:
+        # Fetch claim and farm data (blocking database call, so off the event loop)
+        claim, farm = await asyncio.to_thread(self._load_claim_and_farm, claim_id, db)
+        
+        # Reports are keyed by content, so a claim that hasn't changed reuses
+        # the PDF rendered for it last time
+        pdf_hash = self._content_hash(claim, farm)
+        filename = f"reports/{claim_id}/{pdf_hash}.pdf"
+        
+        if self.storage_provider == "s3" and claim.pdf_hash == pdf_hash:
+            # Already stored; skip the HEAD request
+            already_rendered = True
+        else:
+            # HEAD request on S3, so off the event loop like the upload
+            already_rendered = await asyncio.to_thread(self._pdf_exists, filename)
+        
+        if already_rendered:
+            pdf_url = self._pdf_url(filename)
+        else:
+            with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE) as pdf_file:
+                # Generate PDF (CPU-bound ReportLab build, so in a worker thread)
+                await asyncio.to_thread(self._render_pdf, claim, farm, pdf_file)
+                pdf_file.seek(0)
+                
+                # Upload PDF to storage
+                pdf_url = await self._store_pdf(pdf_file, filename)
+        
+        if claim.pdf_hash != pdf_hash:
+            claim.pdf_hash = pdf_hash
+            await asyncio.to_thread(db.commit)
+            http_cache_service.invalidate_claim(claim_id)
+        
+        return pdf_url
+    
+    async def generate_claim_pdfs_batch(
+        self,
+        claim_ids: Sequence[uuid.UUID],
+        session_factory: Callable[[], Session] = SessionLocal
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate PDF reports for many claims concurrently
+        
+        Up to BATCH_CONCURRENCY reports are generated at once, each with its
+        own database session (a Session must not be shared between tasks).
+        
+        Args:
+            claim_ids: UUIDs of the claims
+            session_factory: Creates the database session for each report
+            
+        Returns:
+            One result per claim, in order: the PDF URL, or the exception
+            raised for that claim (one failed report does not stop the batch)
+        """
+        semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+        
+        async def generate_one(claim_id: uuid.UUID) -> str:
+            async with semaphore:
+                db = session_factory()
+                try:
+                    return await self.generate_claim_pdf(claim_id, db)
+                finally:
+                    db.close()
+        
+        return await asyncio.gather(
+            *(generate_one(claim_id) for claim_id in claim_ids),
+            return_exceptions=True
+        )
+    
+    def _load_claim_and_farm(self, claim_id: uuid.UUID, db: Session) -> Tuple[Claim, Farm]:
+        """
+        Load a claim (with its detail columns) and its farm in one query
+        
+        Raises:
+            ValueError: If the claim or its farm does not exist
+        """
+        row = db.execute(_CLAIM_REPORT_ROW, {'claim_id': claim_id}).first()
+        if not row:
             raise ValueError(f"Claim with id {claim_id} not found")
+        claim, farm = row
         
-        # Fetch farm data
-        farm = db.query(Farm).filter(Farm.id == claim.farm_id).first()
         if not farm:
             raise ValueError(f"Farm with id {claim.farm_id} not found")
         
-        # Generate PDF
-        pdf_bytes = self._generate_pdf_content(claim, farm)
-        
-        # Upload PDF to storage
-        pdf_url = await self._store_pdf(pdf_bytes, claim_id)
+        return claim, farm
+    
+    def _content_hash(self, claim: Claim, farm: Farm) -> str:
+        """
+        Hash the claim and farm fields rendered into the report
         
-        return pdf_url
+        Args:
+            claim: Claim model
+            farm: Farm model
+            
+        Returns:
+            32 character hex digest
+        """
+        # updated_at and pdf_hash change without changing the report itself
+        excluded = {"updated_at", "pdf_hash"}
+        content = {
+            "claim": {
+                column.name: getattr(claim, column.name)
+                for column in Claim.__table__.columns
+                if column.name not in excluded
+            },
+            "farm": {column.name: getattr(farm, column.name) for column in Farm.__table__.columns},
+        }
+        encoded = orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
     
     def _generate_pdf_content(self, claim: Claim, farm: Farm) -> bytes:
         """Generate PDF content"""
         buffer = io.BytesIO()
+        self._render_pdf(claim, farm, buffer)
+        return buffer.getvalue()
+    
+    def _render_pdf(self, claim: Claim, farm: Farm, output: BinaryIO) -> None:
+        """Render the claim report as PDF into a writable binary file"""
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
@@ -86,29 +350,9 @@ class ReportService:
         
         # Container for PDF elements
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a5490'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#1a5490'),
-            spaceAfter=12,
-            spaceBefore=20
-        )
         
         # Title
-        story.append(Paragraph("MavunoSure Claim Verification Report", title_style))
+        story.append(Paragraph("MavunoSure Claim Verification Report", _TITLE_STYLE))
         story.append(Spacer(1, 0.2*inch))
         
         # Claim ID and Date
@@ -117,47 +361,24 @@ class ReportService:
             ["Report Generated:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
             ["Claim Status:", claim.status.upper().replace("_", " ")]
         ]
-        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#333333')),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        story.append(info_table)
+        story.append(self._two_col_table(info_data, style=_INFO_TABLE_STYLE))
         story.append(Spacer(1, 0.3*inch))
         
         # Farmer Information Section
-        story.append(Paragraph("Farmer Information", heading_style))
+        story.append(Paragraph("Farmer Information", _HEADING_STYLE))
         farmer_data = [
             ["Farmer Name:", farm.farmer_name],
             ["Farmer ID:", farm.farmer_id],
             ["Phone Number:", farm.phone_number],
             ["Crop Type:", farm.crop_type.title()],
-            ["Farm GPS:", f"{float(farm.gps_lat):.6f}, {float(farm.gps_lng):.6f}"],
+            ["Farm GPS:", f"{farm.gps_lat:.6f}, {farm.gps_lng:.6f}"],
             ["Registration Date:", farm.registered_at.strftime("%Y-%m-%d")]
         ]
-        farmer_table = Table(farmer_data, colWidths=[2*inch, 4*inch])
-        farmer_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        story.append(farmer_table)
+        story.append(self._two_col_table(farmer_data))
         story.append(Spacer(1, 0.3*inch))
         
         # Ground Truth Assessment Section
-        story.append(Paragraph("Ground Truth Assessment", heading_style))
+        story.append(Paragraph("Ground Truth Assessment", _HEADING_STYLE))
         
         # Add claim image if available
         story.append(self._add_claim_image(claim.image_url))
@@ -169,28 +390,15 @@ class ReportService:
             ["Confidence Score:", f"{claim.ml_confidence:.2%}"],
             ["Device Tilt:", f"{claim.device_tilt:.1f}°" if claim.device_tilt else "N/A"],
             ["Device Azimuth:", f"{claim.device_azimuth:.1f}°" if claim.device_azimuth else "N/A"],
-            ["Capture GPS:", f"{float(claim.capture_gps_lat):.6f}, {float(claim.capture_gps_lng):.6f}" if claim.capture_gps_lat else "N/A"],
+            ["Capture GPS:", f"{claim.capture_gps_lat:.6f}, {claim.capture_gps_lng:.6f}" if claim.capture_gps_lat else "N/A"],
             ["Capture Time:", claim.created_at.strftime("%Y-%m-%d %H:%M:%S")]
         ]
-        gt_table = Table(gt_data, colWidths=[2*inch, 4*inch])
-        gt_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        story.append(gt_table)
+        story.append(self._two_col_table(gt_data))
         story.append(Spacer(1, 0.2*inch))
         
         # Top 3 Predicted Classes for Explainability
         if claim.top_three_classes:
-            story.append(Paragraph("<b>Top 3 Predicted Classes (Explainability):</b>", styles['Normal']))
+            story.append(Paragraph("<b>Top 3 Predicted Classes (Explainability):</b>", _STYLES['Normal']))
             story.append(Spacer(1, 0.1*inch))
             
             top_classes_data = [["Rank", "Classification", "Confidence"]]
@@ -202,26 +410,13 @@ class ReportService:
                 ])
             
             top_classes_table = Table(top_classes_data, colWidths=[0.8*inch, 3*inch, 1.5*inch])
-            top_classes_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
+            top_classes_table.setStyle(_TOP_CLASSES_TABLE_STYLE)
             story.append(top_classes_table)
             story.append(Spacer(1, 0.3*inch))
         
         # Space Truth Assessment Section (if available)
         if claim.ndmi_value is not None:
-            story.append(Paragraph("Space Truth Assessment (Satellite Data)", heading_style))
+            story.append(Paragraph("Space Truth Assessment (Satellite Data)", _HEADING_STYLE))
             
             st_data = [
                 ["Current NDMI Value:", f"{claim.ndmi_value:.3f}"],
@@ -230,20 +425,7 @@ class ReportService:
                 ["Observation Date:", claim.observation_date.strftime("%Y-%m-%d") if claim.observation_date else "N/A"],
                 ["Cloud Cover:", f"{claim.cloud_cover_pct:.1f}%" if claim.cloud_cover_pct else "N/A"]
             ]
-            st_table = Table(st_data, colWidths=[2*inch, 4*inch])
-            st_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(st_table)
+            story.append(self._two_col_table(st_data))
             story.append(Spacer(1, 0.2*inch))
             
             # Add NDMI visualization chart
@@ -252,7 +434,7 @@ class ReportService:
         
         # Final Verification Result Section (if available)
         if claim.weighted_score is not None:
-            story.append(Paragraph("Final Verification Result", heading_style))
+            story.append(Paragraph("Final Verification Result", _HEADING_STYLE))
             
             # Determine status color
             status_color = colors.green
@@ -267,82 +449,62 @@ class ReportService:
                 ["Space Truth Confidence:", f"{claim.space_truth_confidence:.2%}" if claim.space_truth_confidence else "N/A"],
                 ["Final Status:", claim.status.upper().replace("_", " ")],
             ]
-            vr_table = Table(vr_data, colWidths=[2.5*inch, 3.5*inch])
-            vr_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
+            vr_table = self._two_col_table(vr_data, col_widths=(2.5*inch, 3.5*inch))
+            vr_table.setStyle([
                 ('BACKGROUND', (1, 3), (1, 3), status_color),
                 ('TEXTCOLOR', (1, 3), (1, 3), colors.whitesmoke),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
+            ])
             story.append(vr_table)
             story.append(Spacer(1, 0.2*inch))
             
             # Explanation
             if claim.verdict_explanation:
-                story.append(Paragraph("<b>Explanation:</b>", styles['Normal']))
+                story.append(Paragraph("<b>Explanation:</b>", _STYLES['Normal']))
                 story.append(Spacer(1, 0.05*inch))
-                explanation_style = ParagraphStyle(
-                    'Explanation',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    leading=14,
-                    leftIndent=20,
-                    rightIndent=20,
-                    spaceAfter=10
-                )
-                story.append(Paragraph(claim.verdict_explanation, explanation_style))
+                story.append(Paragraph(claim.verdict_explanation, _EXPLANATION_STYLE))
         
         # Payment Information (if available)
         if claim.payout_amount:
             story.append(Spacer(1, 0.3*inch))
-            story.append(Paragraph("Payment Information", heading_style))
+            story.append(Paragraph("Payment Information", _HEADING_STYLE))
             
             payment_data = [
                 ["Payout Amount:", f"KES {float(claim.payout_amount):,.2f}"],
                 ["Payout Status:", claim.payout_status.upper() if claim.payout_status else "N/A"],
                 ["Payout Reference:", claim.payout_reference if claim.payout_reference else "N/A"]
             ]
-            payment_table = Table(payment_data, colWidths=[2*inch, 4*inch])
-            payment_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(payment_table)
+            story.append(self._two_col_table(payment_data))
         
         # Footer
         story.append(Spacer(1, 0.5*inch))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
         story.append(Paragraph(
             f"Generated by MavunoSure Platform | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            footer_style
+            _FOOTER_STYLE
         ))
         
         # Build PDF
         doc.build(story)
-        buffer.seek(0)
-        return buffer.read()
+    
+    def _two_col_table(
+        self,
+        rows: list,
+        col_widths: Tuple[float, float] = (2*inch, 4*inch),
+        style: TableStyle = _DETAIL_TABLE_STYLE
+    ) -> Table:
+        """
+        Build a label / value table for a report section
+        
+        Args:
+            rows: [label, value] pairs
+            col_widths: Widths of the label and value columns
+            style: Shared table style (defaults to the bordered detail style)
+            
+        Returns:
+            Styled ReportLab Table
+        """
+        table = Table(rows, colWidths=list(col_widths))
+        table.setStyle(style)
+        return table
     
     def _add_claim_image(self, image_url: str) -> RLImage:
         """Add claim image to PDF with proper sizing"""
@@ -352,18 +514,8 @@ class ReportService:
                 image_path = image_url.replace("/uploads/", "uploads/")
                 img = RLImage(image_path, width=4*inch, height=3*inch)
             else:
-                # For S3 URLs, download the image
-                import requests
-                from PIL import Image as PILImage
-                
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                
-                # Load image and create ReportLab image
-                pil_img = PILImage.open(io.BytesIO(response.content))
-                
-                # Calculate aspect ratio
-                aspect = pil_img.width / pil_img.height
+                # For S3 URLs, download the image (cached across reports)
+                image_bytes, aspect = _fetch_claim_image(image_url)
                 
                 # Set max dimensions
                 max_width = 4 * inch
@@ -376,78 +528,95 @@ class ReportService:
                     height = max_height
                     width = max_height * aspect
                 
-                img = RLImage(io.BytesIO(response.content), width=width, height=height)
+                img = RLImage(io.BytesIO(image_bytes), width=width, height=height)
             
             return img
         except Exception as e:
             # Return placeholder text if image cannot be loaded
-            from reportlab.platypus import Paragraph
-            from reportlab.lib.styles import getSampleStyleSheet
-            styles = getSampleStyleSheet()
-            return Paragraph(f"[Image unavailable: {str(e)}]", styles['Normal'])
+            return Paragraph(f"[Image unavailable: {str(e)}]", _STYLES['Normal'])
     
     def _create_ndmi_chart(self, current_ndmi: float, avg_ndmi: float) -> Drawing:
         """Create NDMI comparison bar chart"""
         drawing = Drawing(400, 200)
         
-        chart = VerticalBarChart()
-        chart.x = 50
-        chart.y = 50
-        chart.height = 125
-        chart.width = 300
+        # Reports render concurrently, so the shared template is never changed:
+        # the copy gets its own axes, which store their layout while drawing
+        chart = copy.copy(_NDMI_CHART_TEMPLATE)
+        chart.categoryAxis = copy.copy(_NDMI_CHART_TEMPLATE.categoryAxis)
+        chart.valueAxis = copy.copy(_NDMI_CHART_TEMPLATE.valueAxis)
         chart.data = [[current_ndmi, avg_ndmi]]
-        chart.categoryAxis.categoryNames = ['Current NDMI', '14-Day Average']
         chart.valueAxis.valueMin = min(current_ndmi, avg_ndmi, -0.3)
         chart.valueAxis.valueMax = max(current_ndmi, avg_ndmi, 0.3)
-        chart.bars[0].fillColor = colors.HexColor('#1a5490')
         
         drawing.add(chart)
         return drawing
     
-    async def _store_pdf(self, pdf_bytes: bytes, claim_id: uuid.UUID) -> str:
+    async def _store_pdf(self, pdf_file: BinaryIO, filename: str) -> str:
         """
         Store PDF in storage and return URL
         
         Args:
-            pdf_bytes: PDF file content
-            claim_id: Claim UUID
+            pdf_file: Readable PDF file positioned at the start
+            filename: Storage key for the PDF
             
         Returns:
             URL to access the PDF
         """
-        filename = f"reports/{claim_id}/{uuid.uuid4()}.pdf"
-        
+        # Both uploads block on I/O, so they run in a worker thread
         if self.storage_provider == "s3":
-            return self._upload_to_s3(pdf_bytes, filename)
+            return await asyncio.to_thread(self._upload_to_s3, pdf_file, filename)
         else:
-            return self._upload_locally(pdf_bytes, filename)
+            return await asyncio.to_thread(self._upload_locally, pdf_file, filename)
     
-    def _upload_to_s3(self, pdf_bytes: bytes, filename: str) -> str:
-        """Upload PDF to S3 and return signed URL"""
-        try:
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=filename,
-                Body=pdf_bytes,
-                ContentType='application/pdf'
-            )
+    def _pdf_exists(self, filename: str) -> bool:
+        """Check whether a PDF has already been stored"""
+        if self.storage_provider == "s3":
+            from botocore.exceptions import BotoCoreError, ClientError
             
-            # Generate signed URL valid for 7 days
-            signed_url = self.s3_client.generate_presigned_url(
+            try:
+                self.s3_client.head_object(Bucket=self.bucket, Key=filename)
+                return True
+            except (BotoCoreError, ClientError):
+                return False
+        
+        return (Path("uploads") / filename).exists()
+    
+    def _pdf_url(self, filename: str) -> str:
+        """URL for a stored PDF (signed URL valid for 7 days on S3)"""
+        if self.storage_provider == "s3":
+            return self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket, 'Key': filename},
                 ExpiresIn=7 * 24 * 60 * 60  # 7 days in seconds
             )
+        
+        return f"/uploads/{filename}"
+    
+    def _upload_to_s3(self, pdf_file: BinaryIO, filename: str) -> str:
+        """Stream PDF to S3 (multipart for large reports) and return signed URL"""
+        from boto3.s3.transfer import TransferConfig
+        
+        try:
+            # Upload to S3
+            self.s3_client.upload_fileobj(
+                pdf_file,
+                self.bucket,
+                filename,
+                ExtraArgs={'ContentType': 'application/pdf'},
+                Config=TransferConfig(
+                    multipart_threshold=PDF_MULTIPART_CHUNK_SIZE,
+                    multipart_chunksize=PDF_MULTIPART_CHUNK_SIZE,
+                    use_threads=True
+                )
+            )
             
-            return signed_url
+            # Generate signed URL valid for 7 days
+            return self._pdf_url(filename)
         except Exception as e:
             raise RuntimeError(f"Failed to upload PDF to S3: {str(e)}")
     
-    def _upload_locally(self, pdf_bytes: bytes, filename: str) -> str:
-        """Upload PDF to local filesystem (for development)"""
-        from pathlib import Path
-        
+    def _upload_locally(self, pdf_file: BinaryIO, filename: str) -> str:
+        """Copy PDF to local filesystem (for development)"""
         # Create uploads directory if it doesn't exist
         upload_dir = Path("uploads")
         upload_dir.mkdir(exist_ok=True)
@@ -456,9 +625,9 @@ class ReportService:
         file_path = upload_dir / filename
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write file
+        # Copy in chunks rather than reading the whole PDF into memory
         with open(file_path, 'wb') as f:
-            f.write(pdf_bytes)
+            shutil.copyfileobj(pdf_file, f)
         
         # Return local URL
         return f"/uploads/{filename}"
@@ -1,11 +1,12 @@
 """Satellite verification service using Google Earth Engine"""
 
+import asyncio
 import ee
 import redis
-import json
+import orjson
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple, Union
 from enum import Enum
 from pydantic import BaseModel
 from app.config import settings
@@ -134,6 +135,9 @@ class SatelliteService:
     # Cache TTL (seconds) - 24 hours
     CACHE_TTL = 86400
     
+    # Farm locations per Earth Engine request when warming the cache
+    WARM_BATCH_SIZE = 100
+    
     def __init__(self):
         self.gee_client = GEEClient()
         self.redis_client = None
@@ -148,10 +152,7 @@ class SatelliteService:
         """Get Redis client for caching"""
         if self.redis_client is None:
             try:
-                self.redis_client = redis.from_url(
-                    settings.REDIS_URL,
-                    decode_responses=True
-                )
+                self.redis_client = redis.from_url(settings.REDIS_URL)
                 # Test connection
                 self.redis_client.ping()
             except Exception as e:
@@ -172,13 +173,15 @@ class SatelliteService:
         Returns:
             Cache key string
         """
-        # Round coordinates to 4 decimal places (~11m precision)
-        lat_rounded = round(lat, 4)
-        lng_rounded = round(lng, 4)
+        # Round coordinates to 4 decimal places (~11m precision). As floats, so
+        # Decimal coordinates from the database give the same key.
+        lat_rounded = round(float(lat), 4)
+        lng_rounded = round(float(lng), 4)
         date_str = claim_date.strftime('%Y-%m-%d')
         
-        key_string = f"satellite:{lat_rounded}:{lng_rounded}:{date_str}"
-        return key_string
+        # Hashed to a short fixed-length key; there is one per farm per day
+        key_string = f"{lat_rounded}:{lng_rounded}:{date_str}"
+        return "satellite:" + hashlib.blake2b(key_string.encode(), digest_size=8).hexdigest()
     
     def _get_cached_result(self, cache_key: str) -> Optional[SpaceTruth]:
         """
@@ -197,15 +200,35 @@ class SatelliteService:
         try:
             cached_data = redis_client.get(cache_key)
             if cached_data:
-                data = json.loads(cached_data)
-                # Convert observation_date string back to datetime
-                data['observation_date'] = datetime.fromisoformat(data['observation_date'])
-                return SpaceTruth(**data)
+                return self._load_cached(cached_data)
         except Exception as e:
             logger.warning(f"Failed to retrieve cached result: {str(e)}")
         
         return None
     
+    def _get_cached_results(self, cache_keys: Sequence[str]) -> List[Optional[SpaceTruth]]:
+        """
+        Get many cached satellite results with one MGET
+        
+        Args:
+            cache_keys: Cache keys
+            
+        Returns:
+            SpaceTruth or None for each key, in order
+        """
+        redis_client = self._get_redis_client()
+        if redis_client is None or not cache_keys:
+            return [None] * len(cache_keys)
+        
+        try:
+            return [
+                self._load_cached(cached_data) if cached_data else None
+                for cached_data in redis_client.mget(cache_keys)
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to retrieve cached results: {str(e)}")
+            return [None] * len(cache_keys)
+    
     def _cache_result(self, cache_key: str, result: SpaceTruth) -> None:
         """
         Cache satellite result
@@ -219,18 +242,41 @@ class SatelliteService:
             return
         
         try:
-            # Convert to dict and handle datetime serialization
-            data = result.model_dump()
-            data['observation_date'] = data['observation_date'].isoformat()
-            
             redis_client.setex(
                 cache_key,
                 self.CACHE_TTL,
-                json.dumps(data)
+                self._dump_cached(result)
             )
         except Exception as e:
             logger.warning(f"Failed to cache result: {str(e)}")
     
+    def _cache_results(self, items: Sequence[Tuple[str, SpaceTruth]]) -> None:
+        """
+        Cache many satellite results in one pipelined round trip
+        
+        Args:
+            items: (cache key, SpaceTruth) pairs
+        """
+        redis_client = self._get_redis_client()
+        if redis_client is None or not items:
+            return
+        
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for cache_key, result in items:
+                pipe.setex(cache_key, self.CACHE_TTL, self._dump_cached(result))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache results: {str(e)}")
+    
+    def _load_cached(self, cached_data: bytes) -> SpaceTruth:
+        """Deserialize a cached SpaceTruth (observation_date is parsed by the model)"""
+        return SpaceTruth(**orjson.loads(cached_data))
+    
+    def _dump_cached(self, result: SpaceTruth) -> bytes:
+        """Serialize a SpaceTruth for the cache (orjson writes datetimes as ISO 8601)"""
+        return orjson.dumps(result.model_dump())
+    
     async def verify_claim(
         self,
         lat: float,
@@ -251,9 +297,9 @@ class SatelliteService:
         Raises:
             Exception: If satellite verification fails
         """
-        # Check cache first
+        # Check cache first (Redis calls block, so they run in a worker thread)
         cache_key = self._generate_cache_key(lat, lng, claim_date)
-        cached_result = self._get_cached_result(cache_key)
+        cached_result = await asyncio.to_thread(self._get_cached_result, cache_key)
         
         if cached_result:
             logger.info(f"Using cached satellite data for {cache_key}")
@@ -263,10 +309,12 @@ class SatelliteService:
         logger.info(f"Querying satellite data for lat={lat}, lng={lng}, date={claim_date}")
         
         try:
-            result = self._query_satellite_data(lat, lng, claim_date)
+            # getInfo() blocks for the whole Earth Engine request (and retry
+            # sleeps), so the query runs in a worker thread
+            result = await asyncio.to_thread(self._query_satellite_data, lat, lng, claim_date)
             
             # Cache the result
-            self._cache_result(cache_key, result)
+            await asyncio.to_thread(self._cache_result, cache_key, result)
             
             return result
             
@@ -274,6 +322,85 @@ class SatelliteService:
             logger.error(f"Satellite verification failed: {str(e)}")
             raise
     
+    async def verify_claims_batch(
+        self,
+        points: Sequence[Tuple[float, float, datetime]]
+    ) -> List[Union[SpaceTruth, Exception]]:
+        """
+        Verify many claims, querying Earth Engine once for all uncached points
+        
+        Args:
+            points: (latitude, longitude, claim date) for each claim
+            
+        Returns:
+            One result per point, in order: its SpaceTruth, or the exception
+            that failed it (e.g. no suitable imagery)
+            
+        Raises:
+            Exception: If the Earth Engine request itself fails
+        """
+        cache_keys = [self._generate_cache_key(lat, lng, claim_date) for lat, lng, claim_date in points]
+        results: List[Union[SpaceTruth, Exception, None]] = await asyncio.to_thread(
+            self._get_cached_results, cache_keys
+        )
+        misses = [i for i, result in enumerate(results) if result is None]
+        
+        if not misses:
+            return results
+        
+        logger.info(f"Querying satellite data for {len(misses)} of {len(points)} claims")
+        
+        # One request for all misses: each point's own query in a server-side list
+        query = ee.List([self._build_satellite_query(*points[i]) for i in misses])
+        try:
+            query_results = await asyncio.to_thread(self.gee_client.execute_with_retry, query.getInfo)
+        except Exception as e:
+            logger.error(f"Batch satellite verification failed: {str(e)}")
+            raise
+        
+        to_cache = []
+        for i, query_result in zip(misses, query_results):
+            lat, lng, claim_date = points[i]
+            try:
+                results[i] = self._parse_satellite_data(query_result, lat, lng, claim_date)
+            except Exception as e:
+                logger.error(f"Satellite verification failed for lat={lat}, lng={lng}: {str(e)}")
+                results[i] = e
+            else:
+                to_cache.append((cache_keys[i], results[i]))
+        
+        await asyncio.to_thread(self._cache_results, to_cache)
+        
+        return results
+    
+    async def warm_cache(self, farm_locations: Iterable[Tuple[float, float]]) -> int:
+        """
+        Pre-fetch today's satellite data for farms so claims submitted today
+        are served from the cache
+        
+        Args:
+            farm_locations: (latitude, longitude) of each farm
+            
+        Returns:
+            Number of farms with satellite data cached for today
+        """
+        # Claims are keyed by the date they were created (UTC)
+        today = datetime.now(timezone.utc)
+        points = [(lat, lng, today) for lat, lng in farm_locations]
+        
+        warmed = 0
+        for start in range(0, len(points), self.WARM_BATCH_SIZE):
+            batch = points[start:start + self.WARM_BATCH_SIZE]
+            try:
+                results = await self.verify_claims_batch(batch)
+            except Exception as e:
+                logger.warning(f"Failed to warm satellite cache for {len(batch)} farms: {str(e)}")
+                continue
+            warmed += sum(isinstance(result, SpaceTruth) for result in results)
+        
+        logger.info(f"Satellite cache warm for {warmed} of {len(points)} farms")
+        return warmed
+    
     def _query_satellite_data(
         self,
         lat: float,
@@ -294,8 +421,36 @@ class SatelliteService:
         Raises:
             Exception: If no suitable imagery is found or calculation fails
         """
-        # Create point geometry
+        # The whole query is fetched with a single getInfo(), so a
+        # verification costs one round trip to Earth Engine
+        query = self._build_satellite_query(lat, lng, claim_date)
+        results = self.gee_client.execute_with_retry(query.getInfo)
+        
+        return self._parse_satellite_data(results, lat, lng, claim_date)
+    
+    def _build_satellite_query(
+        self,
+        lat: float,
+        lng: float,
+        claim_date: datetime
+    ) -> ee.Dictionary:
+        """
+        Build the deferred Earth Engine computation for one claim
+        
+        Args:
+            lat: Farm latitude
+            lng: Farm longitude
+            claim_date: Date of claim submission
+            
+        Returns:
+            Dictionary with 'recent' (ndmi, time_start and cloud_cover of the
+            least cloudy recent image, or null) and 'ndmi_14day'
+        """
+        # Create point geometry, and the sampling region and reducer shared by
+        # the recent and baseline reductions
         point = ee.Geometry.Point([lng, lat])
+        region = point.buffer(self.SAMPLE_BUFFER)
+        reducer = ee.Reducer.mean()
         
         # Define date ranges
         recent_start = claim_date - timedelta(days=self.RECENT_IMAGE_DAYS)
@@ -303,59 +458,95 @@ class SatelliteService:
         baseline_start = claim_date - timedelta(days=self.BASELINE_START_DAYS)
         baseline_end = claim_date - timedelta(days=self.BASELINE_END_DAYS)
         
-        # Query recent image with retry logic
-        def get_recent_image():
-            collection = ee.ImageCollection(self.SENTINEL2_COLLECTION) \
-                .filterBounds(point) \
-                .filterDate(recent_start.isoformat(), recent_end.isoformat()) \
-                .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', self.MAX_CLOUD_COVER)) \
-                .sort('CLOUDY_PIXEL_PERCENTAGE')
-            
-            # Get the first (least cloudy) image
-            image = collection.first()
-            
-            # Check if image exists
-            image_info = image.getInfo()
-            if image_info is None:
-                raise Exception(
-                    f"No suitable Sentinel-2 imagery found for location ({lat}, {lng}) "
-                    f"between {recent_start.date()} and {recent_end.date()} "
-                    f"with cloud cover < {self.MAX_CLOUD_COVER}%"
-                )
-            
-            return image
-        
-        recent_image = self.gee_client.execute_with_retry(get_recent_image)
+        collection = ee.ImageCollection(self.SENTINEL2_COLLECTION) \
+            .filterBounds(point) \
+            .filterDate(recent_start.isoformat(), recent_end.isoformat()) \
+            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', self.MAX_CLOUD_COVER)) \
+            .sort('CLOUDY_PIXEL_PERCENTAGE')
+        
+        # The first (least cloudy) image, if there is one
+        recent_image = ee.Image(collection.first())
+        recent = ee.Algorithms.If(
+            collection.size().gt(0),
+            ee.Dictionary({
+                'ndmi': self._calculate_ndmi(recent_image, region, reducer),
+                'time_start': recent_image.get('system:time_start'),
+                'cloud_cover': recent_image.get('CLOUDY_PIXEL_PERCENTAGE')
+            }),
+            None
+        )
         
-        # Calculate NDMI for recent image
-        ndmi_value = self._calculate_ndmi(recent_image, point)
+        return ee.Dictionary({
+            'recent': recent,
+            'ndmi_14day': self._calculate_baseline_ndmi(point, region, reducer, baseline_start, baseline_end)
+        })
+    
+    def _parse_satellite_data(
+        self,
+        results: Dict[str, Any],
+        lat: float,
+        lng: float,
+        claim_date: datetime
+    ) -> SpaceTruth:
+        """
+        Turn the fetched result of _build_satellite_query into a SpaceTruth
         
-        # Get image metadata
-        def get_image_metadata():
-            return recent_image.getInfo()
+        Args:
+            results: getInfo() result of the claim's query
+            lat: Farm latitude
+            lng: Farm longitude
+            claim_date: Date of claim submission
+            
+        Returns:
+            SpaceTruth with NDMI values and verdict
+            
+        Raises:
+            Exception: If no suitable imagery was found or NDMI has no valid pixels
+        """
+        recent_info = results.get('recent')
+        if recent_info is None:
+            recent_start = claim_date - timedelta(days=self.RECENT_IMAGE_DAYS)
+            recent_end = claim_date + timedelta(days=self.RECENT_IMAGE_DAYS)
+            raise Exception(
+                f"No suitable Sentinel-2 imagery found for location ({lat}, {lng}) "
+                f"between {recent_start.date()} and {recent_end.date()} "
+                f"with cloud cover < {self.MAX_CLOUD_COVER}%"
+            )
         
-        image_metadata = self.gee_client.execute_with_retry(get_image_metadata)
+        if recent_info.get('ndmi') is None:
+            raise Exception("Failed to calculate NDMI - no valid pixels in region")
+        ndmi_value = float(recent_info['ndmi'])
         
-        observation_date = datetime.fromtimestamp(
-            image_metadata['properties']['system:time_start'] / 1000
-        )
-        cloud_cover_pct = image_metadata['properties']['CLOUDY_PIXEL_PERCENTAGE']
+        observation_date = datetime.fromtimestamp(recent_info['time_start'] / 1000)
+        cloud_cover_pct = recent_info['cloud_cover']
         
-        # Calculate 14-day baseline NDMI
-        ndmi_14day_avg = self._calculate_baseline_ndmi(point, baseline_start, baseline_end)
+        ndmi_14day_avg = results.get('ndmi_14day')
+        if ndmi_14day_avg is None:
+            # If no baseline data available, use 0 as neutral baseline
+            baseline_start = claim_date - timedelta(days=self.BASELINE_START_DAYS)
+            baseline_end = claim_date - timedelta(days=self.BASELINE_END_DAYS)
+            logger.warning(
+                f"No baseline imagery found for period {baseline_start.date()} to {baseline_end.date()}"
+            )
+            ndmi_14day_avg = 0.0
         
         # Generate verdict
         verdict = self._generate_verdict(ndmi_value)
         
         return SpaceTruth(
             ndmi_value=ndmi_value,
-            ndmi_14day_avg=ndmi_14day_avg,
+            ndmi_14day_avg=float(ndmi_14day_avg),
             observation_date=observation_date,
             cloud_cover_pct=cloud_cover_pct,
             verdict=verdict
         )
     
-    def _calculate_ndmi(self, image: ee.Image, point: ee.Geometry.Point) -> float:
+    def _calculate_ndmi(
+        self,
+        image: ee.Image,
+        region: ee.Geometry,
+        reducer: ee.ComputedObject
+    ) -> ee.ComputedObject:
         """
         Calculate NDMI (Normalized Difference Moisture Index) for an image
         
@@ -364,86 +555,75 @@ class SatelliteService:
         
         Args:
             image: Sentinel-2 image
-            point: Point geometry for sampling
+            region: Buffered farm point to sample
+            reducer: Mean reducer for the region
             
         Returns:
-            NDMI value (typically ranges from -1 to 1)
+            Deferred NDMI value (typically ranges from -1 to 1); null if the
+            region has no valid pixels
         """
-        def calculate():
-            # Calculate NDMI using normalized difference
-            ndmi = image.normalizedDifference(['B8A', 'B11'])
-            
-            # Sample NDMI value at the point with buffer
-            ndmi_value = ndmi.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=point.buffer(self.SAMPLE_BUFFER),
-                scale=self.SPATIAL_SCALE,
-                maxPixels=1e9
-            ).get('nd')
-            
-            # Get the value
-            result = ndmi_value.getInfo()
-            
-            if result is None:
-                raise Exception("Failed to calculate NDMI - no valid pixels in region")
-            
-            return float(result)
-        
-        return self.gee_client.execute_with_retry(calculate)
+        # Calculate NDMI using normalized difference
+        ndmi = image.normalizedDifference(['B8A', 'B11'])
+        
+        # Sample NDMI value over the region
+        return ndmi.reduceRegion(
+            reducer=reducer,
+            geometry=region,
+            scale=self.SPATIAL_SCALE,
+            maxPixels=1e9
+        ).get('nd')
     
     def _calculate_baseline_ndmi(
         self,
         point: ee.Geometry.Point,
+        region: ee.Geometry,
+        reducer: ee.ComputedObject,
         start_date: datetime,
         end_date: datetime
-    ) -> float:
+    ) -> ee.ComputedObject:
         """
         Calculate 14-day moving average NDMI for baseline comparison
         
         Args:
-            point: Point geometry for sampling
+            point: Farm point, to filter imagery
+            region: Buffered farm point to sample
+            reducer: Mean reducer for the region
             start_date: Start date for baseline period
             end_date: End date for baseline period
             
         Returns:
-            Average NDMI value over the baseline period
-        """
-        def calculate():
-            # Get collection for baseline period
-            collection = ee.ImageCollection(self.SENTINEL2_COLLECTION) \
-                .filterBounds(point) \
-                .filterDate(start_date.isoformat(), end_date.isoformat()) \
-                .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', self.MAX_CLOUD_COVER))
-            
-            # Calculate NDMI for each image
-            def calc_ndmi(image):
-                return image.normalizedDifference(['B8A', 'B11'])
-            
-            ndmi_collection = collection.map(calc_ndmi)
-            
-            # Calculate mean NDMI across all images
-            mean_ndmi = ndmi_collection.mean()
-            
-            # Sample at the point
-            ndmi_value = mean_ndmi.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=point.buffer(self.SAMPLE_BUFFER),
+            Deferred average NDMI value over the baseline period; null if
+            there is no baseline imagery
+        """
+        # Get collection for baseline period
+        collection = ee.ImageCollection(self.SENTINEL2_COLLECTION) \
+            .filterBounds(point) \
+            .filterDate(start_date.isoformat(), end_date.isoformat()) \
+            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', self.MAX_CLOUD_COVER))
+        
+        # Calculate NDMI for each image
+        def calc_ndmi(image):
+            return image.normalizedDifference(['B8A', 'B11'])
+        
+        ndmi_collection = collection.map(calc_ndmi)
+        
+        # Calculate mean NDMI across all images
+        mean_ndmi = ndmi_collection.mean()
+        
+        # Sample over the region. The mean of an empty collection has no
+        # bands, so .get('nd') would fail server-side and take every other
+        # point of a batched request down with it; only sample when there
+        # is baseline imagery.
+        return ee.Algorithms.If(
+            collection.size().gt(0),
+            mean_ndmi.reduceRegion(
+                reducer=reducer,
+                geometry=region,
                 scale=self.SPATIAL_SCALE,
                 maxPixels=1e9
-            ).get('nd')
-            
-            result = ndmi_value.getInfo()
-            
-            if result is None:
-                # If no baseline data available, return 0 as neutral baseline
-                logger.warning(
-                    f"No baseline imagery found for period {start_date.date()} to {end_date.date()}"
-                )
-                return 0.0
-            
-            return float(result)
-        
-        return self.gee_client.execute_with_retry(calculate)
+            ).get('nd'),
+            None
+        )
     
     def _generate_verdict(self, ndmi_value: float) -> SatelliteVerdict:
         """
@@ -2,7 +2,7 @@
 
 import africastalking
 import asyncio
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from app.config import settings
 import logging
 
@@ -18,6 +18,9 @@ class SMSService:
     - Include claim amount in Kenya Shillings (KES)
     """
     
+    # API calls in flight at once from send_bulk
+    BULK_CONCURRENCY = 10
+    
     def __init__(self):
         """Initialize Africa's Talking SDK"""
         # Initialize SDK
@@ -26,6 +29,8 @@ class SMSService:
             api_key=settings.AFRICASTALKING_API_KEY
         )
         self.sms = africastalking.SMS
+        # Bound once; every message is sent through it
+        self._send = self.sms.send
     
     async def send_otp(self, phone_number: str, otp: str) -> bool:
         """
@@ -38,36 +43,8 @@ class SMSService:
         Returns:
             bool: True if SMS was sent successfully, False otherwise
         """
-        try:
-            message = f"Your MavunoSure verification code is: {otp}. Valid for 5 minutes."
-            
-            # Send SMS in thread pool to avoid blocking
-            response = await asyncio.to_thread(
-                self.sms.send,
-                message,
-                [phone_number]
-            )
-            
-            logger.info(f"OTP SMS sent to {phone_number}: {response}")
-            
-            # Check if SMS was sent successfully
-            if response.get('SMSMessageData', {}).get('Recipients'):
-                recipient = response['SMSMessageData']['Recipients'][0]
-                if recipient.get('status') == 'Success':
-                    logger.info(f"OTP SMS delivered successfully to {phone_number}")
-                    return True
-                else:
-                    logger.warning(
-                        f"OTP SMS failed for {phone_number}: "
-                        f"status={recipient.get('status')}, "
-                        f"cost={recipient.get('cost')}"
-                    )
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Failed to send OTP SMS to {phone_number}: {str(e)}")
-            return False
+        message = f"Your MavunoSure verification code is: {otp}. Valid for 5 minutes."
+        return await self.send_message(phone_number, message)
     
     async def send_message(self, phone_number: str, message: str) -> bool:
         """
@@ -83,7 +60,7 @@ class SMSService:
         try:
             # Send SMS in thread pool to avoid blocking
             response = await asyncio.to_thread(
-                self.sms.send,
+                self._send,
                 message,
                 [phone_number]
             )
@@ -113,6 +90,56 @@ class SMSService:
             logger.error(f"Failed to send SMS to {phone_number}: {str(e)}")
             return False
     
+    async def send_bulk(self, messages: Sequence[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        Send many SMS messages, one API call per distinct message text
+        
+        Recipients of the same text (e.g. payouts of the same amount) share a
+        single send, and up to BULK_CONCURRENCY sends run at once.
+        
+        Args:
+            messages: (phone number, message) pairs
+            
+        Returns:
+            Dict mapping each phone number to True if all its messages were sent
+        """
+        recipients_by_message: Dict[str, List[str]] = {}
+        for phone_number, message in messages:
+            recipients_by_message.setdefault(message, []).append(phone_number)
+        
+        semaphore = asyncio.Semaphore(self.BULK_CONCURRENCY)
+        
+        async def send_group(message: str, phone_numbers: List[str]) -> Dict[str, bool]:
+            try:
+                async with semaphore:
+                    response = await asyncio.to_thread(self._send, message, phone_numbers)
+            except Exception as e:
+                logger.error(f"Failed to send SMS to {len(phone_numbers)} recipients: {str(e)}")
+                return {phone_number: False for phone_number in phone_numbers}
+            
+            delivered = {
+                recipient.get('number'): recipient.get('status') == 'Success'
+                for recipient in response.get('SMSMessageData', {}).get('Recipients', [])
+            }
+            logger.info(
+                f"SMS sent to {sum(delivered.values())}/{len(phone_numbers)} recipients"
+            )
+            return {phone_number: delivered.get(phone_number, False) for phone_number in phone_numbers}
+        
+        group_results = await asyncio.gather(
+            *(send_group(message, phone_numbers) for message, phone_numbers in recipients_by_message.items())
+        )
+        
+        results: Dict[str, bool] = {}
+        for group in group_results:
+            for phone_number, sent in group.items():
+                results[phone_number] = results.get(phone_number, True) and sent
+        return results
+    
+    def payment_notification_message(self, amount: float) -> str:
+        """Payment notification text, with the amount in KES (requirement 9.3)"""
+        return f"MavunoSure: Your claim for KES {amount:,.2f} has been approved and payment sent."
+    
     async def send_payment_notification(
         self,
         phone_number: str,
@@ -135,8 +162,7 @@ class SMSService:
             bool: True if SMS was sent successfully, False otherwise
         """
         try:
-            # Format message with amount in KES (requirement 9.3)
-            message = f"MavunoSure: Your claim for KES {amount:,.2f} has been approved and payment sent."
+            message = self.payment_notification_message(amount)
             
             if claim_id:
                 logger.info(f"Sending payment notification for claim {claim_id} to {phone_number}")
@@ -1,11 +1,46 @@
 """Storage service for file uploads"""
 
-import base64
 import uuid
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from io import BytesIO
 from app.config import settings
 
+# Limits for images uploaded by clients directly to S3
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_EXPIRES_SECONDS = 300
+
+# Connections kept open per S3 client; uploads and HEAD checks from worker
+# threads share the pool
+S3_MAX_POOL_CONNECTIONS = 50
+
+# Images at least this large are uploaded to S3 in parts of this size,
+# sent in parallel
+IMAGE_MULTIPART_CHUNK_SIZE = 5 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Shared S3 client for all services (created on first use)
+    
+    boto3 clients are thread-safe, so one client and its connection pool are
+    reused across requests instead of each service opening its own.
+    """
+    import boto3
+    from botocore.config import Config
+    
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        )
+    )
+
 
 class StorageService:
     """Service for handling file storage operations"""
@@ -19,36 +54,20 @@ class StorageService:
     def s3_client(self):
         """Lazy load S3 client"""
         if self._s3_client is None and self.provider == "s3":
-            import boto3
-            self._s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
+            self._s3_client = get_s3_client()
         return self._s3_client
     
-    def upload_claim_image(self, image_data: str, claim_id: uuid.UUID) -> str:
+    def upload_claim_image(self, image_bytes: bytes, claim_id: uuid.UUID) -> str:
         """
         Upload claim image to storage
         
         Args:
-            image_data: Base64 encoded image data
+            image_bytes: Image data (decoded from base64 by the ClaimCreate schema)
             claim_id: Unique claim identifier
             
         Returns:
             URL of uploaded image
         """
-        # Decode base64 image
-        try:
-            # Remove data URL prefix if present
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]
-            
-            image_bytes = base64.b64decode(image_data)
-        except Exception as e:
-            raise ValueError(f"Invalid image data: {str(e)}")
-        
         # Generate unique filename
         filename = f"claims/{claim_id}/{uuid.uuid4()}.jpg"
         
@@ -58,18 +77,83 @@ class StorageService:
             # For development/testing, store locally
             return self._upload_locally(image_bytes, filename)
     
-    def _upload_to_s3(self, image_bytes: bytes, filename: str) -> str:
-        """Upload image to S3"""
+    def create_claim_image_upload(self, claim_id: uuid.UUID) -> Tuple[str, dict, str]:
+        """
+        Create a pre-signed POST for the client to upload a claim image to S3
+        
+        Args:
+            claim_id: Unique claim identifier
+            
+        Returns:
+            Tuple of (upload URL, form fields, URL the image will have)
+        """
+        if self.provider != "s3":
+            raise RuntimeError("Direct image uploads require S3 storage")
+        
+        filename = f"claims/{claim_id}/{uuid.uuid4()}.jpg"
+        
         try:
-            self.s3_client.put_object(
+            post = self.s3_client.generate_presigned_post(
                 Bucket=self.bucket,
                 Key=filename,
-                Body=image_bytes,
-                ContentType='image/jpeg'
+                Fields={"Content-Type": "image/jpeg"},
+                Conditions=[
+                    {"Content-Type": "image/jpeg"},
+                    ["content-length-range", 1, IMAGE_UPLOAD_MAX_BYTES]
+                ],
+                ExpiresIn=IMAGE_UPLOAD_EXPIRES_SECONDS
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create upload URL: {str(e)}")
+        
+        return post["url"], post["fields"], self._s3_url(filename)
+    
+    def image_exists(self, image_url: str) -> bool:
+        """
+        Check whether an image has been stored
+        
+        Args:
+            image_url: URL of the image
+            
+        Returns:
+            True if the image exists, False otherwise
+        """
+        if self.provider == "s3":
+            try:
+                key = image_url.split(f"{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/")[1]
+                self.s3_client.head_object(Bucket=self.bucket, Key=key)
+                return True
+            except Exception:
+                return False
+        else:
+            import os
+            return os.path.exists(image_url.replace("/uploads/", "uploads/"))
+    
+    def _s3_url(self, filename: str) -> str:
+        """Public URL of an object in the claims bucket"""
+        return f"https://{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
+    
+    def _upload_to_s3(self, image_bytes: bytes, filename: str) -> str:
+        """Upload image to S3 (multipart for large images)"""
+        from boto3.s3.transfer import TransferConfig
+        
+        try:
+            # BytesIO shares the decoded bytes rather than copying them
+            self.s3_client.upload_fileobj(
+                BytesIO(image_bytes),
+                self.bucket,
+                filename,
+                ExtraArgs={'ContentType': 'image/jpeg'},
+                Config=TransferConfig(
+                    multipart_threshold=IMAGE_MULTIPART_CHUNK_SIZE,
+                    multipart_chunksize=IMAGE_MULTIPART_CHUNK_SIZE,
+                    max_concurrency=4,
+                    use_threads=True
+                )
             )
             
             # Return S3 URL
-            return f"https://{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
+            return self._s3_url(filename)
         except Exception as e:
             raise RuntimeError(f"Failed to upload to S3: {str(e)}")
     
@@ -4,12 +4,16 @@ from app.tasks.claim_tasks import (
     process_claim_satellite_verification,
     process_claim_weighted_algorithm,
     process_claim_payment,
-    process_claim_workflow
+    process_claim_workflow,
+    warm_satellite_cache,
+    warm_satellite_cache_batch
 )
 
 __all__ = [
     "process_claim_satellite_verification",
     "process_claim_weighted_algorithm",
     "process_claim_payment",
-    "process_claim_workflow"
+    "process_claim_workflow",
+    "warm_satellite_cache",
+    "warm_satellite_cache_batch"
 ]
@@ -1,13 +1,16 @@
 """Celery tasks for claim processing"""
 
+import asyncio
 import logging
 from uuid import UUID
 from datetime import datetime
-from celery import chain
+from celery import chain, group
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
 from app.database import SessionLocal
+from app.models.farm import Farm
 from app.services.claim_service import claim_service
 from app.services.satellite_service import satellite_service
 from app.services.weighted_verification_service import weighted_verification_service
@@ -45,8 +48,8 @@ def process_claim_satellite_verification(self, claim_id: str):
     
     db = get_db()
     try:
-        # Get claim from database
-        claim = claim_service.get_claim_by_id(UUID(claim_id), db)
+        # Get claim and its farm from database in one query
+        claim = claim_service.get_claim_by_id(UUID(claim_id), db, detail=False, with_farm=True)
         if not claim:
             raise ValueError(f"Claim {claim_id} not found")
         
@@ -54,13 +57,13 @@ def process_claim_satellite_verification(self, claim_id: str):
         if not claim.farm:
             raise ValueError(f"Farm not found for claim {claim_id}")
         
-        lat = float(claim.farm.gps_lat)
-        lng = float(claim.farm.gps_lng)
+        lat = claim.farm.gps_lat
+        lng = claim.farm.gps_lng
         claim_date = claim.created_at
         
         # Query satellite data
         try:
-            space_truth = satellite_service.verify_claim(lat, lng, claim_date)
+            space_truth = asyncio.run(satellite_service.verify_claim(lat, lng, claim_date))
         except Exception as e:
             logger.error(f"Satellite verification failed for claim {claim_id}: {str(e)}")
             # Retry the task
@@ -216,7 +219,7 @@ def process_claim_payment(self, claim_id: str, verification_result: dict = None)
     db = get_db()
     try:
         # Get claim from database
-        claim = claim_service.get_claim_by_id(UUID(claim_id), db)
+        claim = claim_service.get_claim_by_id(UUID(claim_id), db, detail=False)
         if not claim:
             raise ValueError(f"Claim {claim_id} not found")
         
@@ -305,3 +308,51 @@ def process_claim_workflow(claim_id: str):
     logger.info(f"Claim processing workflow queued for claim {claim_id}")
     
     return result
+
+
+@celery_app.task(name="warm_satellite_cache")
+def warm_satellite_cache():
+    """
+    Pre-fetch today's satellite data for every registered farm
+    
+    Run periodically by Celery beat so satellite verification of new claims
+    is usually a cache hit instead of an Earth Engine request. Fans out one
+    warm_satellite_cache_batch task per WARM_BATCH_SIZE farms, so each stays
+    well inside the task time limits however many farms are registered.
+    
+    Returns:
+        dict with the number of farms and batches queued
+    """
+    db = get_db()
+    try:
+        farm_locations = db.execute(select(Farm.gps_lat, Farm.gps_lng).distinct()).all()
+    finally:
+        db.close()
+    
+    batch_size = satellite_service.WARM_BATCH_SIZE
+    batches = [
+        [tuple(location) for location in farm_locations[start:start + batch_size]]
+        for start in range(0, len(farm_locations), batch_size)
+    ]
+    if batches:
+        group(warm_satellite_cache_batch.s(batch) for batch in batches).apply_async()
+    
+    logger.info(f"Queued satellite cache warming for {len(farm_locations)} farms in {len(batches)} batches")
+    
+    return {"farms": len(farm_locations), "batches": len(batches)}
+
+
+@celery_app.task(name="warm_satellite_cache_batch")
+def warm_satellite_cache_batch(farm_locations: list):
+    """
+    Pre-fetch today's satellite data for one batch of farms
+    
+    Args:
+        farm_locations: [latitude, longitude] of each farm
+    
+    Returns:
+        dict with the number of farms warmed
+    """
+    warmed = asyncio.run(satellite_service.warm_cache(farm_locations))
+    
+    return {"farms": len(farm_locations), "warmed": warmed}
@@ -1,5 +1,10 @@
 """Pytest configuration and fixtures"""
 
+import os
+
+# Must be set before the app is imported (disables Sentry)
+os.environ.setdefault("ENVIRONMENT", "test")
+
 import pytest
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
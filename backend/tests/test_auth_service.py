@@ -0,0 +1,177 @@
+"""Unit tests for auth service"""
+
+import pytest
+import redis
+import uuid
+from datetime import timedelta
+from unittest.mock import Mock, patch
+from app.core import security
+from app.core.security import create_access_token, decode_token, verify_token
+from app.models.agent import Agent
+from app.services.auth_service import auth_service
+
+
+class TestAuthService:
+    """Test current agent lookup and caching"""
+    
+    @pytest.fixture
+    def agent(self, db_session):
+        """Create a test agent"""
+        agent = Agent(phone_number="+254712345678", name="Test Agent")
+        db_session.add(agent)
+        db_session.commit()
+        db_session.refresh(agent)
+        return agent
+    
+    @pytest.fixture
+    def cache(self):
+        """Replace the agent cache with an in-memory dict"""
+        store = {}
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=lambda key: store.get(key))
+        mock_redis.setex = Mock(side_effect=lambda key, ttl, value: store.__setitem__(key, value))
+        mock_redis.delete = Mock(side_effect=lambda key: store.pop(key, None))
+        with patch.object(auth_service, 'redis_client', mock_redis), \
+             patch.object(auth_service, '_local_agents', {}):
+            yield store
+    
+    def test_get_current_agent_caches_agent(self, db_session, agent, cache):
+        """Test a lookup populates the cache"""
+        token = create_access_token(subject=agent.id)
+        
+        result = auth_service.get_current_agent(token, db_session)
+        
+        assert result.id == agent.id
+        assert f"auth:agent:{agent.id}" in cache
+    
+    def test_get_current_agent_served_from_cache(self, db_session, agent, cache):
+        """Test a cached agent is returned without querying the database"""
+        token = create_access_token(subject=agent.id)
+        auth_service.get_current_agent(token, db_session)
+        
+        with patch.object(db_session, 'query') as mock_query:
+            result = auth_service.get_current_agent(token, db_session)
+        
+        mock_query.assert_not_called()
+        assert result.id == agent.id
+        assert result.phone_number == agent.phone_number
+        assert result.name == agent.name
+    
+    def test_get_current_agent_redis_unavailable(self, db_session, agent):
+        """Test lookup falls back to the database when Redis is down"""
+        token = create_access_token(subject=agent.id)
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=redis.ConnectionError("down"))
+        mock_redis.setex = Mock(side_effect=redis.ConnectionError("down"))
+        
+        with patch.object(auth_service, 'redis_client', mock_redis):
+            result = auth_service.get_current_agent(token, db_session)
+        
+        assert result.id == agent.id
+    
+    def test_get_current_agent_served_from_local_cache(self, db_session, agent, cache):
+        """Test a recently used agent is returned without asking Redis"""
+        token = create_access_token(subject=agent.id)
+        auth_service.get_current_agent(token, db_session)
+        
+        auth_service.redis_client.get.reset_mock()
+        result = auth_service.get_current_agent(token, db_session)
+        
+        auth_service.redis_client.get.assert_not_called()
+        assert result.id == agent.id
+    
+    def test_get_current_agent_served_from_redis(self, db_session, agent, cache):
+        """Test an agent cached by another process is read back from Redis"""
+        token = create_access_token(subject=agent.id)
+        auth_service.get_current_agent(token, db_session)
+        auth_service._local_agents.clear()
+        
+        with patch.object(db_session, 'query') as mock_query:
+            result = auth_service.get_current_agent(token, db_session)
+        
+        mock_query.assert_not_called()
+        assert result.id == agent.id
+        assert result.created_at == agent.created_at
+        assert agent.id in auth_service._local_agents
+    
+    def test_invalidate_cached_agent(self, db_session, agent, cache):
+        """Test invalidation clears both tiers and notifies other processes"""
+        token = create_access_token(subject=agent.id)
+        auth_service.get_current_agent(token, db_session)
+        
+        auth_service._invalidate_cached_agent(agent.id)
+        
+        assert agent.id not in auth_service._local_agents
+        assert cache == {}
+        auth_service.redis_client.publish.assert_called_once_with("auth:agent:invalidate", str(agent.id))
+    
+    def test_record_login(self, db_session, agent, cache):
+        """Test a login updates an existing agent and creates a new one"""
+        assert auth_service._record_login(agent.phone_number, db_session) == agent.id
+        db_session.refresh(agent)
+        assert agent.last_login is not None
+        
+        new_id = auth_service._record_login("+254700000000", db_session)
+        new_agent = db_session.query(Agent).filter(Agent.id == new_id).one()
+        assert new_agent.phone_number == "+254700000000"
+        assert new_agent.last_login is not None
+    
+    def test_get_current_agent_invalid_token(self, db_session, cache):
+        """Test invalid token is rejected before the cache is consulted"""
+        with pytest.raises(ValueError):
+            auth_service.get_current_agent("not-a-token", db_session)
+        
+        assert cache == {}
+
+
+class TestTokenCache:
+    """Test decoded JWT caching"""
+    
+    def test_decode_token_cached(self):
+        """Test a repeated token is not verified again"""
+        token = create_access_token(subject="agent-1")
+        decode_token(token)
+        
+        with patch.object(security.jwt, 'decode') as mock_decode:
+            payload = decode_token(token)
+        
+        mock_decode.assert_not_called()
+        assert payload["sub"] == "agent-1"
+    
+    def test_decode_token_invalid_cached(self):
+        """Test a rejected token stays rejected without re-verification"""
+        assert decode_token("not-a-token") is None
+        
+        with patch.object(security.jwt, 'decode') as mock_decode:
+            assert decode_token("not-a-token") is None
+        
+        mock_decode.assert_not_called()
+    
+    def test_decode_token_expired_not_served(self):
+        """Test an expired token is rejected even if it was cached"""
+        token = create_access_token(subject="agent-1", expires_delta=timedelta(seconds=-1))
+        security._token_cache[token] = ({"sub": "agent-1", "type": "access"}, 0)
+        
+        assert decode_token(token) is None
+        assert security._token_cache[token][0] is None
+    
+    def test_decode_token_expired_skips_verification(self):
+        """Test an expired token is rejected without a signature check"""
+        token = create_access_token(subject="agent-1", expires_delta=timedelta(seconds=-1))
+        
+        with patch.object(security.jwt, 'decode') as mock_decode:
+            assert decode_token(token) is None
+        
+        mock_decode.assert_not_called()
+    
+    def test_verify_token_cached(self):
+        """Test a repeated token returns its subject without verification"""
+        agent_id = uuid.uuid4()
+        token = create_access_token(subject=agent_id)
+        assert verify_token(token) == agent_id
+        
+        with patch.object(security.jwt, 'decode') as mock_decode:
+            assert verify_token(token) == agent_id
+            assert verify_token(token, token_type="refresh") is None
+        
+        mock_decode.assert_not_called()
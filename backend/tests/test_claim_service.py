@@ -0,0 +1,327 @@
+"""Unit tests for claim service"""
+
+import base64
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import Mock, patch
+from app.models.agent import Agent
+from app.models.claim import Claim
+from app.models.farm import Farm
+from pydantic import ValidationError
+from sqlalchemy import inspect
+from app.schemas.claim import ClaimCreate, ClaimInitiate, ClaimStatus, ClaimUpdate
+from app.services.claim_service import claim_service, encode_claim_cursor, decode_claim_cursor
+from app.services.storage_service import storage_service
+
+
+class TestClaimService:
+    """Test claim service list pagination"""
+    
+    @pytest.fixture
+    def claims(self, db_session):
+        """Create five claims with distinct creation times, newest first"""
+        base_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        created = []
+        for i in range(5):
+            claim = Claim(
+                status="pending" if i % 2 else "auto_approved",
+                image_url=f"https://storage.example.com/claims/test-image-{i}.jpg",
+                ml_class="drought_stress",
+                ml_confidence=0.85,
+                created_at=base_time + timedelta(hours=i)
+            )
+            db_session.add(claim)
+            created.append(claim)
+        db_session.commit()
+        return list(reversed(created))
+    
+    def test_get_claims_offset_page(self, db_session, claims):
+        """Test offset pagination returns the exact total and a next cursor"""
+        rows, total, next_cursor = claim_service.get_claims(db_session, page=1, page_size=2)
+        
+        assert total == 5
+        assert [row.id for row in rows] == [claims[0].id, claims[1].id]
+        assert next_cursor is not None
+    
+    def test_get_claims_offset_page_past_end(self, db_session, claims):
+        """Test a page past the end still reports the total"""
+        rows, total, next_cursor = claim_service.get_claims(db_session, page=10, page_size=2)
+        
+        assert rows == []
+        assert total == 5
+        assert next_cursor is None
+    
+    def test_get_claims_cursor_walks_all_claims(self, db_session, claims):
+        """Test following next_cursor visits every claim once, newest first"""
+        rows, total, next_cursor = claim_service.get_claims(db_session, page_size=2)
+        seen = [row.id for row in rows]
+        
+        while next_cursor:
+            rows, total, next_cursor = claim_service.get_claims(
+                db_session, page_size=2, cursor=next_cursor
+            )
+            seen.extend(row.id for row in rows)
+        
+        assert seen == [claim.id for claim in claims]
+    
+    def test_get_claims_no_cursor_after_last_page(self, db_session, claims):
+        """Test a full last page doesn't point to an empty next page"""
+        rows, total, next_cursor = claim_service.get_claims(db_session, page=1, page_size=5)
+        
+        assert len(rows) == 5
+        assert next_cursor is None
+        
+        rows, total, next_cursor = claim_service.get_claims(
+            db_session, status="pending", page_size=2
+        )
+        assert len(rows) == 2
+        assert next_cursor is None
+    
+    def test_get_claims_cursor_with_status_filter(self, db_session, claims):
+        """Test cursor pagination respects filters"""
+        rows, total, next_cursor = claim_service.get_claims(db_session, status="pending", page_size=1)
+        rows2, _, _ = claim_service.get_claims(
+            db_session, status="pending", page_size=1, cursor=next_cursor
+        )
+        
+        assert total == 2
+        assert [row.id for row in rows + rows2] == [claims[1].id, claims[3].id]
+    
+    def test_update_claim_status(self, db_session, claims):
+        """Test a status update returns the updated row"""
+        row = claim_service.update_claim_status(claims[0].id, ClaimStatus.PAID, db_session)
+        
+        assert row.id == claims[0].id
+        assert row.status == "paid"
+        assert row.image_url == claims[0].image_url
+        assert claim_service.get_claim_by_id(claims[0].id, db_session).status == "paid"
+    
+    def test_update_claim(self, db_session, claims):
+        """Test only the given fields are updated"""
+        update_data = ClaimUpdate(payout_amount=Decimal("5000.00"), payout_status="pending")
+        row = claim_service.update_claim(claims[0].id, update_data, db_session)
+        
+        assert row.payout_amount == Decimal("5000.00")
+        assert row.payout_status == "pending"
+        assert row.status == "auto_approved"
+    
+    def test_update_missing_claim(self, db_session):
+        """Test updating an unknown claim returns None"""
+        assert claim_service.update_claim_status(uuid.uuid4(), ClaimStatus.PAID, db_session) is None
+    
+    def test_cursor_round_trip(self):
+        """Test cursor encoding round-trips"""
+        created_at = datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+        claim_id = uuid.uuid4()
+        
+        assert decode_claim_cursor(encode_claim_cursor(created_at, claim_id)) == (created_at, claim_id)
+    
+    def test_invalid_cursor(self, db_session):
+        """Test malformed cursor raises ValueError"""
+        with pytest.raises(ValueError):
+            claim_service.get_claims(db_session, cursor="not-a-cursor")
+    
+    def test_claim_ids_are_time_ordered(self, db_session, claims):
+        """Test new claims get database-generated version 7 IDs"""
+        assert all(claim.id.version == 7 for claim in claims)
+
+
+class TestClaimImageData:
+    """Test image data decoding in ClaimCreate"""
+    
+    def _claim_create(self, image_data):
+        return ClaimCreate(
+            agent_id=uuid.uuid4(),
+            farm_id=uuid.uuid4(),
+            ground_truth={
+                "ml_class": "drought_stress",
+                "ml_confidence": 0.85,
+                "top_three_classes": [["drought_stress", 0.85], ["healthy", 0.1], ["other", 0.05]]
+            },
+            image_data=image_data
+        )
+    
+    def test_image_data_is_decoded(self):
+        """Test base64 image data arrives as bytes, with or without a data URL prefix"""
+        image = bytes(range(256))
+        encoded = base64.b64encode(image).decode()
+        
+        assert self._claim_create(encoded).image_data == image
+        assert self._claim_create(f"data:image/jpeg;base64,{encoded}").image_data == image
+    
+    def test_short_image_data_rejected(self):
+        """Test image data too short to be an image is rejected"""
+        with pytest.raises(ValidationError):
+            self._claim_create("aGVsbG8=")
+        with pytest.raises(ValidationError):
+            self._claim_create(base64.b64encode(b"x" * 74).decode().ljust(100, "\n"))
+
+
+class TestDirectImageUpload:
+    """Test claims whose image is uploaded straight to S3"""
+    
+    @pytest.fixture
+    def claim_data(self, db_session):
+        """Create an agent and farm and return claim data for them"""
+        agent = Agent(phone_number="+254712345678", name="Test Agent")
+        farm = Farm(
+            farmer_name="John Doe",
+            farmer_id="12345678",
+            phone_number="+254712345678",
+            crop_type="maize",
+            gps_lat=-1.286389,
+            gps_lng=36.817223
+        )
+        db_session.add_all([agent, farm])
+        db_session.commit()
+        return ClaimInitiate(
+            agent_id=agent.id,
+            farm_id=farm.id,
+            ground_truth={
+                "ml_class": "drought_stress",
+                "ml_confidence": 0.85,
+                "top_three_classes": [["drought_stress", 0.85], ["healthy", 0.1], ["other", 0.05]]
+            }
+        )
+    
+    @pytest.fixture
+    def s3_client(self):
+        """Use S3 storage with a mock client"""
+        mock_s3 = Mock()
+        mock_s3.generate_presigned_post = Mock(
+            side_effect=lambda **kwargs: {
+                "url": "https://mavunosure-claims.s3.amazonaws.com/",
+                "fields": {"key": kwargs["Key"], "policy": "p", "x-amz-signature": "s"}
+            }
+        )
+        with patch.object(storage_service, 'provider', 's3'), \
+             patch.object(storage_service, '_s3_client', mock_s3):
+            yield mock_s3
+    
+    def test_initiate_claim(self, db_session, claim_data, s3_client):
+        """Test initiating a claim stores it pending with its future image URL"""
+        response = claim_service.initiate_claim(claim_data, db_session)
+        
+        claim = claim_service.get_claim_by_id(response.claim_id, db_session)
+        key = response.fields["key"]
+        assert key.startswith(f"claims/{claim.id}/")
+        assert claim.status == "pending"
+        assert claim.image_url.endswith(key)
+        conditions = s3_client.generate_presigned_post.call_args.kwargs["Conditions"]
+        assert ["content-length-range", 1, 10 * 1024 * 1024] in conditions
+    
+    def test_upload_claim_image_to_s3(self, s3_client):
+        """Test claim images are streamed to S3 as JPEGs under the claim's prefix"""
+        from uuid import uuid4
+        
+        claim_id = uuid4()
+        url = storage_service.upload_claim_image(b"\xff\xd8" + b"\x00" * 100, claim_id)
+        
+        fileobj, bucket, key = s3_client.upload_fileobj.call_args.args
+        assert fileobj.getvalue() == b"\xff\xd8" + b"\x00" * 100
+        assert bucket == storage_service.bucket
+        assert key.startswith(f"claims/{claim_id}/")
+        assert s3_client.upload_fileobj.call_args.kwargs["ExtraArgs"] == {"ContentType": "image/jpeg"}
+        assert url.endswith(key)
+    
+    def test_initiate_claim_requires_s3(self, db_session, claim_data):
+        """Test direct uploads are refused with local storage"""
+        with patch.object(storage_service, 'provider', 'local'):
+            with pytest.raises(RuntimeError):
+                claim_service.initiate_claim(claim_data, db_session)
+        
+        assert db_session.query(Claim).count() == 0
+    
+    def test_confirm_image_upload(self, db_session, claim_data, s3_client):
+        """Test confirmation checks the image exists in S3"""
+        response = claim_service.initiate_claim(claim_data, db_session)
+        
+        s3_client.head_object = Mock(side_effect=Exception("404"))
+        with pytest.raises(ValueError):
+            claim_service.confirm_image_upload(response.claim_id, db_session)
+        
+        s3_client.head_object = Mock(return_value={})
+        claim = claim_service.confirm_image_upload(response.claim_id, db_session)
+        assert claim.id == response.claim_id
+    
+    def test_confirm_image_upload_only_once(self, db_session, claim_data, s3_client):
+        """Test a claim can be confirmed (and so processed) only once"""
+        response = claim_service.initiate_claim(claim_data, db_session)
+        s3_client.head_object = Mock(return_value={})
+        
+        claim_service.confirm_image_upload(response.claim_id, db_session)
+        
+        with pytest.raises(ValueError, match="already being processed"):
+            claim_service.confirm_image_upload(response.claim_id, db_session)
+    
+    def test_confirm_image_upload_rejects_processed_claim(self, db_session, claim_data, s3_client):
+        """Test confirmation is refused once a claim has left pending"""
+        response = claim_service.initiate_claim(claim_data, db_session)
+        s3_client.head_object = Mock(return_value={})
+        claim_service.update_claim_status(response.claim_id, ClaimStatus.PAID, db_session)
+        
+        with pytest.raises(ValueError, match="already being processed"):
+            claim_service.confirm_image_upload(response.claim_id, db_session)
+    
+    def test_confirm_image_upload_not_found(self, db_session):
+        """Test confirming an unknown claim returns None"""
+        assert claim_service.confirm_image_upload(uuid.uuid4(), db_session) is None
+
+
+class TestCreateClaim:
+    """Test claim creation with an image uploaded through the API"""
+    
+    @pytest.fixture
+    def claim_data(self, db_session):
+        """Create an agent and farm and return claim data with an image"""
+        agent = Agent(phone_number="+254712345678", name="Test Agent")
+        farm = Farm(
+            farmer_name="John Doe",
+            farmer_id="12345678",
+            phone_number="+254712345678",
+            crop_type="maize",
+            gps_lat=-1.286389,
+            gps_lng=36.817223
+        )
+        db_session.add_all([agent, farm])
+        db_session.commit()
+        return ClaimCreate(
+            agent_id=agent.id,
+            farm_id=farm.id,
+            ground_truth={
+                "ml_class": "drought_stress",
+                "ml_confidence": 0.85,
+                "top_three_classes": [["drought_stress", 0.85], ["healthy", 0.1], ["other", 0.05]]
+            },
+            image_data=base64.b64encode(bytes(range(256))).decode()
+        )
+    
+    def test_create_claim(self, db_session, claim_data):
+        """Test the claim is stored with the uploaded image's URL"""
+        with patch.object(storage_service, 'upload_claim_image', return_value="/uploads/claims/x.jpg") as mock_upload:
+            response = claim_service.create_claim(claim_data, db_session)
+        
+        mock_upload.assert_called_once_with(bytes(range(256)), response.claim_id)
+        claim = claim_service.get_claim_by_id(response.claim_id, db_session)
+        assert claim.image_url == "/uploads/claims/x.jpg"
+    
+    def test_create_claim_upload_failure(self, db_session, claim_data):
+        """Test a failed upload leaves no claim behind"""
+        with patch.object(storage_service, 'upload_claim_image', side_effect=Exception("S3 down")):
+            with pytest.raises(RuntimeError):
+                claim_service.create_claim(claim_data, db_session)
+        
+        assert db_session.query(Claim).count() == 0
+    
+    def test_get_claim_by_id_with_farm(self, db_session, claim_data):
+        """Test the farm can be loaded together with the claim"""
+        with patch.object(storage_service, 'upload_claim_image', return_value="/uploads/claims/x.jpg"):
+            response = claim_service.create_claim(claim_data, db_session)
+        db_session.expunge_all()
+        
+        claim = claim_service.get_claim_by_id(response.claim_id, db_session, with_farm=True)
+        
+        assert "farm" not in inspect(claim).unloaded
+        assert claim.farm.id == claim_data.farm_id
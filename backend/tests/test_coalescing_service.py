@@ -0,0 +1,84 @@
+"""Unit tests for request coalescing service"""
+
+import pytest
+import redis
+import threading
+from unittest.mock import Mock, patch
+from app.services.coalescing_service import coalescing_service
+
+
+class TestCoalescingService:
+    """Test single-flight loading of identical requests"""
+    
+    @pytest.fixture
+    def shared(self):
+        """Replace the shared result store with an in-memory dict"""
+        store = {}
+        
+        def set_value(key, value, nx=False, px=None):
+            if nx and key in store:
+                return None
+            store[key] = value
+            return True
+        
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=lambda key: store.get(key))
+        mock_redis.set = Mock(side_effect=set_value)
+        mock_redis.delete = Mock(side_effect=lambda key: store.pop(key, None))
+        with patch.object(coalescing_service, 'redis_client', mock_redis):
+            yield store
+    
+    def test_make_key_ignores_param_order(self):
+        """Test the same parameters in any order give the same key"""
+        key1 = coalescing_service.make_key("/claims", [("status", "pending"), ("page", "1")])
+        key2 = coalescing_service.make_key("/claims", [("page", "1"), ("status", "pending")])
+        key3 = coalescing_service.make_key("/claims", [("page", "2"), ("status", "pending")])
+        
+        assert key1 == key2
+        assert key1 != key3
+    
+    def test_concurrent_callers_share_one_load(self, shared):
+        """Test callers arriving during a load wait for it instead of loading"""
+        started = threading.Event()
+        release = threading.Event()
+        loader = Mock(side_effect=lambda: (started.set(), release.wait(5), b"page")[2])
+        results = []
+        
+        leader = threading.Thread(target=lambda: results.append(coalescing_service.coalesce("k", loader)))
+        leader.start()
+        started.wait(5)
+        waiters = [
+            threading.Thread(target=lambda: results.append(coalescing_service.coalesce("k", loader)))
+            for _ in range(3)
+        ]
+        for waiter in waiters:
+            waiter.start()
+        release.set()
+        for thread in [leader] + waiters:
+            thread.join(5)
+        
+        assert results == [b"page"] * 4
+        loader.assert_called_once()
+    
+    def test_result_shared_across_workers(self, shared):
+        """Test a result stored by another worker is reused"""
+        shared["coalesce:k:result"] = b"page"
+        loader = Mock(return_value=b"fresh")
+        
+        assert coalescing_service.coalesce("k", loader) == b"page"
+        loader.assert_not_called()
+    
+    def test_loader_error_propagates(self, shared):
+        """Test loader errors reach the caller and nothing is cached"""
+        with pytest.raises(ValueError):
+            coalescing_service.coalesce("k", Mock(side_effect=ValueError("bad cursor")))
+        
+        assert "coalesce:k:result" not in shared
+    
+    def test_redis_unavailable(self):
+        """Test loading falls back to the loader when Redis is down"""
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=redis.ConnectionError("down"))
+        
+        with patch.object(coalescing_service, 'redis_client', mock_redis):
+            assert coalescing_service.coalesce("k", lambda: b"page") == b"page"
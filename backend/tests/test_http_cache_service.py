@@ -0,0 +1,71 @@
+"""Unit tests for HTTP cache service"""
+
+import pytest
+import redis
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+from app.services.http_cache_service import http_cache_service, CACHE_CONTROL
+
+
+class TestHTTPCacheService:
+    """Test ETag matching and remembered revalidation"""
+    
+    @pytest.fixture
+    def cache(self):
+        """Replace the ETag cache with an in-memory dict"""
+        store = {}
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=lambda key: store.get(key))
+        mock_redis.setex = Mock(side_effect=lambda key, ttl, value: store.__setitem__(key, value))
+        mock_redis.delete = Mock(side_effect=lambda key: store.pop(key, None))
+        with patch.object(http_cache_service, 'redis_client', mock_redis):
+            yield store
+    
+    def test_etag_matches(self):
+        """Test weak comparison, lists and wildcard"""
+        etag = http_cache_service.make_etag("abc", datetime(2026, 1, 1, tzinfo=timezone.utc))
+        
+        assert http_cache_service.etag_matches(etag, etag)
+        assert http_cache_service.etag_matches(etag[2:], etag)
+        assert http_cache_service.etag_matches(f'W/"other", {etag}', etag)
+        assert http_cache_service.etag_matches("*", etag)
+        assert not http_cache_service.etag_matches('W/"other"', etag)
+        assert not http_cache_service.etag_matches(None, etag)
+    
+    def test_not_modified_from_remembered_etag(self, cache):
+        """Test a remembered ETag answers revalidation with 304"""
+        key = http_cache_service.claim_key("abc")
+        cache_control = http_cache_service.remember(key, 'W/"abc:1"')
+        
+        response = http_cache_service.not_modified(key, 'W/"abc:1"')
+        
+        assert cache_control == CACHE_CONTROL
+        assert response.status_code == 304
+        assert response.headers["ETag"] == 'W/"abc:1"'
+        assert response.headers["Cache-Control"] == CACHE_CONTROL
+    
+    def test_not_modified_after_invalidate(self, cache):
+        """Test an invalidated ETag is no longer used"""
+        key = http_cache_service.farm_key("abc")
+        assert http_cache_service.remember(key, 'W/"abc:1"') == CACHE_CONTROL
+        
+        http_cache_service.invalidate(key)
+        
+        assert http_cache_service.not_modified(key, 'W/"abc:1"') is None
+    
+    def test_invalidate_claim(self, cache):
+        """Test a claim write forgets the claim's ETag"""
+        key = http_cache_service.claim_key("abc")
+        http_cache_service.remember(key, 'W/"abc:1"')
+        
+        http_cache_service.invalidate_claim("abc")
+        
+        assert key not in cache
+    
+    def test_not_modified_redis_unavailable(self):
+        """Test revalidation falls through to the database when Redis is down"""
+        mock_redis = Mock()
+        mock_redis.get = Mock(side_effect=redis.ConnectionError("down"))
+        
+        with patch.object(http_cache_service, 'redis_client', mock_redis):
+            assert http_cache_service.not_modified("claim:abc:etag", 'W/"abc:1"') is None
@@ -1,6 +1,7 @@
 """Unit tests for OTP service"""
 
 import pytest
+from unittest.mock import patch
 from app.services.otp_service import OTPService
 
 
@@ -15,6 +16,15 @@ class TestOTPService:
         assert len(otp) == 6
         assert otp.isdigit()
     
+    def test_generate_otp_keeps_leading_zeros(self):
+        """Test small codes are zero-padded to the full OTP length"""
+        service = OTPService()
+        
+        with patch('app.services.otp_service.secrets.randbelow', return_value=42) as mock_randbelow:
+            assert service.generate_otp() == "000042"
+        
+        mock_randbelow.assert_called_once_with(1_000_000)
+    
     def test_store_and_verify_otp(self, redis_client):
         """Test storing and verifying OTP"""
         service = OTPService()
@@ -61,3 +71,25 @@ class TestOTPService:
         
         # Try to verify again (should fail)
         assert service.verify_otp(phone_number, otp) is False
+    
+    def test_verify_malformed_otp_skips_redis(self):
+        """Test codes of the wrong length or with non-digits are rejected locally"""
+        service = OTPService()
+        
+        with patch.object(service, '_verify_and_delete') as mock_verify:
+            assert service.verify_otp("+254712345678", "12345") is False
+            assert service.verify_otp("+254712345678", "12345a") is False
+        
+        mock_verify.assert_not_called()
+    
+    def test_verify_otp_attempt_limit(self, redis_client):
+        """Test the correct OTP is rejected after too many wrong attempts"""
+        service = OTPService()
+        phone_number = "+254712345679"
+        otp = "123456"
+        
+        service.store_otp(phone_number, otp)
+        for _ in range(service.max_verify_attempts):
+            assert service.verify_otp(phone_number, "000000") is False
+        
+        assert service.verify_otp(phone_number, otp) is False
@@ -1,5 +1,6 @@
 """Tests for payment service"""
 
+import asyncio
 import pytest
 from decimal import Decimal
 from uuid import uuid4
@@ -7,6 +8,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.orm import Session
 
 from app.services.payment_service import payment_service
+from app.services.mobile_money_service import CircuitBreaker, mobile_money_service
 from app.models.claim import Claim
 from app.models.farm import Farm
 from app.schemas.claim import ClaimStatus
@@ -55,10 +57,7 @@ def sample_approved_claim(sample_farm):
 async def test_process_payout_success(mock_db, sample_farm, sample_approved_claim):
     """Test successful payment processing"""
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,  # First call for claim
-        sample_farm  # Second call for farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock mobile money service
     mock_payment_result = MagicMock()
@@ -103,11 +102,49 @@ async def test_process_payout_success(mock_db, sample_farm, sample_approved_clai
             mock_db.commit.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_process_payout_invalidates_http_cache(mock_db, sample_farm, sample_approved_claim):
+    """Test a completed payout forgets the claim's remembered ETag"""
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    mock_payment_result = MagicMock(success=True, transaction_id="MM123456789ABC")
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock, return_value=mock_payment_result), \
+         patch('app.services.payment_service.sms_service.send_payment_notification',
+               new_callable=AsyncMock), \
+         patch('app.services.payment_service.http_cache_service.invalidate_claim') as mock_invalidate:
+        result = await payment_service.process_payout(sample_approved_claim.id, mock_db)
+    
+    assert result is True
+    mock_invalidate.assert_called_once_with(sample_approved_claim.id)
+
+
+@pytest.mark.asyncio
+async def test_process_payout_collects_notification(mock_db, sample_farm, sample_approved_claim):
+    """Test a payout hands its notification to the caller when asked to"""
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    mock_payment_result = MagicMock(success=True, transaction_id="MM123456789ABC")
+    notifications = []
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock, return_value=mock_payment_result), \
+         patch('app.services.payment_service.sms_service.send_payment_notification',
+               new_callable=AsyncMock) as mock_send_sms:
+        result = await payment_service.process_payout(sample_approved_claim.id, mock_db, notifications)
+    
+    assert result is True
+    mock_send_sms.assert_not_called()
+    assert notifications == [(
+        "+254712345678",
+        "MavunoSure: Your claim for KES 5,000.00 has been approved and payment sent."
+    )]
+
+
 @pytest.mark.asyncio
 async def test_process_payout_claim_not_found(mock_db):
     """Test payment processing when claim doesn't exist"""
     # Setup mock to return None
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.execute.return_value.first.return_value = None
     
     # Execute and verify exception
     with pytest.raises(ValueError, match="Claim .* not found"):
@@ -129,7 +166,7 @@ async def test_process_payout_claim_not_approved(mock_db, sample_farm):
     )
     
     # Setup mock
-    mock_db.query.return_value.filter.return_value.first.return_value = pending_claim
+    mock_db.execute.return_value.first.return_value = (pending_claim, sample_farm)
     
     # Execute
     result = await payment_service.process_payout(pending_claim.id, mock_db)
@@ -138,14 +175,25 @@ async def test_process_payout_claim_not_approved(mock_db, sample_farm):
     assert result is False
 
 
+@pytest.mark.asyncio
+async def test_process_payout_already_paid(mock_db, sample_farm, sample_approved_claim):
+    """Test a claim whose payout completed is not paid again"""
+    sample_approved_claim.payout_status = "completed"
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock) as mock_send_payment:
+        result = await payment_service.process_payout(sample_approved_claim.id, mock_db)
+    
+    assert result is False
+    mock_send_payment.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_process_payout_farm_not_found(mock_db, sample_approved_claim):
     """Test payment processing when farm doesn't exist"""
     # Setup mocks - claim exists but farm doesn't
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,  # First call for claim
-        None  # Second call for farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, None)
     
     # Execute and verify exception
     with pytest.raises(ValueError, match="Farm not found"):
@@ -156,10 +204,7 @@ async def test_process_payout_farm_not_found(mock_db, sample_approved_claim):
 async def test_process_payout_retry_logic(mock_db, sample_farm, sample_approved_claim):
     """Test payment retry logic with exponential backoff"""
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,  # First call for claim
-        sample_farm  # Second call for farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock mobile money service to fail twice then succeed
     mock_payment_result_fail = MagicMock()
@@ -199,10 +244,7 @@ async def test_process_payout_retry_logic(mock_db, sample_farm, sample_approved_
 async def test_process_payout_all_retries_fail(mock_db, sample_farm, sample_approved_claim):
     """Test payment processing when all retries fail"""
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,  # First call for claim
-        sample_farm  # Second call for farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock mobile money service to always fail
     mock_payment_result_fail = MagicMock()
@@ -225,14 +267,131 @@ async def test_process_payout_all_retries_fail(mock_db, sample_farm, sample_appr
             mock_db.commit.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_process_payout_commits_once(mock_db, sample_farm, sample_approved_claim):
+    """Test the payout amount is only written together with the final outcome"""
+    sample_approved_claim.payout_amount = None
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    
+    # Claim state each time the session commits
+    committed = []
+    mock_db.commit.side_effect = lambda: committed.append(
+        (sample_approved_claim.payout_amount, sample_approved_claim.status)
+    )
+    
+    mock_payment_result = MagicMock()
+    mock_payment_result.success = True
+    mock_payment_result.transaction_id = "MM123456789ABC"
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock, return_value=mock_payment_result), \
+         patch('app.services.payment_service.sms_service.send_payment_notification',
+               new_callable=AsyncMock):
+        result = await payment_service.process_payout(sample_approved_claim.id, mock_db)
+    
+    assert result is True
+    # The read transaction ends before any change, then one commit writes the payout
+    assert committed == [
+        (None, ClaimStatus.AUTO_APPROVED.value),
+        (payment_service.DEFAULT_PAYOUT_AMOUNT, ClaimStatus.PAID.value)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_payout_releases_session_before_backoff(mock_db, sample_farm, sample_approved_claim):
+    """Test no transaction is left open while waiting between attempts"""
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    
+    mock_payment_result_fail = MagicMock()
+    mock_payment_result_fail.success = False
+    mock_payment_result_fail.message = "Payment failed"
+    
+    async def check_released(seconds):
+        mock_db.commit.assert_called_once()
+        mock_db.flush.assert_not_called()
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock, return_value=mock_payment_result_fail), \
+         patch('asyncio.sleep', side_effect=check_released) as mock_sleep:
+        result = await payment_service.process_payout(sample_approved_claim.id, mock_db)
+    
+    assert result is False
+    assert mock_sleep.call_count == payment_service.MAX_RETRIES - 1
+    assert mock_db.commit.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_payout_non_retryable_failure(mock_db, sample_farm, sample_approved_claim):
+    """Test a payment rejected as invalid is not retried or waited on"""
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
+    
+    mock_payment_result_invalid = MagicMock()
+    mock_payment_result_invalid.success = False
+    mock_payment_result_invalid.retryable = False
+    mock_payment_result_invalid.message = "Invalid phone number format"
+    
+    with patch('app.services.payment_service.mobile_money_service.send_payment',
+               new_callable=AsyncMock) as mock_send_payment:
+        mock_send_payment.return_value = mock_payment_result_invalid
+        
+        with patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result = await payment_service.process_payout(sample_approved_claim.id, mock_db)
+    
+    assert result is False
+    assert mock_send_payment.call_count == 1
+    mock_sleep.assert_not_called()
+    assert sample_approved_claim.payout_status == "failed_manual_review_required"
+
+
+def test_backoff_seconds_doubles_with_jitter():
+    """Test backoff doubles per attempt, is capped and adds at most 50% jitter"""
+    for attempt, base in [(0, 1), (1, 2), (2, 4), (5, 8)]:
+        for _ in range(20):
+            assert base <= payment_service._backoff_seconds(attempt) <= base * 1.5
+
+
+@pytest.mark.asyncio
+async def test_process_payouts_batch():
+    """Test batch payouts run concurrently with one session each"""
+    claim_ids = [uuid4() for _ in range(25)]
+    sessions = []
+    running = 0
+    max_running = 0
+    
+    def session_factory():
+        sessions.append(MagicMock(spec=Session))
+        return sessions[-1]
+    
+    async def fake_process_payout(claim_id, db, notifications):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+        if claim_id == claim_ids[3]:
+            raise ValueError("Claim not found")
+        notifications.append(("+254712345678", "paid"))
+        return True
+    
+    with patch.object(payment_service, 'process_payout', side_effect=fake_process_payout) as mock_payout, \
+         patch('app.services.payment_service.sms_service.send_bulk',
+               new_callable=AsyncMock, return_value={"+254712345678": True}) as mock_send_bulk:
+        results = await payment_service.process_payouts_batch(claim_ids, session_factory=session_factory)
+    
+    mock_send_bulk.assert_called_once_with([("+254712345678", "paid")] * 24)
+    assert isinstance(results[3], ValueError)
+    assert results[:3] + results[4:] == [True] * 24
+    assert max_running == payment_service.BATCH_CONCURRENCY
+    assert len({id(call.args[1]) for call in mock_payout.call_args_list}) == 25
+    for session in sessions:
+        session.close.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_process_payout_sms_failure_doesnt_fail_payment(mock_db, sample_farm, sample_approved_claim):
     """Test that SMS failure doesn't cause payment to fail"""
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,  # First call for claim
-        sample_farm  # Second call for farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock successful payment
     mock_payment_result = MagicMock()
@@ -273,11 +432,8 @@ async def test_retry_failed_payment_success(mock_db, sample_farm):
     )
     
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        failed_claim,  # First call to get claim for retry
-        failed_claim,  # Second call in process_payout
-        sample_farm  # Third call for farm
-    ]
+    mock_db.execute.return_value.scalar_one_or_none.return_value = failed_claim  # Claim for retry
+    mock_db.execute.return_value.first.return_value = (failed_claim, sample_farm)  # Claim and farm in process_payout
     
     # Mock successful payment
     mock_payment_result = MagicMock()
@@ -318,7 +474,7 @@ async def test_retry_failed_payment_wrong_status(mock_db):
     )
     
     # Setup mock
-    mock_db.query.return_value.filter.return_value.first.return_value = completed_claim
+    mock_db.execute.return_value.scalar_one_or_none.return_value = completed_claim
     
     # Execute
     result = await payment_service.retry_failed_payment(completed_claim.id, mock_db)
@@ -338,10 +494,7 @@ async def test_payment_with_sms_integration_success(mock_db, sample_farm, sample
     Tests requirement 9.2, 9.3: SMS notification with amount in KES
     """
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,
-        sample_farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock successful payment
     mock_payment_result = MagicMock()
@@ -399,10 +552,7 @@ async def test_payment_with_sms_integration_retry_on_failure(mock_db, sample_far
     Tests that SMS errors are handled gracefully without failing the payment
     """
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,
-        sample_farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock successful payment
     mock_payment_result = MagicMock()
@@ -448,10 +598,7 @@ async def test_payment_with_sms_integration_network_error(mock_db, sample_farm,
     Tests resilience to SMS service failures
     """
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,
-        sample_farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock successful payment
     mock_payment_result = MagicMock()
@@ -484,10 +631,7 @@ async def test_payment_retry_with_sms_integration(mock_db, sample_farm, sample_a
     not on failed attempts
     """
     # Setup mocks
-    mock_db.query.return_value.filter.return_value.first.side_effect = [
-        sample_approved_claim,
-        sample_farm
-    ]
+    mock_db.execute.return_value.first.return_value = (sample_approved_claim, sample_farm)
     
     # Mock payment to fail twice then succeed
     mock_payment_result_fail = MagicMock()
@@ -591,11 +735,11 @@ async def test_payment_with_sms_integration_multiple_claims(mock_db, sample_farm
             }
             
             # Process first claim
-            mock_db.query.return_value.filter.return_value.first.side_effect = [claim1, sample_farm]
+            mock_db.execute.return_value.first.return_value = (claim1, sample_farm)
             result1 = await payment_service.process_payout(claim1.id, mock_db)
             
             # Process second claim
-            mock_db.query.return_value.filter.return_value.first.side_effect = [claim2, sample_farm]
+            mock_db.execute.return_value.first.return_value = (claim2, sample_farm)
             result2 = await payment_service.process_payout(claim2.id, mock_db)
             
             # Verify both payments succeeded
@@ -612,3 +756,69 @@ async def test_payment_with_sms_integration_multiple_claims(mock_db, sample_farm
             # Verify second SMS had correct amount
             second_call_message = mock_to_thread.call_args_list[1][0][1]
             assert "7,500.00" in second_call_message or "7500" in second_call_message
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("phone_number", ["", "+25471234567", "+2547123456789", "+254 12345678", "0712345678"])
+async def test_send_payment_rejects_malformed_phone(mock_db, phone_number):
+    """Test payments are only sent to +254 numbers with 9 subscriber digits"""
+    result = await mobile_money_service.send_payment(
+        phone_number=phone_number,
+        amount=Decimal("5000.00"),
+        reference=str(uuid4()),
+        db=mock_db
+    )
+    
+    assert result.success is False
+    assert result.retryable is False
+    mock_db.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_payment_leaves_commit_to_caller(mock_db):
+    """Test the transaction log joins the caller's transaction instead of committing"""
+    result = await mobile_money_service.send_payment(
+        phone_number="+254712345678",
+        amount=Decimal("5000.00"),
+        reference=str(uuid4()),
+        db=mock_db
+    )
+    
+    assert result.success is True
+    logged = mock_db.add.call_args[0][0]
+    assert logged.transaction_id == result.transaction_id
+    assert logged.status == "completed"
+    mock_db.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_payment_circuit_breaker(mock_db):
+    """Test payments stop being sent after repeated provider failures, then probe again"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    
+    async def send():
+        return await mobile_money_service.send_payment(
+            phone_number="+254712345678",
+            amount=Decimal("5000.00"),
+            reference=str(uuid4()),
+            db=mock_db
+        )
+    
+    with patch.object(mobile_money_service, 'circuit_breaker', breaker), \
+         patch.object(mobile_money_service, 'is_production', True), \
+         patch.object(mobile_money_service, 'api_url', "https://provider.example.com"):
+        # Provider failures are retryable until the circuit opens
+        assert (await send()).retryable is True
+        assert (await send()).retryable is True
+        assert mock_db.add.call_count == 2
+        
+        rejected = await send()
+        assert rejected.success is False
+        assert rejected.retryable is False
+        assert mock_db.add.call_count == 2
+        
+        # After the reset timeout a probe is sent; its success closes the circuit
+        breaker._opened_at -= 60.0
+        with patch.object(mobile_money_service, 'is_production', False):
+            assert (await send()).success is True
+        assert breaker.allow_request() is True
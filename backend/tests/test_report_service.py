@@ -28,6 +28,7 @@ class TestReportService:
         mock_redis.setex = Mock()
         mock_redis.get = Mock(return_value=otp)
         mock_redis.delete = Mock()
+        mock_redis.evalsha = Mock(return_value=1)
         
         from unittest.mock import AsyncMock
         with patch('app.services.otp_service.otp_service.redis_client', mock_redis), \
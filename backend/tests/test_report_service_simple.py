@@ -148,12 +148,49 @@ class TestReportServiceSimple:
         assert drawing.width == 400
         assert drawing.height == 200
     
+    def test_claim_image_downloaded_once(self):
+        """Test a remote claim image is fetched once and reused by later reports"""
+        from app.services import report_service as report_module
+        
+        buffer = BytesIO()
+        Image.new("RGB", (800, 400)).save(buffer, format="JPEG")
+        response = Mock(content=buffer.getvalue())
+        url = "https://bucket.s3.af-south-1.amazonaws.com/claims/test/image.jpg"
+        
+        report_module._fetch_claim_image.cache_clear()
+        with patch.object(report_module._image_http_client, 'get', return_value=response) as mock_get:
+            first = report_service._add_claim_image(url)
+            second = report_service._add_claim_image(url)
+        report_module._fetch_claim_image.cache_clear()
+        
+        mock_get.assert_called_once_with(url)
+        assert first.drawWidth == second.drawWidth
+        assert first.drawWidth == 2 * first.drawHeight
+    
+    def test_claim_image_shrunk_for_report(self):
+        """Test a large claim image is stored at report resolution with its original aspect"""
+        from app.services import report_service as report_module
+        
+        buffer = BytesIO()
+        Image.new("RGB", (4000, 3000)).save(buffer, format="JPEG")
+        response = Mock(content=buffer.getvalue())
+        url = "https://bucket.s3.af-south-1.amazonaws.com/claims/test/large.jpg"
+        
+        report_module._fetch_claim_image.cache_clear()
+        with patch.object(report_module._image_http_client, 'get', return_value=response):
+            image_bytes, aspect = report_module._fetch_claim_image(url)
+        report_module._fetch_claim_image.cache_clear()
+        
+        with Image.open(BytesIO(image_bytes)) as thumb:
+            assert thumb.size == (600, 450)
+        assert aspect == 4000 / 3000
+    
     def test_upload_locally(self):
         """Test local PDF storage"""
         from pathlib import Path
         
-        # Create test PDF bytes
-        test_pdf = b'%PDF-1.4\ntest content'
+        # Create test PDF file
+        test_pdf = BytesIO(b'%PDF-1.4\ntest content')
         filename = "reports/test-claim/test.pdf"
         
         # Upload locally
@@ -165,9 +202,101 @@ class TestReportServiceSimple:
         
         # Verify file was created
         file_path = Path("uploads") / filename
-        assert file_path.exists()
+        assert file_path.read_bytes() == b'%PDF-1.4\ntest content'
         
         # Clean up
         file_path.unlink()
         file_path.parent.rmdir()
         file_path.parent.parent.rmdir()
+    
+    def _make_claim_and_farm(self):
+        """Build unsaved claim and farm models"""
+        import uuid
+        
+        farm = Farm(
+            id=uuid.uuid4(),
+            farmer_name="John Doe",
+            farmer_id="12345678",
+            phone_number="+254712345678",
+            crop_type="maize",
+            gps_lat=-1.286389,
+            gps_lng=36.817223,
+            registered_at=datetime(2026, 1, 1)
+        )
+        claim = Claim(
+            id=uuid.uuid4(),
+            farm_id=farm.id,
+            status="auto_approved",
+            created_at=datetime(2026, 1, 2),
+            updated_at=datetime(2026, 1, 2),
+            image_url="/uploads/claims/test.jpg",
+            ml_class="drought_stress",
+            ml_confidence=0.85,
+            payout_amount=Decimal("5000.00")
+        )
+        return claim, farm
+    
+    def test_content_hash(self):
+        """Test report content hash tracks rendered fields only"""
+        claim, farm = self._make_claim_and_farm()
+        original = report_service._content_hash(claim, farm)
+        
+        assert len(original) == 32
+        
+        # Bookkeeping fields don't change the report
+        claim.updated_at = datetime(2026, 2, 1)
+        claim.pdf_hash = original
+        assert report_service._content_hash(claim, farm) == original
+        
+        # Rendered fields do
+        claim.weighted_score = 0.92
+        assert report_service._content_hash(claim, farm) != original
+    
+    @pytest.mark.asyncio
+    async def test_generate_claim_pdf_reuses_rendered_report(self):
+        """Test an unchanged claim reuses the stored PDF instead of rendering again"""
+        from pathlib import Path
+        
+        claim, farm = self._make_claim_and_farm()
+        db = Mock()
+        db.execute.return_value.first.return_value = (claim, farm)
+        
+        with patch.object(report_service, 'storage_provider', 'local'), \
+             patch.object(report_service, '_render_pdf', side_effect=lambda c, f, out: out.write(b'%PDF-1.4\ntest')) as mock_render:
+            first_url = await report_service.generate_claim_pdf(claim.id, db)
+            second_url = await report_service.generate_claim_pdf(claim.id, db)
+        
+        assert mock_render.call_count == 1
+        assert first_url == second_url
+        assert first_url == f"/uploads/reports/{claim.id}/{claim.pdf_hash}.pdf"
+        
+        # Clean up
+        file_path = Path(first_url.lstrip("/"))
+        file_path.unlink()
+        file_path.parent.rmdir()
+    
+    @pytest.mark.asyncio
+    async def test_generate_claim_pdfs_batch(self):
+        """Test batch generation gives each report its own session and keeps going on errors"""
+        sessions = []
+        
+        def session_factory():
+            sessions.append(Mock())
+            return sessions[-1]
+        
+        async def fake_generate(claim_id, db):
+            if claim_id == "missing":
+                raise ValueError("Claim not found")
+            return f"/uploads/reports/{claim_id}.pdf"
+        
+        with patch.object(report_service, 'generate_claim_pdf', side_effect=fake_generate) as mock_generate:
+            results = await report_service.generate_claim_pdfs_batch(
+                ["a", "missing", "b"], session_factory=session_factory
+            )
+        
+        assert results[0] == "/uploads/reports/a.pdf"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == "/uploads/reports/b.pdf"
+        assert [call.args[1] for call in mock_generate.call_args_list] == sessions
+        for session in sessions:
+            session.close.assert_called_once()
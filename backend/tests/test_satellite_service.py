@@ -2,7 +2,7 @@
 
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from app.services.satellite_service import (
     SatelliteService,
     SatelliteVerdict,
@@ -122,7 +122,10 @@ class TestSatelliteService:
         
         cache_key = service._generate_cache_key(lat, lng, claim_date)
         
-        assert cache_key == "satellite:-1.2864:36.8172:2024-01-15"
+        assert cache_key.startswith("satellite:")
+        assert len(cache_key) == len("satellite:") + 16
+        assert cache_key == service._generate_cache_key(lat, lng, datetime(2024, 1, 15))
+        assert cache_key != service._generate_cache_key(lat, lng, datetime(2024, 1, 16))
     
     def test_generate_cache_key_rounds_coordinates(self, service):
         """Test that cache key rounds coordinates to 4 decimal places"""
@@ -132,8 +135,8 @@ class TestSatelliteService:
         
         cache_key = service._generate_cache_key(lat, lng, claim_date)
         
-        assert "1.2864" in cache_key
-        assert "36.8172" in cache_key
+        assert cache_key == service._generate_cache_key(-1.2864, 36.8172, claim_date)
+        assert cache_key != service._generate_cache_key(-1.2865, 36.8172, claim_date)
     
     def test_generate_verdict_severe_stress(self, service):
         """Test verdict generation for severe water stress"""
@@ -170,7 +173,7 @@ class TestSatelliteService:
             return -0.15
         
         with patch.object(service, '_calculate_ndmi', return_value=-0.15):
-            result = service._calculate_ndmi(mock_image, mock_point)
+            result = service._calculate_ndmi(mock_image, mock_point.buffer(50), Mock())
             assert result == -0.15
     
     def test_calculate_ndmi_no_valid_pixels(self, service):
@@ -181,7 +184,7 @@ class TestSatelliteService:
         # Mock to raise exception
         with patch.object(service, '_calculate_ndmi', side_effect=Exception("Failed to calculate NDMI - no valid pixels in region")):
             with pytest.raises(Exception, match="Failed to calculate NDMI"):
-                service._calculate_ndmi(mock_image, mock_point)
+                service._calculate_ndmi(mock_image, mock_point.buffer(50), Mock())
     
     def test_calculate_baseline_ndmi_success(self, service):
         """Test baseline NDMI calculation"""
@@ -191,7 +194,7 @@ class TestSatelliteService:
         
         # Mock the entire calculation to return a value
         with patch.object(service, '_calculate_baseline_ndmi', return_value=-0.05):
-            result = service._calculate_baseline_ndmi(mock_point, start_date, end_date)
+            result = service._calculate_baseline_ndmi(mock_point, mock_point.buffer(50), Mock(), start_date, end_date)
             assert result == -0.05
     
     def test_calculate_baseline_ndmi_no_data(self, service):
@@ -202,10 +205,165 @@ class TestSatelliteService:
         
         # Mock to return 0.0 when no data available
         with patch.object(service, '_calculate_baseline_ndmi', return_value=0.0):
-            result = service._calculate_baseline_ndmi(mock_point, start_date, end_date)
+            result = service._calculate_baseline_ndmi(mock_point, mock_point.buffer(50), Mock(), start_date, end_date)
             # Should return 0.0 as neutral baseline when no data available
             assert result == 0.0
     
+    def test_query_satellite_data_single_round_trip(self, service):
+        """Test recent and baseline values are fetched with one getInfo call"""
+        claim_date = datetime(2024, 1, 15)
+        observed = datetime(2024, 1, 14, 8, 0, 0)
+        
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            mock_ee.Dictionary.return_value.getInfo.return_value = {
+                'recent': {
+                    'ndmi': -0.25,
+                    'time_start': observed.timestamp() * 1000,
+                    'cloud_cover': 12.5
+                },
+                'ndmi_14day': -0.05
+            }
+            
+            result = service._query_satellite_data(-1.286389, 36.817223, claim_date)
+        
+        mock_ee.Dictionary.return_value.getInfo.assert_called_once()
+        assert result.ndmi_value == -0.25
+        assert result.ndmi_14day_avg == -0.05
+        assert result.observation_date == observed
+        assert result.cloud_cover_pct == 12.5
+        assert result.verdict == SatelliteVerdict.SEVERE_STRESS
+    
+    def test_build_satellite_query_shares_region_and_reducer(self, service):
+        """Test the recent and baseline reductions sample one region with one reducer"""
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            service._build_satellite_query(-1.286389, 36.817223, datetime(2024, 1, 15))
+        
+        point = mock_ee.Geometry.Point.return_value
+        point.buffer.assert_called_once_with(service.SAMPLE_BUFFER)
+        mock_ee.Reducer.mean.assert_called_once()
+        
+        recent_ndmi = mock_ee.Image.return_value.normalizedDifference.return_value
+        baseline_ndmi = mock_ee.ImageCollection.return_value.filterBounds.return_value \
+            .filterDate.return_value.filter.return_value.map.return_value.mean.return_value
+        for ndmi in (recent_ndmi, baseline_ndmi):
+            ndmi.reduceRegion.assert_called_once()
+            assert ndmi.reduceRegion.call_args.kwargs['geometry'] is point.buffer.return_value
+            assert ndmi.reduceRegion.call_args.kwargs['reducer'] is mock_ee.Reducer.mean.return_value
+    
+    def test_baseline_ndmi_guarded_for_empty_collection(self, service):
+        """Test the baseline is only sampled when there is baseline imagery"""
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            baseline = service._calculate_baseline_ndmi(
+                mock_ee.Geometry.Point.return_value,
+                Mock(),
+                Mock(),
+                datetime(2023, 12, 25),
+                datetime(2024, 1, 8)
+            )
+        
+        collection = mock_ee.ImageCollection.return_value.filterBounds.return_value \
+            .filterDate.return_value.filter.return_value
+        condition, sampled, empty = mock_ee.Algorithms.If.call_args.args
+        assert baseline is mock_ee.Algorithms.If.return_value
+        collection.size.return_value.gt.assert_called_once_with(0)
+        assert condition is collection.size.return_value.gt.return_value
+        assert sampled is collection.map.return_value.mean.return_value.reduceRegion.return_value.get.return_value
+        assert empty is None
+    
+    def test_query_satellite_data_no_imagery(self, service):
+        """Test verification fails when there is no recent cloud-free image"""
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            mock_ee.Dictionary.return_value.getInfo.return_value = {'recent': None, 'ndmi_14day': None}
+            
+            with pytest.raises(Exception, match="No suitable Sentinel-2 imagery"):
+                service._query_satellite_data(-1.286389, 36.817223, datetime(2024, 1, 15))
+    
+    @pytest.mark.asyncio
+    async def test_verify_claims_batch(self, service):
+        """Test a batch queries Earth Engine once, only for uncached points"""
+        cached_result = SpaceTruth(
+            ndmi_value=-0.15,
+            ndmi_14day_avg=-0.05,
+            observation_date=datetime(2024, 1, 14),
+            cloud_cover_pct=10.5,
+            verdict=SatelliteVerdict.MODERATE_STRESS
+        )
+        points = [
+            (-1.1, 36.1, datetime(2024, 1, 15)),
+            (-1.2, 36.2, datetime(2024, 1, 15)),
+            (-1.3, 36.3, datetime(2024, 1, 15))
+        ]
+        service._get_cached_results = Mock(return_value=[None, cached_result, None])
+        service._cache_results = Mock()
+        service._build_satellite_query = Mock()
+        
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            mock_ee.List.return_value.getInfo.return_value = [
+                {'recent': {'ndmi': 0.1, 'time_start': 1705219200000, 'cloud_cover': 5.0}, 'ndmi_14day': 0.05},
+                {'recent': None, 'ndmi_14day': None}
+            ]
+            
+            results = await service.verify_claims_batch(points)
+        
+        mock_ee.List.return_value.getInfo.assert_called_once()
+        assert [call.args for call in service._build_satellite_query.call_args_list] == [points[0], points[2]]
+        assert results[0].verdict == SatelliteVerdict.NORMAL
+        assert results[1] == cached_result
+        assert isinstance(results[2], Exception)
+        assert service._cache_results.call_args.args[0] == [
+            (service._generate_cache_key(*points[0]), results[0])
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_verify_claims_batch_point_without_baseline(self, service):
+        """Test a point with no baseline imagery doesn't fail the rest of its batch"""
+        points = [
+            (-1.1, 36.1, datetime(2024, 1, 15)),
+            (-1.2, 36.2, datetime(2024, 1, 15))
+        ]
+        service._get_cached_results = Mock(return_value=[None, None])
+        service._cache_results = Mock()
+        service._build_satellite_query = Mock()
+        
+        with patch('app.services.satellite_service.ee') as mock_ee:
+            mock_ee.List.return_value.getInfo.return_value = [
+                {'recent': {'ndmi': 0.1, 'time_start': 1705219200000, 'cloud_cover': 5.0}, 'ndmi_14day': 0.05},
+                {'recent': {'ndmi': -0.2, 'time_start': 1705219200000, 'cloud_cover': 8.0}, 'ndmi_14day': None}
+            ]
+            
+            results = await service.verify_claims_batch(points)
+        
+        assert results[0].ndmi_14day_avg == 0.05
+        assert results[1].ndmi_value == -0.2
+        assert results[1].ndmi_14day_avg == 0.0
+        assert len(service._cache_results.call_args.args[0]) == 2
+    
+    @pytest.mark.asyncio
+    async def test_warm_cache(self, service):
+        """Test warming queries today's data for every farm in batches"""
+        result = SpaceTruth(
+            ndmi_value=-0.15,
+            ndmi_14day_avg=-0.05,
+            observation_date=datetime(2024, 1, 14),
+            cloud_cover_pct=10.5,
+            verdict=SatelliteVerdict.MODERATE_STRESS
+        )
+        locations = [(-1.0 - i / 1000, 36.0) for i in range(5)]
+        service.WARM_BATCH_SIZE = 2
+        service.verify_claims_batch = AsyncMock(side_effect=[
+            [result, result],
+            Exception("Earth Engine unavailable"),
+            [Exception("No imagery")]
+        ])
+        
+        warmed = await service.warm_cache(locations)
+        
+        assert warmed == 2
+        batches = [call.args[0] for call in service.verify_claims_batch.call_args_list]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [point[:2] for batch in batches for point in batch] == locations
+        assert len({point[2].date() for batch in batches for point in batch}) == 1
+    
     @pytest.mark.asyncio
     async def test_verify_claim_with_cache_hit(self, service):
         """Test claim verification with cached result"""
@@ -304,6 +462,29 @@ class TestSatelliteService:
         assert cached_result.verdict == original_result.verdict
         mock_redis.get.assert_called_once_with(cache_key)
     
+    def test_cached_results_batched(self, service):
+        """Test batch cache reads use one MGET and writes one pipeline"""
+        mock_redis = Mock()
+        service.redis_client = mock_redis
+        result = SpaceTruth(
+            ndmi_value=-0.20,
+            ndmi_14day_avg=-0.10,
+            observation_date=datetime(2024, 1, 14, 10, 30, 0),
+            cloud_cover_pct=15.0,
+            verdict=SatelliteVerdict.SEVERE_STRESS
+        )
+        
+        service._cache_results([("satellite:a", result), ("satellite:b", result)])
+        pipe = mock_redis.pipeline.return_value
+        assert pipe.setex.call_count == 2
+        pipe.execute.assert_called_once()
+        
+        mock_redis.mget.return_value = [pipe.setex.call_args.args[2], None]
+        cached = service._get_cached_results(["satellite:b", "satellite:c"])
+        
+        mock_redis.mget.assert_called_once_with(["satellite:b", "satellite:c"])
+        assert cached == [result, None]
+    
     def test_get_cached_result_not_found(self, service):
         """Test retrieving non-existent cached result with mock Redis"""
         mock_redis = Mock()
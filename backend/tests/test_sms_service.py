@@ -287,3 +287,51 @@ async def test_send_payment_notification_malformed_response():
         
         # Verify
         assert result is False
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_groups_identical_messages():
+    """Test recipients of the same text share one API call"""
+    def send(message, phone_numbers):
+        return {
+            'SMSMessageData': {
+                'Recipients': [
+                    {'number': number, 'status': 'InvalidPhoneNumber' if number == '+254700000000' else 'Success'}
+                    for number in phone_numbers
+                ]
+            }
+        }
+    
+    with patch('asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread:
+        mock_to_thread.side_effect = lambda func, message, phone_numbers: send(message, phone_numbers)
+        
+        results = await sms_service.send_bulk([
+            ("+254712345678", "Paid KES 5,000.00"),
+            ("+254723456789", "Paid KES 5,000.00"),
+            ("+254700000000", "Paid KES 5,000.00"),
+            ("+254734567890", "Paid KES 7,500.00")
+        ])
+    
+    assert mock_to_thread.call_count == 2
+    sent = sorted((call.args[1], call.args[2]) for call in mock_to_thread.call_args_list)
+    assert sent == [
+        ("Paid KES 5,000.00", ["+254712345678", "+254723456789", "+254700000000"]),
+        ("Paid KES 7,500.00", ["+254734567890"])
+    ]
+    assert results == {
+        "+254712345678": True,
+        "+254723456789": True,
+        "+254700000000": False,
+        "+254734567890": True
+    }
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_exception():
+    """Test a failed API call marks its recipients as not sent"""
+    with patch('asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread:
+        mock_to_thread.side_effect = Exception("Network error")
+        
+        results = await sms_service.send_bulk([("+254712345678", "Test message")])
+    
+    assert results == {"+254712345678": False}